@@ -1,5 +1,7 @@
+import base64
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
+from collections import OrderedDict
 from datetime import datetime
 
 import numpy as np
@@ -8,18 +10,37 @@ import pandas as pd
 import matplotlib
 matplotlib.use("TkAgg")
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from weather_cache import read_csv_cached, cache_report
+from virtual_table import VirtualTable
+from jobs import JobRunner
+from dataset_versions import VersionedDataset
+from filter_query import ColumnCache, Condition, compile_query
+from mask_store import MaskStore
+from agg_cube import AggCube, STATS
+from corr_engine import CorrEngine, METHODS
+import weather_analysis as wa
+import asos_schema
+import weather_archive
+import export_pipeline
+import station_parallel
+import rolling_engine
+from perf_monitor import PerfMonitor, format_record, timed
+import plot_pipeline
 
 
 def now_str() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def strip_unit(name: str) -> str:
-    s = str(name)
-    if "(" in s and ")" in s:
-        s = s.split("(")[0].strip()
-    return s
+def _current_rows(self, *args, **kwargs):
+    """성능 기록용: 현재 데이터 행 수"""
+    return None if self.df_current is None else len(self.df_current)
+
+
+def _arg_rows(self, df, *args, **kwargs):
+    """성능 기록용: 첫 인자(DataFrame) 행 수"""
+    return len(df)
 
 
 def wrap_label(text: str, width: int = 6) -> str:
@@ -30,18 +51,34 @@ def wrap_label(text: str, width: int = 6) -> str:
 
 
 class WeatherGUI(tk.Toplevel):
-    def __init__(self, master=None):
+    def __init__(self, master=None, shared=None, archive=None, station=None):
+        """shared: 메인 창에서 이미 읽은 SharedDataset (있으면 CSV를 다시 읽지 않고 연결)
+
+        archive: 열어 둔 WeatherArchive (지점/연도를 골라 그 부분만 읽음, station은 기본 지점)
+        """
         super().__init__(master)
 
         self.title("기상 데이터 분석 및 수정 도구 (통합본)")
         self.geometry("1400x900")
 
         self.file_path = None
-        self.df_raw = None
-        self.df_current = None
-        self.df_base = None
-
-        self.canvas = None
+        # 메인 창과 공유하는 데이터 (연결 중일 때만), 마지막으로 맞춘 내 버전 번호
+        self.shared = None
+        self._shared_token = None
+        self._shared_version = None
+        # 데이터는 버전 단위로 관리 (df_current/df_base는 현재/기준 버전을 보여주는 속성)
+        self.data = VersionedDataset()
+
+        # 상세보기 선 그래프 (Figure/캔버스는 처음 그릴 때 한 번만 만들고 재사용)
+        self.line_plot = None
+
+        # 백그라운드 작업 (로그 창에 진행률 표시, 취소 가능)
+        # 처리 시간/CPU/메모리 기록 (로그 창 + 성능 창)
+        self.perf = PerfMonitor(sink=self._perf_log)
+        self.perf_to_log = True
+        self.perf_window = None
+        self.jobs = JobRunner(self, log=self.log, guard=lambda: self.data.version, perf=self.perf)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         plt.rcParams["font.family"] = ["Malgun Gothic", "NanumGothic", "AppleGothic", "DejaVu Sans"]
         plt.rcParams["axes.unicode_minus"] = False
@@ -59,7 +96,8 @@ class WeatherGUI(tk.Toplevel):
         ttk.Button(top, text="CSV 선택", command=self.pick_file).pack(side=tk.LEFT, padx=4)
         ttk.Button(top, text="타입변환+정렬", command=self.transform_and_sort).pack(side=tk.LEFT, padx=4)
         ttk.Button(top, text="계절 2x2 히트맵", command=self.plot_season_heatmaps).pack(side=tk.LEFT, padx=4)
-        ttk.Button(top, text="현재 데이터 저장(CSV)", command=self.save_current_csv).pack(side=tk.LEFT, padx=4)
+        ttk.Button(top, text="현재 데이터 저장", command=self.save_current_csv).pack(side=tk.LEFT, padx=4)
+        ttk.Button(top, text="작업 취소", command=self.cancel_jobs).pack(side=tk.RIGHT, padx=4)
 
         opt = ttk.Frame(self, padding=(10, 0, 10, 10))
         opt.pack(side=tk.TOP, fill=tk.X)
@@ -68,22 +106,24 @@ class WeatherGUI(tk.Toplevel):
         ttk.Label(opt, text="인코딩").pack(side=tk.LEFT)
         ttk.Entry(opt, textvariable=self.encoding_var, width=10).pack(side=tk.LEFT, padx=5)
 
-        # self.method_var = tk.StringVar(value="pearson")
-
-        ttk.Label(opt, text="상관방법").pack(side=tk.LEFT)
-        ttk.Label(opt, text="pearson").pack(side=tk.LEFT, padx=5)
-
         self.method_var = tk.StringVar(value="pearson")
 
-        # ttk.Label(opt, text="상관방법").pack(side=tk.LEFT)
-        # ttk.Combobox(opt, textvariable=self.method_var, values=["pearson"], width=10, state="readonly").pack(
-        #     side=tk.LEFT, padx=5
-        # )
+        # spearman도 순위를 버전마다 한 번만 계산하므로 다시 선택 가능
+        ttk.Label(opt, text="상관방법").pack(side=tk.LEFT)
+        ttk.Combobox(opt, textvariable=self.method_var, values=METHODS, width=10, state="readonly").pack(
+            side=tk.LEFT, padx=5
+        )
 
         self.k_var = tk.IntVar(value=8)
         ttk.Label(opt, text="변수개수").pack(side=tk.LEFT)
         ttk.Spinbox(opt, from_=2, to=20, textvariable=self.k_var, width=6).pack(side=tk.LEFT, padx=5)
 
+        # 선 그래프 점 솎아내기 (minmax: 최소/최대 보존, lttb: 모양 보존)
+        self.decimate_var = tk.StringVar(value="minmax")
+        ttk.Label(opt, text="그래프 솎아내기").pack(side=tk.LEFT)
+        ttk.Combobox(opt, textvariable=self.decimate_var, values=plot_pipeline.METHODS, width=8,
+                     state="readonly").pack(side=tk.LEFT, padx=5)
+
         # 히트맵 옵션(그대로 유지)
         self.nonnull_ratio_var = tk.DoubleVar(value=0.7)
         self.min_rows_season_var = tk.IntVar(value=30)
@@ -112,6 +152,38 @@ class WeatherGUI(tk.Toplevel):
         ttk.Button(flt, text="판단 열 추가", command=self.apply_filter).pack(side=tk.LEFT, padx=4)
         ttk.Button(flt, text="자세히 보기", command=self.show_detailed_view).pack(side=tk.LEFT, padx=4)
         ttk.Button(flt, text="필터 해제/복구", command=self.reset_filter).pack(side=tk.LEFT, padx=4)
+        ttk.Button(flt, text="판단 결합", command=self.popup_combine_masks).pack(side=tk.LEFT, padx=4)
+
+        # 여러 조건을 한 번에: 예) 평균기온(°C) > 25 and 일강수량(mm) >= 10 or 지점 in 133,108
+        qry = ttk.Frame(self, padding=(10, 0, 10, 10))
+        qry.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(qry, text="조건식").pack(side=tk.LEFT)
+        self.query_var = tk.StringVar(value="")
+        query_entry = ttk.Entry(qry, textvariable=self.query_var, width=80)
+        query_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        query_entry.bind("<Return>", lambda e: self.apply_filter(use_query=True))
+        ttk.Button(qry, text="조건식 판단", command=lambda: self.apply_filter(use_query=True)).pack(side=tk.LEFT, padx=4)
+
+        # 조건 판단용 숫자/문자 변환 결과 캐시 (데이터 버전 + 열 단위)
+        self.filter_cache = ColumnCache()
+        self.detail_col = ""
+
+        # 판단(...) 결과는 DataFrame 열 대신 비트 압축 마스크로 보관 (표시/저장 때만 0/1로 풀기)
+        self.masks = MaskStore()
+        self.active_mask = None
+        # 실행 취소 이력에서 버려진 버전의 마스크는 같이 정리
+        self.data.on_prune = self.masks.retain
+
+        # 데이터 버전별 지점×연×월 집계 큐브 (월별/계절별/연도별 요약은 여기서 바로 계산)
+        self.cubes = OrderedDict()
+
+        # 계절별 상관행렬 캐시 (데이터 버전, k, method, nonnull_ratio)
+        self.corr_engine = CorrEngine()
+        # 지점별 병렬 실행 (지점마다 따로 분석해서 합침, 프로세스 풀 + 공유 메모리)
+        self.by_station_var = tk.BooleanVar(value=False)
+        # 계절 히트맵 PNG 캐시 (데이터 버전 + 히트맵 설정이 모두 같으면 다시 그리지 않음)
+        self.heatmap_images = OrderedDict()
+        self.heatmap_window = None
 
         # --- 메인 컨테이너 (왼쪽 표/로그 + 오른쪽 그래프(숨김)) ---
         self.main_container = ttk.Frame(self)
@@ -136,9 +208,10 @@ class WeatherGUI(tk.Toplevel):
         # 1. Treeview 생성
         self.table = ttk.Treeview(table_frame, show="headings")
 
-        # 2. 세로 스크롤바 생성 및 연결
-        yscroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
-        self.table.configure(yscrollcommand=yscroll.set)
+        # 2. 세로 스크롤바 생성 (가상 표시: 보이는 행만 채우고 스크롤 시 교체)
+        yscroll = ttk.Scrollbar(table_frame, orient="vertical")
+        self.vtable = VirtualTable(self.table, yscroll, self._display_name_fix, self._column_width)
+        self.bind("<Control-g>", lambda e: self.ask_goto_row(self.vtable))
 
         # 3. 가로 스크롤바 생성 및 연결 (추가)
         xscroll = ttk.Scrollbar(table_frame, orient="horizontal", command=self.table.xview)
@@ -160,27 +233,55 @@ class WeatherGUI(tk.Toplevel):
         self.log_text = tk.Text(log_frame, height=8, wrap="word", state="disabled")
         self.log_text.pack(fill=tk.BOTH, expand=True)
 
+        self.bind("<Control-z>", lambda e: self.undo())
+        self.bind("<Control-y>", lambda e: self.redo())
+
         self.log("프로그램 시작")
 
+        if shared is not None:
+            self.attach_shared(shared)
+        elif archive is not None:
+            self.open_archive(archive, station)
+
     # -------------------- 메뉴 구성 (수정됨) --------------------
     def setup_menu(self):
         menubar = tk.Menu(self)
 
         # 1. 데이터 수정 메뉴
         edit_data_menu = tk.Menu(menubar, tearoff=0)
+        edit_data_menu.add_command(label="실행 취소 (Ctrl+Z)", command=self.undo)
+        edit_data_menu.add_command(label="다시 실행 (Ctrl+Y)", command=self.redo)
+        edit_data_menu.add_command(label="변경 이력", command=self.show_history)
+        edit_data_menu.add_separator()
         edit_data_menu.add_command(label="열 삭제", command=self.popup_delete_column)
+        edit_data_menu.add_separator()
+        edit_data_menu.add_command(label="캐시 다시 만들기", command=self.rebuild_cache)
+        edit_data_menu.add_command(label="아카이브 열기 (여러 해)", command=self.pick_archive)
+        edit_data_menu.add_separator()
+        edit_data_menu.add_command(label="CSV 행 추가 (공유 데이터)", command=self.append_csv_rows)
+        edit_data_menu.add_command(label="현재 데이터를 공유 데이터에 반영", command=self.publish_shared)
+        edit_data_menu.add_command(label="공유 데이터 다시 불러오기", command=self.reload_shared)
         menubar.add_cascade(label="데이터 수정", menu=edit_data_menu)
 
         # 2. 데이터 분석 메뉴
         analysis_menu = tk.Menu(menubar, tearoff=0)
         analysis_menu.add_command(label="전체 요약 통계량", command=self.show_summary_stats)
         analysis_menu.add_command(label="1~12월 주요항목 평균치", command=self.show_monthly_summary)
+        analysis_menu.add_command(label="기간별 요약 (월/계절/연도)", command=self.popup_period_summary)
+        analysis_menu.add_separator()
+        analysis_menu.add_command(label="이동 통계 열 추가 (평균/합계/최소/최대)", command=self.popup_rolling)
+        analysis_menu.add_command(label="평년 편차 열 추가 (일별 평년값)", command=self.popup_anomaly)
+        analysis_menu.add_separator()
+        analysis_menu.add_checkbutton(label="지점별 병렬 실행 (월평균/히트맵/기온 탐색/이상치)",
+                                      variable=self.by_station_var)
         menubar.add_cascade(label="데이터 분석", menu=analysis_menu)
 
         # 3. 데이터 조회 메뉴
         view_menu = tk.Menu(menubar, tearoff=0)
         view_menu.add_command(label="강수 발생일 기록", command=self.process_rainfall_frequency)
         view_menu.add_command(label="기온 탐색 결과", command=self.explore_avg_temp)
+        view_menu.add_separator()
+        view_menu.add_command(label="행 이동 (Ctrl+G)", command=lambda: self.ask_goto_row(self.vtable))
         menubar.add_cascade(label="데이터 조회", menu=view_menu)
 
         # 4. 이상치 제거 메뉴 (최대 풍속으로 변경) ★
@@ -188,6 +289,14 @@ class WeatherGUI(tk.Toplevel):
         outlier_menu.add_command(label="최대 풍속(m/s)", command=self.remove_wind_speed_outliers)
         menubar.add_cascade(label="이상치 제거", menu=outlier_menu)
 
+        # 5. 성능 메뉴
+        perf_menu = tk.Menu(menubar, tearoff=0)
+        perf_menu.add_command(label="성능 통계 창", command=self.show_perf_window)
+        perf_menu.add_command(label="성능 기록 CSV 저장", command=self.export_perf_csv)
+        perf_menu.add_command(label="성능 기록 지우기", command=self.clear_perf)
+        perf_menu.add_command(label="메모리 사용량 (열별)", command=self.show_memory_report)
+        menubar.add_cascade(label="성능", menu=perf_menu)
+
         self.config(menu=menubar)
 
     # -------------------- 이상치 제거 기능 (최대 풍속 기준) ★ --------------------
@@ -198,57 +307,68 @@ class WeatherGUI(tk.Toplevel):
             return
 
         # 컬럼명 설정 (파일의 실제 컬럼명과 일치해야 합니다)
-        col = "최대 풍속(m/s)"
+        col = wa.WIND_COL
         if col not in self.df_current.columns:
             messagebox.showerror("오류", f"'{col}' 컬럼을 찾을 수 없습니다.\n파일에 해당 컬럼이 있는지 확인하세요.")
             return
 
-        try:
-            df = self.df_current.copy()
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-            valid_data = df[col].dropna()
-            if valid_data.empty:
-                messagebox.showinfo("알림", "분석할 유효한 데이터가 없습니다.")
-                return
-
-            # IQR 계산
-            Q1 = valid_data.quantile(0.25)
-            Q3 = valid_data.quantile(0.75)
-            IQR = Q3 - Q1
+        by_station = self._by_station()
 
-            # 이상치 경계 설정 (1.5배)
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+        def work(ctx, df, cube):
+            summary = None
+            if by_station:
+                # 지점마다 IQR 기준을 따로 계산 (지점끼리 풍속 분포가 달라서)
+                res = station_parallel.run_by_station(df, "wind_outliers", {"col": col}, progress=ctx.progress)
+                summary, keep = res["result"]["summary"], res["result"]["keep"]
+                if summary["상한"].isna().all():
+                    return None
+                lower_bound, upper_bound = summary["하한"].min(), summary["상한"].max()
+                values = pd.to_numeric(df[col], errors="coerce")
+            else:
+                out = wa.wind_speed_outliers(df, col, progress=ctx.progress)
+                if out is None:
+                    return None
+                lower_bound, upper_bound, keep, values = out["lower"], out["upper"], out["keep"], out["values"]
 
-            # 물리적 한계 보정 (풍속은 0 미만일 수 없음)
-            lower_bound = max(lower_bound, 0)
+            df = df.assign(**{col: values})
+            filtered_df = df.take(keep)
+            steps = [("assign", {col: values}), ("take", keep, False)]
 
-            # 필터링 수행
-            before_cnt = len(df)
-            filtered_df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-            after_cnt = len(filtered_df)
+            # 큐브는 지워지는 행만 빼서 갱신 (전체 재집계 X)
+            if cube is not None and len(keep) < len(df):
+                ctx.progress(0.9, "집계 큐브 갱신")
+                removed = df.take(np.setdiff1d(np.arange(len(df)), keep, assume_unique=True))
+                cube = cube.copy().remove_rows(removed, filtered_df)
+            return filtered_df, steps, lower_bound, upper_bound, len(df) - len(filtered_df), cube, summary
 
-            removed_cnt = before_cnt - after_cnt
+        def done(res):
+            if res is None:
+                messagebox.showinfo("알림", "분석할 유효한 데이터가 없습니다.")
+                return
+            filtered_df, steps, lower_bound, upper_bound, removed_cnt, cube, summary = res
 
             if removed_cnt == 0:
                 messagebox.showinfo("결과", f"통계적 기준({upper_bound:.2f} m/s 초과)을 벗어나는 이상치가 발견되지 않았습니다.")
                 return
 
+            range_text = f"계산된 정상 범위: {lower_bound:.2f} ~ {upper_bound:.2f} m/s"
+            if summary is not None:
+                self.display_df_popup(summary.round(2), "지점별 풍속 이상치 기준")
+                range_text = f"지점별 정상 범위 ({len(summary)}개 지점, 지점마다 다름): {lower_bound:.2f} ~ {upper_bound:.2f} m/s"
             if messagebox.askyesno("이상치 제거 확인",
-                                   f"계산된 정상 범위: {lower_bound:.2f} ~ {upper_bound:.2f} m/s\n"
+                                   f"{range_text}\n"
                                    f"제거될 데이터 수: {removed_cnt}개\n\n"
                                    f"이 작업을 수행하시겠습니까?"):
-                self.df_current = filtered_df
-                self.df_base = filtered_df.copy()
+                self.data.apply(f"이상치 제거: {col}", steps, frame=filtered_df)
+                self._store_cube(self.data.version, cube)
 
                 self.render_table(self.df_current)
                 self.log(f"이상치 제거 완료: {col} ({removed_cnt}행 삭제)")
                 messagebox.showinfo("완료", f"{removed_cnt}개의 이상치가 제거되었습니다.")
 
-        except Exception as e:
-            messagebox.showerror("오류", f"이상치 제거 중 오류 발생: {e}")
-            self.log(f"이상치 제거 실패: {e}")
+        self.jobs.submit("이상치 제거", work, self.df_current, self.cubes.get(self.data.version),
+                         key="data", on_done=done, rows=len(self.df_current),
+                         on_error=self._job_error("오류", "이상치 제거 중 오류 발생"))
 
     # -------------------- 공통 --------------------
     def log(self, msg: str):
@@ -257,34 +377,345 @@ class WeatherGUI(tk.Toplevel):
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
+    # -------------------- 성능 기록 --------------------
+    def _perf_log(self, rec: dict):
+        if self.perf_to_log:
+            self.log(format_record(rec))
+
+    def show_perf_window(self):
+        if self.perf_window is not None and self.perf_window.winfo_exists():
+            self.perf_window.lift()
+            return
+
+        win = tk.Toplevel(self)
+        win.title("성능 통계")
+        win.geometry("980x420")
+        self.perf_window = win
+
+        bar = ttk.Frame(win, padding=6)
+        bar.pack(fill="x")
+        log_var = tk.BooleanVar(value=self.perf_to_log)
+        mem_var = tk.BooleanVar(value=self.perf.trace_memory)
+
+        def on_log_toggle():
+            self.perf_to_log = log_var.get()
+
+        def on_mem_toggle():
+            self.perf.set_trace_memory(mem_var.get())
+
+        ttk.Checkbutton(bar, text="로그 창에 표시", variable=log_var, command=on_log_toggle).pack(side="left")
+        ttk.Checkbutton(bar, text="메모리 추적(tracemalloc)", variable=mem_var, command=on_mem_toggle).pack(side="left", padx=8)
+        ttk.Button(bar, text="통계 CSV 저장", command=lambda: self.export_perf_csv(stats=True)).pack(side="right")
+        ttk.Button(bar, text="기록 CSV 저장", command=self.export_perf_csv).pack(side="right", padx=4)
+        ttk.Button(bar, text="지우기", command=self.clear_perf).pack(side="right")
+
+        frame = ttk.Frame(win)
+        frame.pack(fill="both", expand=True)
+        tree = ttk.Treeview(frame, show="headings")
+        yscroll = ttk.Scrollbar(frame, orient="vertical")
+        tree.pack(side="left", fill="both", expand=True)
+        yscroll.pack(side="right", fill="y")
+        vt = VirtualTable(tree, yscroll, width_fn=lambda c: 200 if c == "name" else 95)
+
+        # 창이 열려 있는 동안 1초마다 확인해서 새 기록이 있을 때만 갱신
+        last = {"n": -1}
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            n = self.perf.count
+            if n != last["n"]:
+                last["n"] = n
+                state = vt.sort_state
+                vt.set_data(self.perf.stats())
+                if state:
+                    vt.sort_by(*state)
+            win.after(1000, refresh)
+
+        refresh()
+
+    def export_perf_csv(self, stats: bool = False):
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")],
+                                            initialfile="perf_stats.csv" if stats else "perf_records.csv")
+        if not path:
+            return
+        n = self.perf.export_csv(path, stats=stats)
+        self.log(f"성능 {'통계' if stats else '기록'} 저장: {path} ({n}행)")
+
+    def clear_perf(self):
+        self.perf.clear()
+        self.log("성능 기록을 지웠습니다.")
+
     def pick_file(self):
         path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")])
         if not path:
             return
+        # 다른 파일을 고르면 공유 데이터와 연결을 끊고 이 창만의 데이터로
+        self.detach_shared()
         self.file_path = path
         self.path_var.set(path)
         self.load_csv()
 
-    def load_csv(self):
+    def pick_archive(self):
+        folder = filedialog.askdirectory(title="아카이브 폴더 선택 (meta.json이 있는 폴더)")
+        if not folder:
+            return
         try:
-            enc = self.encoding_var.get().strip() or "cp949"
-            df = pd.read_csv(self.file_path, encoding=enc)
-
-            self.df_raw = df.copy()
-            self.df_current = df.copy()
-            self.df_base = df.copy()
+            archive = weather_archive.open_archive(folder)
+        except weather_archive.ArchiveError as e:
+            messagebox.showerror("아카이브 오류", str(e))
+            return
+        self.open_archive(archive)
+
+    def open_archive(self, archive, station=None):
+        """아카이브에서 고른 지점/연도 조각만 읽어서 현재 데이터로 (나머지는 디스크에 그대로)"""
+        stations, years = archive.stations, archive.years(station)
+        listed = ", ".join(f"{s}({archive.station_name(s)})" for s in stations[:10])
+        if len(stations) > 10:
+            listed += f" 외 {len(stations) - 10}개"
+        st_text = simpledialog.askstring(
+            "아카이브", f"지점 번호 (쉼표 구분, 빈칸=전체)\n있는 지점: {listed}",
+            initialvalue="" if station is None else str(station), parent=self)
+        if st_text is None:
+            return
+        yr_text = simpledialog.askstring(
+            "아카이브", f"연도 (예: 2000-2025, 2030 / 빈칸=전체)\n있는 연도: {years[0]}~{years[-1]}",
+            initialvalue=str(years[-1]), parent=self)
+        if yr_text is None:
+            return
+        try:
+            sel_stations = weather_archive.parse_numbers(st_text)
+            sel_years = weather_archive.parse_numbers(yr_text)
+        except ValueError as e:
+            messagebox.showerror("입력 오류", str(e))
+            return
 
-            self.refresh_filter_columns()
-            self.render_table(self.df_current)  # .head(250)을 삭제하여 전체 표시
+        def work(ctx):
+            ctx.progress(None, "아카이브 읽는 중")
+            df = archive.read(sel_stations, sel_years)
+            if df.empty:
+                raise ValueError("고른 지점/연도에 해당하는 데이터가 없습니다.")
+            ctx.rows = len(df)
+            ctx.progress(None, "집계 큐브 생성")
+            return df, self._build_cube(df)
+
+        def done(res):
+            df, cube = res
+            # 아카이브 조각은 이 창만의 데이터 (공유 데이터와 연결 해제)
+            self.detach_shared()
+            self.file_path = None
+            self.path_var.set(f"아카이브: {archive.root} "
+                              f"(지점 {st_text.strip() or '전체'}, 연도 {yr_text.strip() or '전체'})")
+            self.data.load(df, label="아카이브 로드")
+            self.cubes.clear()
+            self._store_cube(self.data.version, cube)
+            self._show_current(f"아카이브 로드: {len(df)}행 / 전체 {archive.n_rows:,}행 "
+                               f"({asos_schema.format_memory(df)})")
+
+        self.jobs.submit("아카이브 로드", work, key="data", on_done=done, on_error=self._job_error("아카이브 로드 실패"),
+                         use_guard=False)
+
+    @property
+    def df_current(self):
+        return self.data.current
+
+    @property
+    def df_base(self):
+        return self.data.base
+
+    def _show_current(self, msg: str = None):
+        self.refresh_filter_columns()
+        self.render_table(self.df_current)
+        self.clear_plot()
+        self.hide_right_plot()
+        if msg:
+            self.log(msg)
 
-            self.clear_plot()
-            self.hide_right_plot()
+    @timed("실행 취소", rows=_current_rows)
+    def undo(self):
+        if not self.data.can_undo:
+            self.log("더 이상 실행 취소할 변경이 없습니다.")
+            return
+        undone = self.data.current_version.label
+        self.data.undo()
+        self._show_current(f"실행 취소: {undone}")
+
+    @timed("다시 실행", rows=_current_rows)
+    def redo(self):
+        if not self.data.can_redo:
+            self.log("다시 실행할 변경이 없습니다.")
+            return
+        v = self.data.redo()
+        self._show_current(f"다시 실행: {v.label}")
 
-            self.log(f"CSV 로드: {len(df)}행")
-        except Exception as e:
+    def show_history(self):
+        if not self.data.loaded:
+            return
+        rows = [("▶" if cur else "", vid, label) for vid, label, cur in self.data.history()]
+        self.display_df_popup(pd.DataFrame(rows, columns=["현재", "버전", "변경 내용"]), "변경 이력")
+
+    def _job_error(self, title: str, prefix: str = ""):
+        def handler(e):
+            messagebox.showerror(title, f"{prefix}:\n{e}" if prefix else str(e))
+        return handler
+
+    def cancel_jobs(self):
+        n = self.jobs.cancel_all()
+        # 진행 중인 단계(정렬 등 한 번에 끝나는 호출)는 끝까지 돌고, 다음 확인 지점에서 멈춤
+        self.log(f"작업 취소 요청: {n}개 (진행 중인 단계가 끝나면 멈춤)" if n else "실행 중인 작업이 없습니다.")
+
+    def _on_close(self):
+        self.detach_shared()
+        self.jobs.shutdown()
+        # 메모리 추적을 켠 채로 닫으면 메인 창까지 계속 느려짐
+        self.perf.set_trace_memory(False)
+        self.destroy()
+
+    def load_csv(self, rebuild_cache: bool = False):
+        enc = self.encoding_var.get().strip() or "cp949"
+        path = self.file_path
+
+        def work(ctx):
+            ctx.progress(None, "CSV 읽는 중")
+            # CSV 옆의 .cache.npz가 유효하면 파싱 없이 바로 읽음
+            df, cache_status = read_csv_cached(path, encoding=enc, rebuild=rebuild_cache,
+                                               reader=asos_schema.read_csv, version=asos_schema.SCHEMA_VERSION,
+                                               progress=ctx.progress)
+            ctx.rows = len(df)
+            ctx.progress(None, "집계 큐브 생성")
+            return df, cache_status, self._build_cube(df)
+
+        def done(res):
+            df, cache_status, cube = res
+
+            self.data.load(df, label="CSV 로드")
+            self.cubes.clear()
+            self._store_cube(self.data.version, cube)
+            self._show_current(f"CSV 로드: {len(df)}행 (캐시 {cache_status}, {cache_report()}, "
+                               f"{asos_schema.format_memory(df)})")
+
+        def failed(e):
             messagebox.showerror("오류", str(e))
             self.log(f"로드 실패: {e}")
 
+        # 새 파일을 고르면 이전 로드는 취소 (use_guard=False: 로드는 항상 최신 상태를 대체)
+        self.jobs.submit("CSV 로드", work, key="data", on_done=done, on_error=failed, use_guard=False)
+
+    # -------------------- 공유 데이터 (메인 창과 같은 DataFrame) --------------------
+    def attach_shared(self, shared):
+        """메인 창이 읽어 둔 DataFrame/날짜 색인을 복사 없이 그대로 사용"""
+        self.detach_shared()
+        self.shared = shared
+        self._shared_token = shared.subscribe(self._on_shared_change)
+        self.file_path = shared.source
+        self.path_var.set(f"공유 데이터: {shared.source or shared.name}")
+        self._load_from_shared("공유 데이터 연결")
+
+    def detach_shared(self):
+        if self.shared is not None and self._shared_token is not None:
+            self.shared.unsubscribe(self._shared_token)
+        self.shared = None
+        self._shared_token = None
+        self._shared_version = None
+
+    def _load_from_shared(self, label: str, cube=None):
+        # 달력용 파생 열(이모지/요약)은 빼고 보여 줌 (열 버퍼는 그대로 공유)
+        hidden = [c for c in self.shared.derived_columns if c in self.shared.df.columns]
+        frame = self.shared.df.drop(columns=hidden) if hidden else self.shared.df
+        first = not self.data.loaded
+        if first:
+            self.data.load(frame, label=label)
+        else:
+            # 이전 버전은 실행 취소로 돌아갈 수 있게 남겨 둠
+            self.data.apply(label, [("frame", frame)])
+        self._shared_version = self.data.version
+        if first:
+            self.cubes.clear()
+        self._store_cube(self.data.version, cube)
+        self._show_current(f"{label}: {len(self.shared.df)}행 (파일 다시 읽지 않음)")
+
+    def _on_shared_change(self, shared, change, origin):
+        if origin is self:
+            return
+        # 이 창에서 따로 고친 내용이 있으면 덮어쓰지 않고 알림만
+        if self.data.version != self._shared_version:
+            self.log(f"공유 데이터가 바뀌었습니다({change.kind}). '공유 데이터 다시 불러오기'로 반영할 수 있습니다.")
+            return
+
+        cube = self.cubes.get(self.data.version)
+        if change.kind == "append" and cube is not None:
+            # 추가된 행만 큐브에 더함 (전체 재집계 X)
+            cube = cube.copy().add_rows(change.df.iloc[change.info["start"]:])
+        else:
+            cube = None
+        label = f"공유 데이터 행 추가 ({change.info['rows']}행)" if change.kind == "append" else "공유 데이터 갱신"
+        self._load_from_shared(label, cube)
+
+    def reload_shared(self):
+        if self.shared is None:
+            messagebox.showwarning("알림", "연결된 공유 데이터가 없습니다. (메인 창의 '연간 분석'으로 열어야 함)")
+            return
+        self._load_from_shared("공유 데이터 다시 불러오기")
+
+    def append_csv_rows(self):
+        """다른 CSV의 행을 공유 데이터 끝에 추가 (메인 창/이 창 모두 반영)"""
+        if self.shared is None:
+            messagebox.showwarning("알림", "연결된 공유 데이터가 없습니다. (메인 창의 '연간 분석'으로 열어야 함)")
+            return
+        path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")])
+        if not path:
+            return
+        enc = self.encoding_var.get().strip() or "cp949"
+        shared = self.shared
+
+        def work(ctx):
+            ctx.progress(None, "CSV 읽는 중")
+            rows, _ = read_csv_cached(path, encoding=enc, reader=asos_schema.read_csv,
+                                      version=asos_schema.SCHEMA_VERSION, progress=ctx.progress)
+            rows.columns = rows.columns.astype(str).str.strip()
+            ctx.rows = len(rows)
+            ctx.progress(None, "공유 데이터에 병합")
+            return shared.build_append(rows)
+
+        def done(change):
+            if not shared.commit(change):
+                messagebox.showwarning("알림", "그 사이에 공유 데이터가 바뀌었습니다. 다시 시도하세요.")
+                return
+            self.log(f"행 추가: {path} ({change.info['rows']}행)")
+
+        self.jobs.submit("CSV 행 추가", work, key="shared", on_done=done, use_guard=False,
+                         on_error=self._job_error("행 추가 실패"))
+
+    def publish_shared(self):
+        """이 창에서 고친 데이터(판단 열 제외)를 메인 창과 공유"""
+        if self.shared is None:
+            messagebox.showwarning("알림", "연결된 공유 데이터가 없습니다. (메인 창의 '연간 분석'으로 열어야 함)")
+            return
+        if self.df_base is None:
+            return
+        shared, version = self.shared, self.data.version
+
+        def work(ctx, df):
+            # 메인 창이 쓰는 형태(일시 datetime, date 열)로 맞추고 색인 생성
+            return shared.build_replace(shared.prepare(df) if shared.prepare else df, label="연간 분석 창에서 반영")
+
+        def done(change):
+            if not shared.commit(change, origin=self):
+                messagebox.showwarning("알림", "그 사이에 공유 데이터가 바뀌었습니다. 다시 시도하세요.")
+                return
+            if self.data.version == version:
+                self._shared_version = version
+            self.log(f"공유 데이터에 반영: {len(change.df)}행")
+
+        self.jobs.submit("공유 데이터 반영", work, self.df_base, key="shared", on_done=done, use_guard=False,
+                         rows=len(self.df_base), on_error=self._job_error("반영 실패"))
+
+    def rebuild_cache(self):
+        if not self.file_path:
+            messagebox.showwarning("알림", "먼저 CSV를 선택하세요.")
+            return
+        self.load_csv(rebuild_cache=True)
+
     def refresh_filter_columns(self):
         if self.df_current is None:
             self.filter_col_cb["values"] = []
@@ -301,24 +732,37 @@ class WeatherGUI(tk.Toplevel):
             return "평균상대습도(%)"
         return s
 
-    def render_table(self, df_show: pd.DataFrame):
-        self.table.delete(*self.table.get_children())
-        cols = list(df_show.columns)
-        self.table["columns"] = cols
+    def _column_width(self, col_name: str) -> int:
+        if col_name in ["평균 상대습도(%)", "평균상대습도(%)"]:
+            return 170
+        return 120
+
+    @timed("표 그리기", rows=_arg_rows)
+    def render_table(self, df_show: pd.DataFrame, mask_names=None, positions=None):
+        """positions: df_show 각 행이 현재 데이터의 몇 번째 행인지 (일부 행만 보여줄 때)"""
+        if mask_names is None:
+            mask_names = self.masks.names(self.data.version) if df_show is self.df_current else []
 
-        for col in cols:
-            header = self._display_name_fix(col)
-            self.table.heading(col, text=header)
+        # 판단 열은 보이는 행만 그때그때 0/1로 풀어서 표시
+        def mask_column(name):
+            if positions is None:
+                return lambda pos: self.masks.materialize(name, pos)
+            return lambda pos: self.masks.materialize(name, positions[pos])
 
-            width = 120
-            if col == "평균 상대습도(%)":
-                width = 170
+        extra = {name: mask_column(name) for name in mask_names}
 
-                # stretch=False를 추가해야 창보다 열이 많을 때 가로 스크롤이 생깁니다.
-            self.table.column(col, width=width, anchor="center", stretch=False)
+        # 전체 행을 insert하지 않고 화면에 보이는 구간만 채움 (헤더 클릭 = 정렬)
+        self.vtable.set_data(df_show, extra)
 
-        for _, row in df_show.iterrows():
-            self.table.insert("", tk.END, values=[row[c] for c in cols])
+    def ask_goto_row(self, vtable: VirtualTable, parent=None):
+        if vtable.n_rows == 0:
+            return
+        n = simpledialog.askinteger(
+            "행 이동", f"이동할 행 번호 (1 ~ {vtable.n_rows})",
+            parent=parent or self, minvalue=1, maxvalue=vtable.n_rows
+        )
+        if n is not None:
+            vtable.goto(n - 1)
 
     # -------------------- 데이터 수정 기능 --------------------
     def popup_delete_column(self):
@@ -377,8 +821,11 @@ class WeatherGUI(tk.Toplevel):
             if confirm:
                 try:
                     # 진짜 수정 발생: 원본(df_current)과 기준(df_base)에서 열 삭제
-                    self.df_current.drop(columns=to_delete, inplace=True)
-                    self.df_base.drop(columns=to_delete, inplace=True)
+                    # 기준 버전에서 열을 뺀 새 버전 (다른 열 버퍼는 공유, 실행 취소 가능)
+                    cube = self.cubes.get(self.data.base_version)
+                    self.data.apply(f"열 삭제: {', '.join(to_delete)}", [("drop", to_delete)], from_base=True)
+                    if cube is not None:
+                        self._store_cube(self.data.version, cube.copy().drop_variables(to_delete))
 
                     # UI 갱신
                     self.refresh_filter_columns()
@@ -394,7 +841,29 @@ class WeatherGUI(tk.Toplevel):
         ttk.Button(btn_frame, text="취소", command=pop.destroy).pack(side="right")
 
 
+    # -------------------- 지점별 병렬 실행 --------------------
+    def _by_station(self) -> bool:
+        """지점별 병렬 실행을 켰고 지점이 둘 이상일 때만 (지점 하나면 나눌 이유가 없음)"""
+        df = self.df_current
+        return bool(self.by_station_var.get()) and "지점" in df.columns and df["지점"].nunique() > 1
+
+    def _run_by_station(self, title: str, analysis: str, on_done, params: dict = None):
+        """station_parallel로 지점마다 analysis 실행 -> on_done(지점/지점명 열이 붙은 합친 결과)"""
+        def work(ctx, df):
+            return station_parallel.run_by_station(df, analysis, params, progress=ctx.progress)
+
+        def done(res):
+            for st, err in res["errors"].items():
+                self.log(f"{title}: 지점 {st} 건너뜀 ({err})")
+            self.log(f"{title}: 지점 {res['stations']}개 병렬 처리 "
+                     f"(공유 메모리 {res['shared_bytes'] / 2 ** 20:.1f}MB)")
+            on_done(res["result"])
+
+        self.jobs.submit(f"{title} (지점별)", work, self.df_current, key=f"station:{analysis}", on_done=done,
+                         rows=len(self.df_current), on_error=self._job_error("오류", f"{title} 중 오류 발생"))
+
     # -------------------- 분석 --------------------
+    @timed("전체 요약 통계량", rows=_current_rows)
     def show_summary_stats(self):
         if self.df_current is None:
             return
@@ -406,95 +875,292 @@ class WeatherGUI(tk.Toplevel):
         # 팝업창에 표시
         self.display_df_popup(desc.round(2), "전체 요약 통계량")
 
+    def show_memory_report(self):
+        if self.df_current is None:
+            return
+        report = asos_schema.memory_report(self.df_current, scale_rows=asos_schema.NATIONAL_30Y_ROWS)
+        self.display_df_popup(report.round(1), "메모리 사용량 (열별)")
+        self.log(asos_schema.format_memory(self.df_current, asos_schema.NATIONAL_30Y_ROWS))
+
     def show_monthly_summary(self):
         """
          '월' 글자 붙는 문제 제거 (사진 요구사항)
         """
         if self.df_current is None:
             return
-        try:
-            df = self.df_current.copy()
-            if "일시" not in df.columns:
-                messagebox.showerror("오류", "일시 컬럼이 없습니다.")
+        if "일시" not in self.df_current.columns:
+            messagebox.showerror("오류", "일시 컬럼이 없습니다.")
+            return
+
+        avail = [c for c in wa.MONTHLY_COLUMNS if c in self.df_current.columns]
+        if not avail:
+            messagebox.showwarning("알림", "요약할 대상 컬럼이 없습니다.")
+            return
+
+        if self._by_station():
+            self._run_by_station("월별 평균", "monthly", lambda res: self.display_df_popup(
+                res.rename(columns={"평균 상대습도(%)": "평균상대습도(%)"}), "1~12월 주요항목 평균치 (지점별)"),
+                {"columns": avail})
+            return
+
+        def show(cube):
+            with self.perf.measure("월별 평균(큐브 조회)"):
+                res = wa.monthly_summary(self.df_current, avail, cube=cube)
+            # 표시용 이름만 보정(데이터 컬럼은 유지)
+            res = res.rename(columns={"평균 상대습도(%)": "평균상대습도(%)"})
+            self.display_df_popup(res, "1~12월 주요항목 평균치")
+
+        self._with_cube(show)
+
+    # -------------------- 집계 큐브 --------------------
+    @staticmethod
+    def _build_cube(df: pd.DataFrame):
+        if "일시" not in df.columns:
+            return None
+        return AggCube.from_df(df)
+
+    def _store_cube(self, version, cube):
+        if cube is None:
+            return
+        self.cubes[version] = cube
+        self.cubes.move_to_end(version)
+        while len(self.cubes) > 4:
+            self.cubes.popitem(last=False)
+
+    def _with_cube(self, callback):
+        """현재 버전의 큐브로 callback 실행 (없으면 작업 스레드에서 한 번 만들어 둠)"""
+        version = self.data.version
+        cube = self.cubes.get(version)
+        if cube is not None:
+            self.cubes.move_to_end(version)
+            callback(cube)
+            return
+
+        def work(ctx, df):
+            ctx.progress(None, "집계 큐브 생성")
+            return self._build_cube(df)
+
+        def done(cube):
+            self._store_cube(version, cube)
+            callback(cube)
+
+        self.jobs.submit("집계 큐브", work, self.df_current, key="cube", on_done=done, rows=len(self.df_current),
+                         on_error=self._job_error("오류"))
+
+    def popup_period_summary(self):
+        if self.df_current is None:
+            return
+        if "일시" not in self.df_current.columns:
+            messagebox.showerror("오류", "일시 컬럼이 없습니다.")
+            return
+        self._with_cube(self._open_period_summary)
+
+    def _open_period_summary(self, cube: AggCube):
+        pop = tk.Toplevel(self)
+        pop.title("기간별 요약")
+        pop.geometry("420x520")
+
+        opt = ttk.Frame(pop, padding=10)
+        opt.pack(fill="x")
+
+        by_names = {"월별": "month", "계절별": "season", "연도별": "year"}
+        by_var = tk.StringVar(value="월별")
+        stat_var = tk.StringVar(value="mean")
+        station_var = tk.StringVar(value="전체")
+
+        ttk.Label(opt, text="묶음").grid(row=0, column=0, sticky="w")
+        ttk.Combobox(opt, textvariable=by_var, values=list(by_names), width=10, state="readonly").grid(row=0, column=1, padx=5)
+        ttk.Label(opt, text="통계").grid(row=0, column=2, sticky="w")
+        ttk.Combobox(opt, textvariable=stat_var, values=STATS, width=8, state="readonly").grid(row=0, column=3, padx=5)
+        ttk.Label(opt, text="지점").grid(row=1, column=0, sticky="w", pady=(6, 0))
+        ttk.Combobox(opt, textvariable=station_var, values=["전체"] + [str(s) for s in cube.stations],
+                     width=10, state="readonly").grid(row=1, column=1, padx=5, pady=(6, 0))
+
+        ttk.Label(pop, text="요약할 컬럼 (여러 개 선택 가능):").pack(anchor="w", padx=10)
+        lb = tk.Listbox(pop, selectmode=tk.EXTENDED)
+        lb.pack(fill="both", expand=True, padx=10)
+        for c in cube.variables:
+            lb.insert(tk.END, self._display_name_fix(c))
+
+        def run():
+            cols = [cube.variables[i] for i in lb.curselection()]
+            if not cols:
+                messagebox.showwarning("알림", "컬럼을 선택하세요.", parent=pop)
                 return
+            station = None
+            if station_var.get() != "전체":
+                station = cube.stations[[str(s) for s in cube.stations].index(station_var.get())]
+            res = cube.summary(by_names[by_var.get()], cols, stat_var.get(), station=station).round(2)
+            res = res.rename(columns={c: self._display_name_fix(c) for c in cols})
+            self.display_df_popup(res, f"{by_var.get()} {stat_var.get()} 요약")
+            self.log(f"기간별 요약: {by_var.get()} {stat_var.get()} ({len(cols)}개 컬럼, 큐브 {cube.nbytes / 1024:.0f}KB)")
+
+        ttk.Button(pop, text="요약 보기", command=run).pack(pady=10)
+
+    # -------------------- 이동 통계 / 평년 편차 (파생 열) --------------------
+    def _measure_columns(self) -> list:
+        skip = {"지점", "지점명", "일시", "date"}
+        df = self.df_current
+        return [c for c in df.columns if c not in skip and pd.api.types.is_numeric_dtype(df[c].dtype)]
+
+    def _add_derived_columns(self, label: str, make):
+        """make(df, progress) -> {열 이름: 배열}을 작업 스레드에서 계산해 새 버전에 열로 추가
+
+        추가한 열은 판단/조건식/상세보기에서 다른 열과 똑같이 쓰고, 실행 취소로 되돌림
+        """
+        def work(ctx, df):
+            cols = make(df, ctx.progress)
+            return cols, df.assign(**cols)
 
-            df["일시"] = pd.to_datetime(df["일시"], errors="coerce")
-            df["월"] = df["일시"].dt.month
+        def done(res):
+            cols, frame = res
+            self.data.apply(label, [("assign", cols)], frame=frame)
+            self._show_current(f"{label}: {', '.join(cols)}")
 
-            target = ["평균기온(°C)", "평균 상대습도(%)", "일강수량(mm)"]
-            avail = [c for c in target if c in df.columns]
-            if not avail:
-                messagebox.showwarning("알림", "요약할 대상 컬럼이 없습니다.")
+        self.jobs.submit(label, work, self.df_current, key="data", on_done=done, rows=len(self.df_current),
+                         on_error=self._job_error("오류", f"{label} 중 오류 발생"))
+
+    def _derived_popup(self, title: str, geometry: str = "440x560"):
+        """파생 열 창 공통: (창, 옵션 프레임, 열 목록 Listbox, 선택한 열 읽기 함수)"""
+        if self.df_current is None:
+            messagebox.showwarning("알림", "먼저 CSV를 선택하세요.")
+            return None
+        if "일시" not in self.df_current.columns:
+            messagebox.showerror("오류", "일시 컬럼이 없습니다.")
+            return None
+        cols = self._measure_columns()
+        pop = tk.Toplevel(self)
+        pop.title(title)
+        pop.geometry(geometry)
+        opt = ttk.Frame(pop, padding=10)
+        opt.pack(fill="x")
+
+        ttk.Label(pop, text="대상 컬럼 (여러 개 선택 가능):").pack(anchor="w", padx=10)
+        lb = tk.Listbox(pop, selectmode=tk.EXTENDED, exportselection=False)
+        lb.pack(fill="both", expand=True, padx=10)
+        for c in cols:
+            lb.insert(tk.END, self._display_name_fix(c))
+
+        def selected():
+            picked = [cols[i] for i in lb.curselection()]
+            if not picked:
+                messagebox.showwarning("알림", "컬럼을 선택하세요.", parent=pop)
+            return picked
+        return pop, opt, lb, selected
+
+    def popup_rolling(self):
+        ui = self._derived_popup("이동 통계 열 추가")
+        if ui is None:
+            return
+        pop, opt, _, selected = ui
+
+        windows_var = tk.StringVar(value=", ".join(str(w) for w in rolling_engine.DEFAULT_WINDOWS))
+        ratio_var = tk.DoubleVar(value=0.8)
+        stat_vars = {s: tk.BooleanVar(value=(s == "mean")) for s in rolling_engine.STATS}
+
+        ttk.Label(opt, text="기간(일)").grid(row=0, column=0, sticky="w")
+        ttk.Entry(opt, textvariable=windows_var, width=16).grid(row=0, column=1, columnspan=3, sticky="w", padx=5)
+        ttk.Label(opt, text="통계").grid(row=1, column=0, sticky="w", pady=(6, 0))
+        for i, s in enumerate(rolling_engine.STATS):
+            ttk.Checkbutton(opt, text=rolling_engine.STAT_LABELS[s], variable=stat_vars[s]).grid(
+                row=1, column=1 + i, sticky="w", pady=(6, 0))
+        ttk.Label(opt, text="최소 관측 비율").grid(row=2, column=0, sticky="w", pady=(6, 0))
+        ttk.Spinbox(opt, from_=0.1, to=1.0, increment=0.1, textvariable=ratio_var, width=6).grid(
+            row=2, column=1, sticky="w", padx=5, pady=(6, 0))
+        ttk.Label(opt, text="예: 일강수량 3, 7, 30일 합 → '7일합 일강수량(mm)' 열").grid(
+            row=3, column=0, columnspan=5, sticky="w", pady=(6, 0))
+
+        def run():
+            cols = selected()
+            if not cols:
+                return
+            try:
+                windows = sorted(set(weather_archive.parse_numbers(windows_var.get()) or []))
+                ratio = float(ratio_var.get())
+            except (ValueError, tk.TclError) as e:
+                messagebox.showerror("오류", str(e), parent=pop)
+                return
+            stats = [s for s, v in stat_vars.items() if v.get()]
+            if not windows or min(windows) < 1 or not stats:
+                messagebox.showwarning("알림", "기간(1일 이상)과 통계를 하나 이상 고르세요.", parent=pop)
                 return
 
-            res = df.groupby("월")[avail].mean().reset_index().round(2)
+            def make(df, progress):
+                return rolling_engine.derive_rolling(df, cols, windows, stats, min_ratio=ratio, progress=progress)
 
+            pop.destroy()
+            self._add_derived_columns("이동 통계 열 추가", make)
 
-            # res["월"] = res["월"].astype(str) + "월"  # <- 제거
+        ttk.Button(pop, text="열 추가", command=run).pack(pady=10)
 
-            # 표시용 이름만 보정(데이터 컬럼은 유지)
-            res = res.rename(columns={"평균 상대습도(%)": "평균상대습도(%)"})
-            self.display_df_popup(res, "1~12월 주요항목 평균치")
-        except Exception as e:
-            messagebox.showerror("오류", str(e))
+    def popup_anomaly(self):
+        ui = self._derived_popup("평년 편차 열 추가")
+        if ui is None:
+            return
+        pop, opt, _, selected = ui
+
+        smooth_var = tk.IntVar(value=rolling_engine.DEFAULT_SMOOTH)
+        years_var = tk.StringVar(value="")
+        normal_var = tk.BooleanVar(value=False)
+
+        ttk.Label(opt, text="평년값 다듬기(일)").grid(row=0, column=0, sticky="w")
+        ttk.Spinbox(opt, from_=1, to=61, increment=2, textvariable=smooth_var, width=6).grid(
+            row=0, column=1, sticky="w", padx=5)
+        ttk.Label(opt, text="기준 연도").grid(row=1, column=0, sticky="w", pady=(6, 0))
+        ttk.Entry(opt, textvariable=years_var, width=16).grid(row=1, column=1, sticky="w", padx=5, pady=(6, 0))
+        ttk.Label(opt, text="(빈칸 = 전체, 예: 1991-2020)").grid(row=1, column=2, sticky="w", pady=(6, 0))
+        ttk.Checkbutton(opt, text="평년값 열도 추가", variable=normal_var).grid(
+            row=2, column=0, columnspan=3, sticky="w", pady=(6, 0))
+
+        def run():
+            cols = selected()
+            if not cols:
+                return
+            try:
+                years = weather_archive.parse_numbers(years_var.get())
+                smooth = int(smooth_var.get())
+            except (ValueError, tk.TclError) as e:
+                messagebox.showerror("오류", str(e), parent=pop)
+                return
+            with_normal = bool(normal_var.get())
+
+            def make(df, progress):
+                return rolling_engine.derive_anomaly(df, cols, smooth, years, with_normal, progress=progress)
+
+            pop.destroy()
+            self._add_derived_columns("평년 편차 열 추가", make)
+
+        ttk.Button(pop, text="열 추가", command=run).pack(pady=10)
 
+    @timed("강수 발생일 기록", rows=_current_rows)
     def process_rainfall_frequency(self):
         if self.df_current is None:
             return
         try:
-            df = self.df_current.copy()
-            rain_col = "일강수량(mm)"
-            if rain_col not in df.columns:
-                messagebox.showwarning("알림", f"{rain_col} 컬럼이 없습니다.")
+            if wa.RAIN_COL not in self.df_current.columns:
+                messagebox.showwarning("알림", f"{wa.RAIN_COL} 컬럼이 없습니다.")
                 return
-
-            df[rain_col] = pd.to_numeric(df[rain_col], errors="coerce")
-            res = df[df[rain_col] > 0].copy()
-            if "일시" in res.columns:
-                res["일시"] = pd.to_datetime(res["일시"], errors="coerce").dt.date
-            self.display_df_popup(res[["일시", rain_col]].dropna(), "강수 발생일 기록")
+            self.display_df_popup(wa.rainfall_days(self.df_current), "강수 발생일 기록")
         except Exception as e:
             messagebox.showerror("오류", str(e))
 
+    @timed("기온 탐색", rows=_current_rows)
     def explore_avg_temp(self):
         if self.df_current is None:
             return
         try:
-            df = self.df_current.copy()
-            if "일시" not in df.columns or "평균기온(°C)" not in df.columns:
+            if "일시" not in self.df_current.columns or wa.TEMP_COL not in self.df_current.columns:
                 messagebox.showwarning("알림", "일시 / 평균기온(°C) 컬럼이 필요합니다.")
                 return
 
-            df["dt"] = pd.to_datetime(df["일시"], errors="coerce")
-            df = df.dropna(subset=["dt"])
-            # 월(month) 정보는 더 이상 분류 기준에 필요 없으므로 생략하거나 유지해도 무방합니다.
-            df["평균기온(°C)"] = pd.to_numeric(df["평균기온(°C)"], errors="coerce")
-
-            def get_stat(row):
-                t = row["평균기온(°C)"]
-                if pd.isna(t):
-                    return None
-
-                # 요청하신 새로운 기온 기준 적용
-                if t <= 0:
-                    return "매우 추움"
-                elif t <= 10:
-                    return "추움"
-                elif t <= 20:
-                    return "보통"
-                elif t <= 30:
-                    return "더움"
-                else:
-                    return "매우 더움"
-
-            df["상태"] = df.apply(get_stat, axis=1)
-
-            # 상태가 분류된 데이터만 추출
-            res = df[df["상태"].notnull()].copy()
-            res["날짜"] = res["dt"].dt.date
+            if self._by_station():
+                self._run_by_station("기온 탐색", "avg_temp",
+                                     lambda res: self.display_df_popup(res, "기온 탐색 결과 (지점별)"))
+                return
 
-            # 결과 표시 (날짜, 기온, 상태 순)
-            self.display_df_popup(res[["날짜", "평균기온(°C)", "상태"]], "기온 탐색 결과")
+            # 기온 구간 분류 (매우 추움 ~ 매우 더움)
+            res = wa.classify_avg_temp(self.df_current)
+            self.display_df_popup(res, "기온 탐색 결과")
 
             self.log(f"기온 탐색 완료: {len(res)}행 분류됨")
 
@@ -502,107 +1168,83 @@ class WeatherGUI(tk.Toplevel):
             messagebox.showerror("오류", f"기온 탐색 중 오류 발생: {e}")
 
     # -------------------- 판단/상세보기/그래프 (사진 핵심) --------------------
-    def apply_filter(self):
-        if self.df_base is None:
+    @timed("판단 열 추가", rows=_current_rows)
+    def apply_filter(self, use_query: bool = False):
+        if self.df_current is None:
             messagebox.showwarning("알림", "먼저 CSV를 선택하세요.")
             return
 
         col = self.filter_col_var.get().strip()
         op = self.filter_op_var.get().strip()
         val = self.filter_val_var.get().strip()
+        text = self.query_var.get().strip()
 
-        if not col:
-            messagebox.showwarning("알림", "컬럼을 선택하세요.")
-            return
-        if val == "" and op not in ["contains", "in"]:
-            messagebox.showwarning("알림", "값을 입력하세요.")
-            return
+        if use_query:
+            if not text:
+                messagebox.showwarning("알림", "조건식을 입력하세요.")
+                return
+        else:
+            if not col:
+                messagebox.showwarning("알림", "컬럼을 선택하세요.")
+                return
+            if val == "" and op not in ["contains", "in"]:
+                messagebox.showwarning("알림", "값을 입력하세요.")
+                return
 
         try:
-            df = self.df_base.copy()
-            res_name = f"판단({op})"
-            s = df[col]
-
-            if op == "contains":
-                mask = s.astype(str).str.contains(val, na=False)
-
-            elif op == "in":
-                items = [x.strip() for x in val.split(",") if x.strip() != ""]
-                if not items:
-                    raise ValueError("in 연산은 콤마로 구분된 값을 입력하세요. 예: 133,108")
-
-                nums = []
-                all_num = True
-                for it in items:
-                    n = pd.to_numeric(it, errors="coerce")
-                    if pd.isna(n):
-                        all_num = False
-                        break
-                    nums.append(n)
-
-                if all_num:
-                    s_num = pd.to_numeric(s, errors="coerce")
-                    mask = s_num.isin(nums)
-                else:
-                    mask = s.astype(str).isin(items)
-
+            df = self.df_current
+            if use_query:
+                # 한 번 해석한 식 트리를 벡터 연산으로 평가
+                query = compile_query(text, df.columns)
+                res_name = "판단(조건식)"
+                desc = text
             else:
-                s_num = pd.to_numeric(s, errors="coerce")
-                v_num = pd.to_numeric(val, errors="coerce")
-                if pd.isna(v_num) and op in [">", ">=", "<", "<="]:
-                    raise ValueError(">,>=,<,<= 는 숫자 값이 필요합니다.")
-
-                if op == ">":
-                    mask = s_num > v_num
-                elif op == ">=":
-                    mask = s_num >= v_num
-                elif op == "<":
-                    mask = s_num < v_num
-                elif op == "<=":
-                    mask = s_num <= v_num
-                elif op == "==":
-                    if not pd.isna(v_num):
-                        mask = (s_num == v_num)
-                    else:
-                        mask = (s.astype(str) == val)
-                elif op == "!=":
-                    if not pd.isna(v_num):
-                        mask = (s_num != v_num)
-                    else:
-                        mask = (s.astype(str) != val)
-                else:
-                    raise ValueError(f"지원하지 않는 연산자: {op}")
-
-            df[res_name] = np.where(mask, 0, 1)  #  사진처럼 0/1
-
-            self.df_current = df
+                query = Condition(col, op, val)
+                res_name = f"판단({op})"
+                desc = f"{col} {op} {val}"
+
+            mask = query.evaluate(df, self.filter_cache, self.data.version)
+            self.detail_col = query.columns()[0]
+
+            # 같은 이름이 이미 있으면 번호를 붙여 따로 보관 (여러 판단을 나중에 결합 가능)
+            version = self.data.version
+            existing = self.masks.names(version)
+            name, i = res_name, 2
+            while name in existing:
+                name, i = f"{res_name}_{i}", i + 1
+            self.masks.add(name, mask, version=version, desc=desc)
+            self.active_mask = name
+
             self.render_table(self.df_current)  # .head(250)을 삭제하여 전체 표시
             self.hide_right_plot()
             self.clear_plot()
 
-            self.log(f"판단 열 추가: {col} {op} {val} -> {res_name} 생성")
+            self.log(f"판단 열 추가: {desc} -> {name} 생성 (만족 {self.masks.count(name)}행)")
         except Exception as e:
             messagebox.showerror("오류", f"판단 조건을 확인하세요.\n\n{e}")
             self.log(f"판단 실패: {e}")
 
+    @timed("상세보기", rows=_current_rows)
     def show_detailed_view(self):
         if self.df_current is None:
             return
 
-        res_cols = [c for c in self.df_current.columns if "판단(" in c]
-        if not res_cols:
+        version = self.data.version
+        names = self.masks.names(version)
+        if not names:
             messagebox.showwarning("알림", "먼저 '판단 열 추가'를 완료하세요.")
             return
 
-        target_res_col = res_cols[-1]
-        target_val_col = self.filter_col_var.get().strip()
+        target_res_col = self.active_mask if self.active_mask in names else names[-1]
+        target_val_col = self.detail_col or self.filter_col_var.get().strip()
 
         try:
-            df = self.df_current.copy()
-            sub = df[pd.to_numeric(df[target_res_col], errors="coerce") == 0].copy()
-            if sub.empty:
+            df = self.df_current
+            positions = np.flatnonzero(self.masks.get(target_res_col))
+            if len(positions) == 0:
                 messagebox.showinfo("알림", "조건을 만족하는 데이터가 없습니다.")
                 return
+            sub = df.take(positions)
 
             self.show_right_plot()
 
@@ -611,15 +1253,79 @@ class WeatherGUI(tk.Toplevel):
                 display_cols.append("일시")
             if target_val_col in sub.columns:
                 display_cols.append(target_val_col)
-            display_cols.append(target_res_col)
 
-            self.render_table(sub[display_cols])
+            self.render_table(sub[display_cols], mask_names=[target_res_col], positions=positions)
             self.plot_line_chart(sub, target_val_col)
 
             self.log(f"상세보기: {target_res_col} 만족(0) 데이터 {len(sub)}행 표시")
         except Exception as e:
             self.log(f"상세보기 오류: {e}")
 
+    def popup_combine_masks(self):
+        """판단 결과끼리 AND/OR/NOT 결합 (비트 단위 연산이라 행 수와 무관하게 즉시 계산)"""
+        version = self.data.version
+        names = self.masks.names(version)
+        if not names:
+            messagebox.showwarning("알림", "먼저 '판단 열 추가'를 완료하세요.")
+            return
+
+        pop = tk.Toplevel(self)
+        pop.title("판단 결합")
+        pop.geometry("460x420")
+        pop.grab_set()
+
+        ttk.Label(pop, text="결합할 판단 결과를 선택하세요:", font=("맑은 고딕", 10, "bold")).pack(pady=10)
+
+        box = ttk.Frame(pop)
+        box.pack(fill="both", expand=True, padx=20)
+        check_vars = {}
+        for n in names:
+            var = tk.BooleanVar()
+            check_vars[n] = var
+            pm = self.masks.packed(n)
+            ttk.Checkbutton(box, text=f"{n}  [{pm.desc}]  만족 {pm.count()}행", variable=var).pack(anchor="w", pady=2)
+
+        opt = ttk.Frame(pop, padding=10)
+        opt.pack(fill="x")
+        op_var = tk.StringVar(value="and")
+        for text, val in [("AND", "and"), ("OR", "or"), ("NOT", "not")]:
+            ttk.Radiobutton(opt, text=text, value=val, variable=op_var).pack(side="left", padx=4)
+
+        ttk.Label(opt, text="결과 이름").pack(side="left", padx=(12, 4))
+        name_var = tk.StringVar(value=self.masks.unique_name())
+        ttk.Entry(opt, textvariable=name_var, width=14).pack(side="left")
+
+        def execute_combine():
+            chosen = [n for n, v in check_vars.items() if v.get()]
+            out_name = name_var.get().strip()
+            if not out_name:
+                messagebox.showwarning("알림", "결과 이름을 입력하세요.", parent=pop)
+                return
+            try:
+                pm = self.masks.combine(op_var.get(), chosen, out_name)
+            except Exception as e:
+                messagebox.showerror("오류", str(e), parent=pop)
+                return
+
+            self.active_mask = out_name
+            self.render_table(self.df_current)
+            self.log(f"판단 결합: {out_name} = {pm.desc} (만족 {pm.count()}행)")
+            pop.destroy()
+
+        def execute_remove():
+            chosen = [n for n, v in check_vars.items() if v.get()]
+            for n in chosen:
+                self.masks.remove(n)
+            self.render_table(self.df_current)
+            self.log(f"판단 삭제: {', '.join(chosen)}" if chosen else "삭제할 판단을 선택하지 않았습니다.")
+            pop.destroy()
+
+        btn_frame = ttk.Frame(pop, padding=10)
+        btn_frame.pack(fill="x")
+        ttk.Button(btn_frame, text="결합", command=execute_combine).pack(side="right", padx=5)
+        ttk.Button(btn_frame, text="선택 삭제", command=execute_remove).pack(side="right", padx=5)
+        ttk.Button(btn_frame, text="취소", command=pop.destroy).pack(side="right")
+
     def show_right_plot(self):
         self.main_container.columnconfigure(1, weight=3)
         self.main_container.columnconfigure(0, weight=1)
@@ -630,46 +1336,40 @@ class WeatherGUI(tk.Toplevel):
         self.right_area.grid_forget()
         self.main_container.columnconfigure(1, weight=0)
 
+    @timed("선 그래프", rows=_arg_rows)
     def plot_line_chart(self, df: pd.DataFrame, val_col: str):
-        self.clear_plot()
         try:
-            plot_df = df.copy()
-            if "일시" in plot_df.columns:
-                plot_df["일시"] = pd.to_datetime(plot_df["일시"], errors="coerce")
-                plot_df = plot_df.dropna(subset=["일시"]).sort_values("일시")
-                x = plot_df["일시"]
+            y = pd.to_numeric(df[val_col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            if "일시" in df.columns:
+                x = pd.to_datetime(df["일시"], errors="coerce").to_numpy()
+                ok = ~np.isnat(x) & ~np.isnan(y)
             else:
-                x = plot_df.index
-
-            y = pd.to_numeric(plot_df[val_col], errors="coerce")
-            plot_df = plot_df.assign(_y=y).dropna(subset=["_y"])
-
-            fig, ax = plt.subplots(figsize=(10, 6), constrained_layout=True)
-            ax.plot(
-                plot_df["일시"] if "일시" in plot_df.columns else plot_df.index,
-                plot_df["_y"],
-                marker="o",
-            )
-            ax.set_title(f"{val_col} (조건 만족 데이터)")
-            ax.set_xlabel("일시" if "일시" in plot_df.columns else "index")
-            ax.set_ylabel(val_col)
-
-            self.canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-            self.canvas.draw()
-            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+                x = np.arange(len(df), dtype=np.float64)
+                ok = ~np.isnan(y)
+
+            # 같은 Figure/캔버스에 선 값만 바꿔 끼움 (보이는 구간만 화면 폭만큼 솎아서 그림)
+            if self.line_plot is None:
+                self.line_plot = plot_pipeline.LinePlot(self.plot_frame)
+            self.line_plot.series.method = self.decimate_var.get() or "minmax"
+            self.line_plot.show(x[ok], y[ok], title=f"{val_col} (조건 만족 데이터)",
+                                xlabel="일시" if "일시" in df.columns else "index", ylabel=val_col)
+            self.log(f"그래프: {int(ok.sum())}점 중 {self.line_plot.shown}점 표시 ({self.line_plot.series.method})")
         except Exception as e:
             self.log(f"그래프 생성 중 오류: {e}")
 
     def clear_plot(self):
-        if self.canvas is not None:
-            self.canvas.get_tk_widget().destroy()
-            self.canvas = None
+        if self.line_plot is not None:
+            self.line_plot.clear()
 
+    @timed("필터 해제/복구", rows=_current_rows)
     def reset_filter(self):
         if self.df_base is None:
             return
-        self.df_current = self.df_base.copy()
-        self.render_table(self.df_current.head(250))
+        self.masks.clear(self.data.version)
+        self.active_mask = None
+        if not self.data.current_version.committed:
+            self.data.reset_to_base()
+        self.render_table(self.df_current)
         self.clear_plot()
         self.hide_right_plot()
         self.log("필터 해제/복구 완료")
@@ -680,55 +1380,83 @@ class WeatherGUI(tk.Toplevel):
             messagebox.showwarning("알림", "먼저 CSV를 선택하세요.")
             return
 
-        try:
-            df = self.df_current.copy()
+        def work(ctx, df):
+            df = df.copy(deep=False)
+            changed = []
 
-            if "일시" in df.columns:
+            # 스키마로 읽은 열(float32/int16/category/datetime64)은 이미 맞으므로 건너뜀
+            if "일시" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["일시"].dtype):
                 df["일시"] = pd.to_datetime(df["일시"], errors="coerce")
-            if "지점" in df.columns:
+                changed.append("일시")
+            if "지점" in df.columns and not pd.api.types.is_integer_dtype(df["지점"].dtype):
                 df["지점"] = pd.to_numeric(df["지점"], errors="coerce").astype("Int64")
-            if "지점명" in df.columns:
+                changed.append("지점")
+            if "지점명" in df.columns and not isinstance(df["지점명"].dtype, pd.CategoricalDtype):
                 df["지점명"] = df["지점명"].astype("category")
+                changed.append("지점명")
 
-            fixed = {"지점", "지점명", "일시"}
-            for c in df.columns:
-                if c not in fixed:
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
+            fixed = {"지점", "지점명", "일시", "date"}
+            others = [c for c in df.columns if c not in fixed and not pd.api.types.is_numeric_dtype(df[c].dtype)]
+            for i, c in enumerate(others):
+                ctx.progress(i / max(len(others), 1), f"타입 변환: {c}")
+                df[c] = pd.to_numeric(df[c], errors="coerce")
+                changed.append(c)
 
+            # 변환된 열 + 정렬 순서만 delta로 기록
+            steps = [("assign", {c: df[c] for c in changed})] if changed else []
             sort_cols = [c for c in ["지점", "일시"] if c in df.columns]
             if sort_cols:
-                df = df.sort_values(sort_cols).reset_index(drop=True)
-
-            self.df_current = df
-            self.df_base = df.copy()
-
-            self.refresh_filter_columns()
-            self.render_table(self.df_current.head(250))
-
-            self.clear_plot()
-            self.hide_right_plot()
-
-            self.log("전처리(타입변환+정렬) 완료")
-            messagebox.showinfo("완료", "타입 변환 및 정렬 완료(미리보기 250행 표시).")
-        except Exception as e:
+                ctx.progress(0.95, "정렬")
+                # 정렬 자체는 한 번의 호출이라 중간에 멈출 수 없음 → 끝난 직후 취소 확인
+                order = df[sort_cols].reset_index(drop=True).sort_values(sort_cols).index.to_numpy()
+                ctx.check()
+                df = df.take(order).reset_index(drop=True)
+                steps.append(("take", order, True))
+            return df, steps
+
+        def done(res):
+            df, steps = res
+            self.data.apply("타입변환+정렬", steps, frame=df)
+            self._show_current("전처리(타입변환+정렬) 완료")
+            messagebox.showinfo("완료", "타입 변환 및 정렬 완료.")
+
+        def failed(e):
             messagebox.showerror("전처리 실패", f"타입 변환/정렬 중 오류:\n{e}")
             self.log(f"전처리 실패: {e}")
 
+        self.jobs.submit("타입변환+정렬", work, self.df_current, key="data", on_done=done, on_error=failed,
+                         rows=len(self.df_current))
+
     def save_current_csv(self):
         if self.df_current is None:
             messagebox.showwarning("알림", "저장할 데이터가 없습니다.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+        # 형식은 확장자로 선택 (csv / csv.gz / csv.zst / parquet / feather / npz, 패키지가 있는 것만)
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=export_pipeline.filetypes())
         if not path:
             return
-        try:
-            self.df_current.to_csv(path, index=False, encoding="utf-8-sig")
-            self.log(f"현재 데이터 저장: {path} (rows={len(self.df_current)})")
+        fmt = export_pipeline.format_for_path(path)
+
+        def work(ctx, df, extra):
+            # 조각 단위로 임시 파일에 쓰고 끝나면 이름 교체 (취소/실패 시 기존 파일 유지)
+            return export_pipeline.export_frame(df, path, fmt, extra_columns=extra, progress=ctx.progress)
+
+        def done(n_rows):
+            self.log(f"현재 데이터 저장: {path} ({fmt}, rows={n_rows})")
             messagebox.showinfo("완료", f"저장 완료:\n{path}")
-        except Exception as e:
-            messagebox.showerror("저장 실패", f"CSV 저장 중 오류:\n{e}")
+
+        def failed(e):
+            messagebox.showerror("저장 실패", f"저장 중 오류:\n{e}")
             self.log(f"저장 실패: {e}")
 
+        # 판단 결과는 저장할 때만 0/1 열로 풀어서, 표를 복사하지 않고 조각마다 붙여서 저장
+        df = self.df_current
+        extra = self.masks.materialize_columns(self.data.version)
+
+        # 저장은 제출 시점의 데이터를 그대로 쓰면 되므로 guard 없이 실행
+        self.jobs.submit("데이터 저장", work, df, extra, on_done=done, on_error=failed, use_guard=False, rows=len(df))
+
+    @timed("결과 창 표시", rows=_arg_rows)
     def display_df_popup(self, df: pd.DataFrame, title: str):
         top = tk.Toplevel(self)
         top.title(title)
@@ -745,9 +1473,9 @@ class WeatherGUI(tk.Toplevel):
         h_scroll = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
         tree.configure(xscrollcommand=h_scroll.set)
 
-        # 4. 세로 스크롤바 생성
-        v_scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=v_scroll.set)
+        # 4. 세로 스크롤바 생성 (가상 표시)
+        v_scroll = ttk.Scrollbar(frame, orient="vertical")
+        vtable = VirtualTable(tree, v_scroll, self._display_name_fix, self._column_width)
 
         # 5. Grid 레이아웃으로 배치 (스크롤바 위치를 잡기 위해 grid 권장)
         tree.grid(row=0, column=0, sticky="nsew")
@@ -758,24 +1486,9 @@ class WeatherGUI(tk.Toplevel):
         frame.grid_rowconfigure(0, weight=1)
         frame.grid_columnconfigure(0, weight=1)
 
-        # 6. 컬럼 헤더 설정 및 가로 스크롤 활성화 (stretch=False가 핵심)
-        for c in df.columns:
-            header = self._display_name_fix(c)
-            tree.heading(c, text=header)
-
-            # 기본 너비 설정
-            w = 120
-            if c in ["평균 상대습도(%)", "평균상대습도(%)"]:
-                w = 170
-
-            # stretch=False로 설정해야 각 열이 고유 너비를 유지하여 가로 스크롤이 생깁니다.
-            tree.column(c, anchor="center", width=w, stretch=False)
-
-        # 7. 데이터 삽입
-        for _, r in df.iterrows():
-            # NaN 값은 빈 문자열로 처리하여 가독성 향상
-            values = [r[c] if not pd.isna(r[c]) else "" for c in df.columns]
-            tree.insert("", "end", values=values)
+        # 6. 컬럼 헤더/너비 설정 + 데이터 연결 (보이는 행만 채움, 헤더 클릭 = 정렬)
+        vtable.set_data(df)
+        top.bind("<Control-g>", lambda e: self.ask_goto_row(vtable, parent=top))
     # -------------------- 히트맵 --------------------
     def plot_season_heatmaps(self):
         if self.df_current is None:
@@ -786,99 +1499,82 @@ class WeatherGUI(tk.Toplevel):
             messagebox.showerror("오류", "‘일시’ 컬럼이 없어 히트맵을 생성할 수 없습니다.")
             return
 
+        # Tk 변수는 메인 스레드에서 미리 읽어 둠
+        params = {
+            "nonnull_ratio": float(self.nonnull_ratio_var.get()),
+            "k": int(self.k_var.get()),
+            "method": (self.method_var.get().strip() or "pearson"),
+            "min_rows": int(self.min_rows_season_var.get()),
+            "annot_thr": float(self.annot_thr_var.get()),
+            "version": self.data.version,
+        }
+        if self._by_station():
+            # 지점이 많으면 히트맵 대신 지점 × 계절 × 변수쌍 상관계수 표 하나로
+            self._run_by_station("계절 상관", "season_corr", lambda res: self.display_df_popup(
+                res.round({"r": 3}), f"계절별 상관계수 (지점별, k={params['k']}, {params['method']})"), params)
+            return
+        key = (params["version"], params["k"], params["method"], params["nonnull_ratio"],
+               params["min_rows"], params["annot_thr"])
+        png = self.heatmap_images.get(key)
+        if png is not None:
+            self.heatmap_images.move_to_end(key)
+            self._show_season_heatmaps(png, params)
+            self.log("히트맵: 같은 데이터/설정 → 저장해 둔 이미지 사용")
+            return
+
+        def failed(e):
+            messagebox.showerror("히트맵 오류", f"처리 중 오류 발생:\n{e}")
+            self.log(f"히트맵 오류: {e}")
+
+        def done(png):
+            self._store_heatmap(key, png)
+            self._show_season_heatmaps(png, params)
+
+        self.jobs.submit("계절 히트맵", self._render_season_heatmaps, self.df_current, params, key="heatmap",
+                         on_done=done, on_error=failed, rows=len(self.df_current))
+
+    def _store_heatmap(self, key, png: bytes):
+        self.heatmap_images[key] = png
+        self.heatmap_images.move_to_end(key)
+        while len(self.heatmap_images) > 8:
+            self.heatmap_images.popitem(last=False)
+
+    def _compute_season_corr(self, ctx, df: pd.DataFrame, params: dict) -> dict:
+        """(작업 스레드) 상관 상위 k개 컬럼 선택 + 계절별 상관행렬 계산"""
+        return wa.season_correlations(
+            df, params["k"], params["method"], params["nonnull_ratio"], params["min_rows"],
+            engine=self.corr_engine, version=params["version"], progress=ctx.progress,
+        )
+
+    def _render_season_heatmaps(self, ctx, df: pd.DataFrame, params: dict) -> bytes:
+        """(작업 스레드) 상관행렬(CorrEngine 캐시) + Agg 버퍼에 그려서 PNG 바이트로"""
+        res = self._compute_season_corr(ctx, df, params)
+        ctx.progress(None, "히트맵 그리기")
+        return wa.render_season_png(res, params["method"], params["annot_thr"])
+
+    @timed("히트맵 표시")
+    def _show_season_heatmaps(self, png: bytes, params: dict):
+        """PNG를 히트맵 창에 표시 (창이 열려 있으면 새로 만들지 않고 그림만 교체)"""
         try:
-            df = self.df_current.copy()
-            df["월"] = pd.to_datetime(df["일시"], errors="coerce").dt.month
-
-            def get_season(m):
-                if m in (3, 4, 5): return "봄"
-                if m in (6, 7, 8): return "여름"
-                if m in (9, 10, 11): return "가을"
-                return "겨울"
-
-            df["계절"] = df["월"].apply(get_season)
-
-            num_df = df.select_dtypes(include=[np.number]).copy()
-            num_df = num_df.drop(columns=["월", "지점"], errors="ignore")
-
-            nonnull_ratio = float(self.nonnull_ratio_var.get())
-            k = int(self.k_var.get())
-            method = (self.method_var.get().strip() or "pearson")
-            min_rows = int(self.min_rows_season_var.get())
-            annot_thr = float(self.annot_thr_var.get())
-
-            valid_cols = [
-                c for c in num_df.columns
-                if num_df[c].notna().sum() >= int(len(num_df) * nonnull_ratio)
-            ]
-            if len(valid_cols) < 2:
-                raise ValueError("유효한 숫자 컬럼이 너무 부족합니다. (유효비율을 낮추거나 k를 줄이기)")
-
-            base_corr = num_df[valid_cols].corr(method=method)
-            abs_base = base_corr.abs().where(~np.eye(len(base_corr), dtype=bool), np.nan)
-            mean_abs = abs_base.mean(axis=1).sort_values(ascending=False)
-            selected_cols = mean_abs.head(min(k, len(mean_abs))).index.tolist()
-            selected_cols = [c for c in selected_cols if c not in ["월", "지점"]]
-
-            pretty_labels = [strip_unit(c) for c in selected_cols]
-
-            plot_window = tk.Toplevel(self)
-            plot_window.title("계절별 상관 히트맵 상세 분석")
-            plot_window.geometry("1100x900")
-            plot_window.minsize(900, 700)
-
-            fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-            fig.suptitle(
-                f"계절별 상관 히트맵 (method={method}, k={len(selected_cols)})",
-                fontsize=16,
-                fontweight="bold"
-            )
-
-            fig.subplots_adjust(left=0.08, right=0.90, top=0.92, bottom=0.10, wspace=0.35, hspace=0.25)
-
-            seasons_pos = {(0, 0): "봄", (0, 1): "여름", (1, 0): "가을", (1, 1): "겨울"}
-            last_im = None
-
-            for (r, c), s_name in seasons_pos.items():
-                ax = axes[r][c]
-                s_data = num_df[df["계절"] == s_name][selected_cols]
-
-                if len(s_data) < min_rows:
-                    ax.text(
-                        0.5, 0.5,
-                        f"{s_name}\n(데이터 부족: n={len(s_data)})",
-                        ha="center", va="center", fontsize=12
-                    )
-                    ax.set_axis_off()
-                    continue
-
-                corr_mat = s_data.corr(method=method)
-                last_im = ax.imshow(corr_mat.values, vmin=-1, vmax=1, cmap="coolwarm")
-
-                ax.set_title(f"{s_name} (데이터 수: {len(s_data)})", fontsize=12, fontweight="bold")
-                ax.set_aspect("auto")
-                ax.set_anchor("C")
-                ax.margins(0)
-
-                ax.set_xticks(range(len(selected_cols)))
-                ax.set_yticks(range(len(selected_cols)))
-                ax.set_xticklabels(pretty_labels, rotation=35, ha="right", fontsize=9)
-                ax.set_yticklabels(pretty_labels, fontsize=9)
-
-                for i in range(len(selected_cols)):
-                    for j in range(len(selected_cols)):
-                        val = corr_mat.iloc[i, j]
-                        if np.isnan(val):
-                            continue
-                        if i == j or abs(val) >= annot_thr:
-                            ax.text(j, i, f"{val:.2f}", ha="center", va="center", fontsize=8)
-
-            if last_im is not None:
-                fig.colorbar(last_im, ax=axes, shrink=0.75)
-
-            canvas = FigureCanvasTkAgg(fig, master=plot_window)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            win = self.heatmap_window
+            if win is None or not win.winfo_exists():
+                win = self.heatmap_window = tk.Toplevel(self)
+                win.geometry("1100x920")
+                win.minsize(900, 700)
+                bar = ttk.Frame(win)
+                bar.pack(side=tk.BOTTOM, fill=tk.X, padx=6, pady=4)
+                ttk.Button(bar, text="PNG 저장", command=lambda: self._save_heatmap_png(win)).pack(side=tk.RIGHT)
+                win.image_label = ttk.Label(win, anchor="center")
+                win.image_label.pack(fill=tk.BOTH, expand=True)
+
+            win.title(f"계절별 상관 히트맵 상세 분석 (k={params['k']}, {params['method']}, "
+                      f"표시 |r|≥{params['annot_thr']})")
+            image = tk.PhotoImage(master=win, data=base64.b64encode(png).decode("ascii"))
+            # PhotoImage는 참조가 없어지면 지워지므로 창에 붙잡아 둠
+            win.image_label.configure(image=image)
+            win.image_label.image = image
+            win.png = png
+            win.lift()
 
             self.log("히트맵 생성 완료: 별도 창에서 확인 가능")
 
@@ -886,6 +1582,17 @@ class WeatherGUI(tk.Toplevel):
             messagebox.showerror("히트맵 오류", f"처리 중 오류 발생:\n{e}")
             self.log(f"히트맵 오류: {e}")
 
+    def _save_heatmap_png(self, win):
+        path = filedialog.asksaveasfilename(parent=win, defaultextension=".png", filetypes=[("PNG", "*.png")])
+        if not path:
+            return
+        try:
+            with open(path, "wb") as f:
+                f.write(win.png)
+            self.log(f"히트맵 저장: {path}")
+        except Exception as e:
+            messagebox.showerror("저장 실패", str(e), parent=win)
+
 
 #  단독 실행용(필요하면)
 if __name__ == "__main__":
@@ -1,52 +1,108 @@
+from __future__ import annotations
+
 import sys
 import glob
 import importlib.util
+import threading
 from pathlib import Path
 from tkinter import ttk
 import os
 import re
 import calendar
+from collections import OrderedDict
 from datetime import date
 
-import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
 
+from lazy_import import lazy_import, preload
+from jobs import JobRunner
+
+# pandas/NumPy를 쓰는 모듈은 처음 쓸 때 import (창을 먼저 띄우기 위해)
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+weather_cache = lazy_import("weather_cache")
+date_index = lazy_import("date_index")
+dataset_registry = lazy_import("dataset_registry")
+export_store = lazy_import("export_store")
+export_pipeline = lazy_import("export_pipeline")
+asos_schema = lazy_import("asos_schema")
+weather_archive = lazy_import("weather_archive")
+
 
 # 0) CSV 로드 + 전처리
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_FILE = os.path.join(BASE_DIR, "OBS_ASOS_DD_20260115112034.csv")
+EXPORT_DIR = os.path.join(BASE_DIR, "exports")
+EXPORT_DB = os.path.join(EXPORT_DIR, "weather_exports.sqlite")
 
+# 달력/상세 보기용 파생 열 (로드할 때 한 번 계산해서 캐시에 같이 저장)
+EMOJI_COL = "날씨"
+SUMMARY_COL = "요약"
+DERIVED_COLUMNS = [EMOJI_COL, SUMMARY_COL]
+EMOJIS = ["☀️", "🌧️", "🌫️", "❄️"]
+# 적설: ASOS 일자료는 '일 최심적설(cm)', 예전 코드는 '합계 일적설(cm)'을 봤음 (있는 쪽 사용)
+SNOW_COLUMNS = ["일 최심적설(cm)", "합계 일적설(cm)"]
+# _prepare_weather_df 결과 형식이 바뀌면 올림 (예전 .weather.cache.npz는 다시 만듦)
+PREPARE_VERSION = 3
 
-def load_weather_df(csv_path: str) -> pd.DataFrame:
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다:\n{csv_path}")
-
-    # ASOS CSV는 보통 cp949 (안 열리면 'euc-kr')
-    df = pd.read_csv(csv_path, encoding="cp949")
 
+def _prepare_weather_df(df: pd.DataFrame) -> pd.DataFrame:
     # 컬럼명 앞뒤 공백/줄바꿈 제거
     df.columns = df.columns.astype(str).str.strip()
 
     if "일시" not in df.columns:
         raise KeyError("CSV에 '일시' 컬럼이 없습니다. 파일/컬럼명을 확인하세요.")
 
-    df["일시"] = pd.to_datetime(df["일시"], errors="coerce")
+    # 관측값 float32, 지점 int16, 지점명 category, 일시 datetime64[s] (asos_schema)
+    df = asos_schema.apply_schema(df)
     if df["일시"].isna().any():
         bad = df[df["일시"].isna()].head(5)
         raise ValueError(f"일시 datetime 변환 실패 행이 있어요. 예시:\n{bad}")
 
-    df["date"] = df["일시"].dt.date
-
     # 강수량: 숫자화 + NaN -> 0
     if "일강수량(mm)" in df.columns:
-        df["일강수량(mm)"] = pd.to_numeric(df["일강수량(mm)"], errors="coerce").fillna(0)
+        df["일강수량(mm)"] = df["일강수량(mm)"].fillna(0)
     else:
         pass
 
+    # 이모지/요약은 전체 행을 한 번에 계산해서 열로 (캐시에 함께 저장됨)
+    for col, values in derive_columns(df).items():
+        df[col] = values
+
+    return df
+
+
+def load_weather_df(csv_path: str, use_cache: bool = True, rebuild_cache: bool = False) -> pd.DataFrame:
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다:\n{csv_path}")
+
+    # ASOS CSV는 보통 cp949 (안 열리면 'euc-kr')
+    # 전처리 결과는 CSV 옆 캐시(.weather.cache.npz)에 저장해 두고, 파일이 그대로면 재사용
+    if use_cache or rebuild_cache:
+        df, _ = weather_cache.read_csv_cached(csv_path, encoding="cp949", tag="weather",
+                                              prepare=_prepare_weather_df, rebuild=rebuild_cache,
+                                              version=PREPARE_VERSION, reader=asos_schema.read_csv)
+    else:
+        df = _prepare_weather_df(asos_schema.read_csv(csv_path, encoding="cp949"))
+
+    # date는 일시와 같은 datetime64 버퍼 (행마다 datetime.date 객체를 만들지 않음)
+    df["date"] = df["일시"]
     return df
 
 
+def prepare_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """공유 데이터에 추가할 행을 load_weather_df와 같은 형태로"""
+    df = _prepare_weather_df(df.copy(deep=False))
+    df["date"] = df["일시"]
+    return df
+
+
+def rebuild_weather_cache(csv_path: str) -> str:
+    load_weather_df(csv_path, rebuild_cache=True)
+    return weather_cache.cache_path_for(csv_path, "weather")
+
+
 # 1) 날짜 입력
 def parse_date_input(date_text: str):
 
@@ -88,29 +144,192 @@ def parse_date_input(date_text: str):
     return dt.date()
 
 
+def parse_date_query(text: str):
+    """검색창 입력 -> (종류, 값)
+
+    20250301                  -> ("day", date)
+    20250301~20250331         -> ("range", (시작, 끝))
+    20250301,20250305,...     -> ("list", [date, ...])
+    2025-03                   -> ("month", (2025, 3))
+    2025-W10                  -> ("week", (2025, 10))   ISO 주(월~일)
+    *-03-01 / 03-01           -> ("yearly", (3, 1))     매년 같은 날
+    """
+    s = str(text or "").strip()
+    if "~" in s:
+        start, _, end = s.partition("~")
+        start, end = parse_date_input(start), parse_date_input(end)
+        if start > end:
+            start, end = end, start
+        return "range", (start, end)
+    if "," in s:
+        days = [parse_date_input(p) for p in s.split(",") if p.strip()]
+        if not days:
+            raise ValueError("날짜 입력이 비었습니다.")
+        return "list", days
+
+    m = re.fullmatch(r"(\d{4})[-/.]?[Ww](\d{1,2})", s)
+    if m:
+        year, week = int(m.group(1)), int(m.group(2))
+        try:
+            date.fromisocalendar(year, week, 1)
+        except ValueError:
+            raise ValueError(f"없는 주입니다: {s}") from None
+        return "week", (year, week)
+
+    m = re.fullmatch(r"(\d{4})[-/.](\d{1,2})", s)
+    if m:
+        year, month = int(m.group(1)), int(m.group(2))
+        if not 1 <= month <= 12:
+            raise ValueError(f"없는 달입니다: {s}")
+        return "month", (year, month)
+
+    m = re.fullmatch(r"(?:\*[-/.]?)?(\d{1,2})[-/.](\d{1,2})", s)
+    if m:
+        month, day = int(m.group(1)), int(m.group(2))
+        if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(2000, month)[1]:
+            raise ValueError(f"없는 날짜입니다: {s}")
+        return "yearly", (month, day)
+
+    return "day", parse_date_input(s)
+
+
+def describe_query(kind: str, value) -> str:
+    if kind == "day":
+        return str(value)
+    if kind == "range":
+        return f"{value[0]} ~ {value[1]}"
+    if kind == "list":
+        return ", ".join(str(d) for d in value[:5]) + (f" 외 {len(value) - 5}일" if len(value) > 5 else "")
+    if kind == "month":
+        return f"{value[0]}년 {value[1]}월"
+    if kind == "week":
+        return f"{value[0]}년 {value[1]}주차"
+    return f"매년 {value[0]}월 {value[1]}일"
+
+
 # 2) 날짜로 검색
-def find_by_date(df: pd.DataFrame, date_text: str) -> pd.DataFrame:
+def find_by_date(df: pd.DataFrame, date_text: str, index: date_index.DateIndex = None) -> pd.DataFrame:
     target = parse_date_input(date_text)
-    return df[df["date"] == target].copy()
+    if index is None:
+        return df[df["date"] == pd.Timestamp(target)].copy()
+    # 날짜 색인이 있으면 전체 스캔 없이 이진 탐색
+    return index.rows(df, target)
+
+
+def query_positions(index: date_index.DateIndex, kind: str, value):
+    """정렬 색인에서 구간을 잘라서 행 위치 (날짜순)"""
+    if kind == "day":
+        return index.positions(value)
+    if kind == "range":
+        return index.range_positions(*value)
+    if kind == "list":
+        return index.positions_many(value)
+    if kind == "month":
+        return index.month_positions(*value)
+    if kind == "week":
+        return index.week_positions(*value)
+    return index.same_day_positions(*value)
+
+
+def query_years(kind: str, value, known) -> list:
+    """검색에 필요한 연도 (아카이브에서 이 연도 조각만 읽음)"""
+    known = sorted(known)
+    if kind == "day":
+        years = {value.year}
+    elif kind == "range":
+        years = set(range(value[0].year, value[1].year + 1))
+    elif kind == "list":
+        years = {d.year for d in value}
+    elif kind == "month":
+        years = {value[0]}
+    elif kind == "week":
+        # 1주차/마지막 주는 앞뒤 해에 걸칠 수 있음
+        years = {value[0] - 1, value[0], value[0] + 1}
+    else:
+        return known
+    return [y for y in known if y in years]
+
+
+def find_by_query(df: pd.DataFrame, text: str, index: date_index.DateIndex = None):
+    """기간/목록/월/주/매년 같은 날 검색 -> (결과 DataFrame, 종류, 값)"""
+    kind, value = parse_date_query(text)
+    if index is None:
+        index = date_index.DateIndex.from_df(df)
+    return df.iloc[query_positions(index, kind, value)], kind, value
 
 
 # 3) 검색 결과 CSV 저장
-def save_result_csv(result_df: pd.DataFrame, export_dir="exports", prefix="daejeon_weather") -> str:
+def save_result_csv(result_df: pd.DataFrame, export_dir="exports", prefix="daejeon_weather", progress=None) -> str:
     if result_df is None or result_df.empty:
         raise ValueError("저장할 검색 결과가 없습니다(빈 결과).")
 
     export_path = os.path.join(BASE_DIR, export_dir)
     os.makedirs(export_path, exist_ok=True)
 
-    d = result_df["date"].iloc[0]
-    out_file = f"{prefix}_{d}.csv"
+    first, last = day_text(result_df["date"].min()), day_text(result_df["date"].max())
+    out_file = f"{prefix}_{first}.csv" if first == last else f"{prefix}_{first}_{last}.csv"
     full_path = os.path.join(export_path, out_file)
 
-    result_df.to_csv(full_path, index=False, encoding="utf-8-sig")
+    # 기간 검색 결과도 날짜별로 나누지 않고 파일 하나에 조각 단위로 씀 (임시 파일 -> 이름 교체)
+    export_pipeline.export_frame(result_df, full_path, "csv", chunk_rows=50_000, progress=progress)
     return full_path
 
 
+def save_result(result_df: pd.DataFrame, store, write_csv: bool = False, progress=None):
+    """검색 결과를 저장소(SQLite)에 저장, write_csv면 예전처럼 날짜별 CSV도 -> (저장 번호, CSV 경로)"""
+    csv_path = save_result_csv(result_df, progress=progress) if write_csv else None
+    return store.save(result_df, csv_path=csv_path), csv_path
+
+
+def import_legacy_exports(store, export_dir: str = EXPORT_DIR, prefix: str = "daejeon_weather"):
+    """exports/{prefix}_*.csv 중 아직 저장소에 없는 파일만 옮겨 담음 -> (옮긴 수, 건너뛴 수)
+
+    - save_result_csv가 만든 이름만 (보고서 등 다른 CSV는 보지 않음)
+    - 빈 파일/읽지 못한 파일은 저장소에 기록해 두고, 수정되기 전까지 다시 읽지 않음
+    - 파일 하나가 실패해도 나머지는 계속
+    """
+    files = sorted(glob.glob(os.path.join(export_dir, f"{prefix}_*.csv")))
+    if not files:
+        return 0, 0
+    known = set(store.list()["csv_path"].dropna())
+    skipped = store.skipped()
+    n = n_skipped = 0
+    for fp in files:
+        if fp in known:
+            continue
+        if fp in skipped:
+            try:
+                if os.stat(fp).st_mtime_ns == skipped[fp]:
+                    continue
+            except OSError:
+                continue
+        try:
+            saved = store.import_csv(fp)
+        except Exception as e:
+            store.mark_skipped(fp, f"{type(e).__name__}: {e}")
+            saved = None
+        if saved is None:
+            n_skipped += 1
+        else:
+            n += 1
+    return n, n_skipped
+
+
 # 4) UI 표시용 유틸
+def day_text(v) -> str:
+    """date 열 값(datetime64) -> 'YYYY-MM-DD'"""
+    return pd.Timestamp(v).strftime("%Y-%m-%d")
+
+
+def row_at(df: pd.DataFrame, pos: int) -> pd.Series:
+    """pos번째 행 (float32 값은 짧은 표기 그대로 float로, df.iloc[pos]처럼 25.299999...가 되지 않게)"""
+    values = np.empty(len(df.columns), dtype=object)
+    for i, c in enumerate(df.columns):
+        v = df[c].iat[pos]
+        values[i] = float(str(v)) if isinstance(v, np.float32) else v
+    return pd.Series(values, index=df.columns)
+
+
 def safe_value(row: pd.Series, col: str, default="-"):
     if col not in row.index:
         return default
@@ -121,7 +340,7 @@ def safe_value(row: pd.Series, col: str, default="-"):
 
 
 def make_summary_text(result_df: pd.DataFrame) -> str:
-    row = result_df.iloc[0]
+    row = row_at(result_df, 0)
 
     items = [
         ("평균기온(°C)", "평균기온(°C)"),
@@ -134,13 +353,12 @@ def make_summary_text(result_df: pd.DataFrame) -> str:
         ("합계 일조시간(hr)", "합계 일조시간(hr)"),
     ]
 
-    lines = [f" 검색 성공: {row['date']}", ""]
+    lines = [f" 검색 성공: {day_text(row['date'])}", ""]
     for label, col in items:
         val = safe_value(row, col, default="-")
         if col == "일강수량(mm)" and val != "-":
             try:
-                val = float(val)
-                if val == 0.0:
+                if float(val) == 0.0:
                     val = 0
             except Exception:
                 pass
@@ -148,6 +366,34 @@ def make_summary_text(result_df: pd.DataFrame) -> str:
     return "\n".join(lines)
 
 
+def make_range_summary_text(result_df: pd.DataFrame, label: str) -> str:
+    """여러 날 검색 결과 요약 (평균/최고/최저/강수 합계)"""
+    n_days = result_df["date"].nunique()
+    lines = [f" 검색 성공: {label} ({n_days}일, {len(result_df)}행)", ""]
+
+    def col(name):
+        return pd.to_numeric(result_df[name], errors="coerce") if name in result_df.columns else None
+
+    avg = col("평균기온(°C)")
+    if avg is not None and avg.notna().any():
+        lines.append(f"- 평균기온: {avg.mean():.1f}℃")
+    tmax = col("최고기온(°C)")
+    if tmax is not None and tmax.notna().any():
+        i = tmax.fillna(-1e9).to_numpy().argmax()
+        lines.append(f"- 최고기온: {tmax.iloc[i]:.1f}℃ ({day_text(result_df['date'].iloc[i])})")
+    tmin = col("최저기온(°C)")
+    if tmin is not None and tmin.notna().any():
+        i = tmin.fillna(1e9).to_numpy().argmin()
+        lines.append(f"- 최저기온: {tmin.iloc[i]:.1f}℃ ({day_text(result_df['date'].iloc[i])})")
+    rain = col("일강수량(mm)")
+    if rain is not None:
+        lines.append(f"- 강수량 합계: {rain.sum():.1f}mm (강수일 {int((rain > 0).sum())}일)")
+    hum = col("평균 상대습도(%)")
+    if hum is not None and hum.notna().any():
+        lines.append(f"- 평균 상대습도: {hum.mean():.1f}%")
+    return "\n".join(lines)
+
+
 # 5) 달력: 계절 테마 + 이모지/요약
 def season_from_month(month: int) -> str:
     if month in (3, 4, 5):
@@ -171,7 +417,7 @@ def get_emoji_for_day(row: pd.Series) -> str:
     # 비/안개/눈 판단 (없으면 맑음)
     rain = row.get("일강수량(mm)", 0)
     fog = row.get("안개 계속시간(hr)", 0)
-    snow = row.get("합계 일적설(cm)", 0)  # 파일에 없을 수도 있음
+    snow = next((row[c] for c in SNOW_COLUMNS if c in row.index), 0)  # 파일에 없을 수도 있음
 
     try:
         rain = 0 if pd.isna(rain) else float(rain)
@@ -233,24 +479,137 @@ def build_day_summary(row: pd.Series) -> str:
     return temp_text
 
 
+def _num(df: pd.DataFrame, col: str, default=None) -> np.ndarray:
+    """열 -> float 배열 (없으면 default(None이면 NaN)로 채움, 숫자가 아니면 NaN)"""
+    if col not in df.columns:
+        return np.full(len(df), np.nan if default is None else default, dtype=float)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def _format_unique(values: np.ndarray, fmt) -> np.ndarray:
+    """숫자 배열 -> 문자열 배열 (고유값만 포맷하고 나머지는 인덱싱, 소수 한 자리 자료라 고유값이 적음)"""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    texts = np.asarray([fmt(v) for v in uniques.tolist()] or [""], dtype=str)
+    return texts[inverse.reshape(-1)]
+
+
+def day_emojis(rows: pd.DataFrame) -> np.ndarray:
+    """get_emoji_for_day를 여러 행에 한 번에 (우선순위: 눈 > 안개 > 비 > 맑음)"""
+    rain = np.nan_to_num(_num(rows, "일강수량(mm)", 0))
+    fog = np.nan_to_num(_num(rows, "안개 계속시간(hr)", 0))
+    snow_col = next((c for c in SNOW_COLUMNS if c in rows.columns), SNOW_COLUMNS[0])
+    snow = np.nan_to_num(_num(rows, snow_col, 0))
+    return np.select([snow > 0, fog > 0, rain > 0], ["❄️", "🌫️", "🌧️"], default="☀️")
+
+
+def day_summaries(rows: pd.DataFrame) -> np.ndarray:
+    """build_day_summary를 여러 행에 한 번에 (숫자 변환/문자열 결합 모두 열 단위)"""
+    tmax = _num(rows, "최고기온(°C)")
+    tmin = _num(rows, "최저기온(°C)")
+    rain = np.nan_to_num(_num(rows, "일강수량(mm)", 0))
+
+    one_decimal = "{:.1f}".format
+    temp = np.char.add(np.char.add(_format_unique(tmax, one_decimal), "/"),
+                       np.char.add(_format_unique(tmin, one_decimal), "℃"))
+    temp = np.where(np.isnan(tmax) | np.isnan(tmin), "-", temp)
+
+    rain_text = _format_unique(rain, lambda v: f"{int(v)}" if v.is_integer() else f"{v:.1f}")
+    with_rain = np.char.add(np.char.add(temp, "\n☔ "), np.char.add(rain_text, "mm"))
+    return np.where(rain > 0, with_rain, temp)
+
+
+def derive_columns(rows: pd.DataFrame) -> dict:
+    """파생 열 {열 이름: 값} (로드 캐시, 공유 데이터 행 추가/수정에서 같이 사용)"""
+    return {
+        EMOJI_COL: pd.Categorical(day_emojis(rows), categories=EMOJIS),
+        SUMMARY_COL: day_summaries(rows).astype(object),
+    }
+
+
+def month_cells(df: pd.DataFrame, index: date_index.DateIndex, year: int, month: int) -> dict:
+    """한 달 치 달력 칸 내용 {날짜: (이모지, 요약, 행 위치)} (날짜별 첫 행 기준)"""
+    last_day = calendar.monthrange(year, month)[1]
+    days, positions = index.first_positions_between(date(year, month, 1), date(year, month, last_day))
+    if not len(days):
+        return {}
+    rows = df.iloc[positions]
+    if all(c in rows.columns for c in DERIVED_COLUMNS):
+        # 로드할 때 계산해 둔 열을 그대로 사용
+        emojis, summaries = rows[EMOJI_COL].astype(object).to_numpy(), rows[SUMMARY_COL].to_numpy()
+    else:
+        emojis, summaries = day_emojis(rows), day_summaries(rows)
+    return dict(zip(days, zip(emojis.tolist(), summaries.tolist(), positions.tolist())))
+
+
+# 5) 연간 분석 모듈 (한 번만 import해서 재사용)
+_year_module = None
+_year_lock = threading.Lock()
+
+
+def find_year_module_path() -> Path:
+    base = Path(__file__).resolve().parent
+    candidates = [
+        base / "1year weather.py",
+        base / "year_weather.py",
+        base / "UI" / "1year weather.py",
+    ]
+    for p in candidates:
+        if p.exists():
+            return p
+    raise FileNotFoundError("1year weather.py 파일을 찾을 수 없습니다.")
+
+
+def load_year_module():
+    """1year weather.py를 처음 한 번만 실행하고 이후에는 같은 모듈을 돌려줌 (백그라운드 미리 읽기와 공유)"""
+    global _year_module
+    with _year_lock:
+        if _year_module is None:
+            spec = importlib.util.spec_from_file_location("year_weather", find_year_module_path())
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules["year_weather"] = module
+            _year_module = module
+        return _year_module
+
+
+def preload_year_module():
+    """창이 뜬 뒤 백그라운드에서 미리 import (matplotlib 등 무거운 import를 클릭 전에 끝냄)
+
+    실패하면 버튼을 눌렀을 때 다시 시도하며 오류를 보여 줌
+    """
+    return preload(load_year_module, name="preload-year")
+
+
 # 6) Tkinter 앱
 class WeatherApp:
-    def __init__(self, root: tk.Tk, df: pd.DataFrame):
+    def __init__(self, root: tk.Tk, df: pd.DataFrame = None, csv_path: str = None, archive_dir: str = None,
+                 station: int = None):
+        """df를 주지 않으면 창을 먼저 띄우고 csv_path를 백그라운드에서 읽음
+
+        archive_dir: 여러 해 아카이브(weather_archive) 폴더, station 지점만 필요한 연도씩 읽음
+        """
         self.root = root
-        self.df = df
+        self.df = None
+        self.date_index = None
+        self.archive_view = None
+        self.shared = None
         self.last_result = None
+        self._export_store = None
+        # 예전 exports/*.csv 옮기기는 실행 중 한 번만 (저장 목록을 열 때마다 폴더를 다시 훑지 않음)
+        self._legacy_imported = False
+        self.jobs = JobRunner(root)
 
         # 달력에서 월 이동을 위해 상태 저장
         self.cal_year = 2025
         self.cal_month = 1
-
-        # date -> row 빠른 접근
-        self.date_map = {}
-        for _, r in self.df.iterrows():
-            self.date_map[r["date"]] = r
+        # 달력 칸 내용 캐시 (id(df), 연, 월) -> {날짜: (이모지, 요약, 행 위치)}
+        self._cal_cache = OrderedDict()
+        self._cal_prefetch_id = None
+        # 지금 보이는 달력 칸의 행 위치가 가리키는 DataFrame
+        self._cal_df = None
 
         root.title("대전 2025 일별 날씨 검색/저장")
-        root.geometry("520x300")
+        root.geometry("640x320")
         root.resizable(False, False)
 
         top_row = tk.Frame(root)
@@ -258,7 +617,7 @@ class WeatherApp:
 
         self.lbl = tk.Label(
             top_row,
-            text="날짜 입력 (예: 250301 / 20250301):",
+            text="날짜 입력 (예: 20250301, 20250301~20250331, 2025-03, 2025-W10, *-03-01):",
             anchor="w"
         )
         self.lbl.pack(side="left")
@@ -291,21 +650,125 @@ class WeatherApp:
         tk.Button(btn_frame, text="검색결과 저장", width=12, command=self.on_save).grid(row=0, column=1, padx=8)
         tk.Button(btn_frame, text="달력", width=12, command=self.open_calendar).grid(row=0, column=2, padx=8)
 
+        # 저장은 저장소(exports/weather_exports.sqlite)에, 날짜별 CSV는 선택
+        self.save_csv_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="CSV 파일도 저장", variable=self.save_csv_var).grid(row=1, column=1, pady=(4, 0))
+
         root.bind("<Return>", lambda e: self.on_search())
 
+        if df is not None:
+            self.set_data(df)
+        elif archive_dir is not None:
+            self.load_archive_async(archive_dir, station)
+        else:
+            self.load_data_async(csv_path or CSV_FILE)
+
+    # -------------------- 데이터 준비 --------------------
+    def set_data(self, df: pd.DataFrame, index=None, source: str = None):
+        # date -> 행 위치 빠른 접근 (정렬 색인, 한 번만 생성)
+        if index is None:
+            index = date_index.DateIndex.from_df(df)
+        # 연간 분석 창과 같은 DataFrame/색인을 공유 (행 추가/수정은 구독으로 양쪽에 반영)
+        first = self.shared is None
+        self.shared = dataset_registry.REGISTRY.register("weather", df, index, source=source, prepare=prepare_rows,
+                                                         derive=derive_columns, derived_columns=DERIVED_COLUMNS)
+        if first:
+            self.shared.subscribe(self._on_shared_change)
+        self.df, self.date_index = self.shared.df, self.shared.index
+        self._cal_cache.clear()
+
+    def _on_shared_change(self, shared, change, origin):
+        self.df, self.date_index = shared.df, shared.index
+        self._cal_cache.clear()
+        self.last_result = None
+        if change.kind == "append":
+            msg = f"데이터 {change.info['rows']}행 추가됨: 전체 {len(self.df)}행"
+        else:
+            msg = f"데이터가 갱신됨: 전체 {len(self.df)}행"
+        self.result_var.set(f"{msg}\n검색 결과가 여기에 표시됩니다.")
+        cal = getattr(self, "cal_win", None)
+        if cal is not None and cal.winfo_exists():
+            self.render_calendar()
+
+    def load_data_async(self, csv_path: str):
+        self.result_var.set("데이터를 불러오는 중입니다...")
+
+        def work(ctx):
+            df = load_weather_df(csv_path)
+            return df, date_index.DateIndex.from_df(df)
+
+        def done(res):
+            self.set_data(*res, source=csv_path)
+            self.result_var.set(f"데이터 준비 완료: {len(self.df)}행 ({weather_cache.cache_report()})\n"
+                                "검색 결과가 여기에 표시됩니다.")
+            # 데이터까지 준비되면 연간 분석 모듈을 미리 읽어 둠
+            preload_year_module()
+
+        def failed(e):
+            self.result_var.set("데이터를 불러오지 못했습니다.")
+            messagebox.showerror("로드 오류", str(e))
+
+        self.jobs.submit("데이터 로드", work, on_done=done, on_error=failed, use_guard=False)
+
+    def load_archive_async(self, archive_dir: str, station: int = None):
+        """아카이브는 메타데이터만 열고, 검색/달력에서 필요한 연도만 그때그때 읽음"""
+        self.result_var.set("아카이브를 여는 중입니다...")
+
+        def work(ctx):
+            archive = weather_archive.open_archive(archive_dir)
+            st = int(station) if station is not None else archive.stations[0]
+            view = weather_archive.StationView(archive, st, prepare=prepare_rows)
+            # 처음 보게 될 마지막 해만 미리
+            view.year(view.years[-1])
+            return view
+
+        def done(view):
+            self.archive_view = view
+            name, years = view.archive.station_name(view.station), view.years
+            self.root.title(f"{name} {years[0]}~{years[-1]} 일별 날씨 검색/저장 (아카이브)")
+            self.cal_year = years[-1]
+            self._cal_cache.clear()
+            self.result_var.set(f"아카이브 준비 완료: {name}({view.station}) {years[0]}~{years[-1]}년 "
+                                f"(전체 {view.archive.n_rows:,}행)\n검색 결과가 여기에 표시됩니다.")
+            preload_year_module()
+
+        def failed(e):
+            self.result_var.set("아카이브를 열지 못했습니다.")
+            messagebox.showerror("아카이브 오류", str(e))
+
+        self.jobs.submit("아카이브 열기", work, on_done=done, on_error=failed, use_guard=False)
+
+    def _ready(self) -> bool:
+        if self.df is None and self.archive_view is None:
+            messagebox.showinfo("알림", "데이터를 불러오는 중입니다. 잠시 후 다시 시도하세요.")
+            return False
+        return True
+
     def on_search(self):
+        if not self._ready():
+            return
         date_text = self.entry.get().strip()
 
         try:
-            result = find_by_date(self.df, date_text)
+            # 하루/기간(~)/목록(,)/월/ISO 주/매년 같은 날 모두 정렬 색인 구간으로 조회
+            if self.archive_view is not None:
+                # 아카이브: 검색에 걸리는 연도 조각만 읽어서
+                kind, value = parse_date_query(date_text)
+                df, index = self.archive_view.frame(query_years(kind, value, self.archive_view.years))
+                result = df.iloc[query_positions(index, kind, value)]
+            else:
+                result, kind, value = find_by_query(self.df, date_text, self.date_index)
+            label = describe_query(kind, value)
             if result.empty:
                 self.last_result = None
-                target = parse_date_input(date_text)
-                self.result_var.set(f" 검색 결과 없음: {target}\n(해당 날짜 데이터가 없습니다.)")
+                self.result_var.set(f" 검색 결과 없음: {label}\n(해당 날짜 데이터가 없습니다.)")
                 return
 
             self.last_result = result
-            self.result_var.set(make_summary_text(result))
+            if kind == "day" and len(result) == 1:
+                self.result_var.set(make_summary_text(result))
+            else:
+                self.result_var.set(make_range_summary_text(result, label))
 
         except Exception as e:
             self.last_result = None
@@ -316,51 +779,77 @@ class WeatherApp:
             messagebox.showwarning("저장 불가", "먼저 검색을 성공해야 저장할 수 있어요.")
             return
 
-        try:
-            saved_path = save_result_csv(self.last_result)
-            messagebox.showinfo("저장 완료", f"CSV 저장 완료\n{saved_path}")
-        except Exception as e:
-            messagebox.showerror("저장 오류", str(e))
+        store, result, write_csv = self.export_store, self.last_result, self.save_csv_var.get()
+
+        def work(ctx):
+            # 기간 검색 결과도 저장 1건(트랜잭션 1번) + CSV 파일 1개로 한 번에 씀
+            return save_result(result, store, write_csv, progress=ctx.progress)
+
+        def done(res):
+            save_id, csv_path = res
+            msg = f"저장 완료 (저장 번호 {save_id}, {len(result)}행)\n{store.path}"
+            if csv_path:
+                msg += f"\nCSV: {csv_path}"
+            messagebox.showinfo("저장 완료", msg)
+
+        self.jobs.submit("검색결과 저장", work, on_done=done, on_error=lambda e: messagebox.showerror("저장 오류", str(e)),
+                         use_guard=False, rows=len(result))
+
+    @property
+    def export_store(self):
+        if self._export_store is None:
+            self._export_store = export_store.ExportStore(EXPORT_DB)
+        return self._export_store
 
     def open_year_weather(self):
         try:
-            base = Path(__file__).resolve().parent
-            candidates = [
-                base / "1year weather.py",
-                base / "year_weather.py",
-                base / "UI" / "1year weather.py",
-            ]
-
-            target = None
-            for p in candidates:
-                if p.exists():
-                    target = p
-                    break
-
-            if target is None:
-                raise FileNotFoundError("1year weather.py 파일을 찾을 수 없습니다.")
-
-            spec = importlib.util.spec_from_file_location("year_weather", target)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            module.WeatherGUI(self.root)
+            # 미리 읽는 중이면 끝날 때까지만 기다리고, 이미 읽었으면 바로 창 생성
+            self.root.config(cursor="watch")
+            self.root.update_idletasks()
+            module = load_year_module()
+            if self.archive_view is not None:
+                # 아카이브: 분석 창에서 지점/연도를 골라 그 부분만 읽음
+                module.WeatherGUI(self.root, archive=self.archive_view.archive, station=self.archive_view.station)
+                return
+            # 이미 읽은 데이터가 있으면 같은 DataFrame/날짜 색인을 그대로 연결 (CSV 다시 읽지 않음)
+            module.WeatherGUI(self.root, shared=self.shared)
 
         except Exception as e:
             messagebox.showerror("연간 분석 오류", str(e))
+        finally:
+            self.root.config(cursor="")
 
     def show_saved_weather(self):
-        export_dir = "exports"
-        export_path_abs = os.path.join(BASE_DIR, export_dir)
-
-        if not os.path.isdir(export_path_abs):
+        if not os.path.isdir(EXPORT_DIR):
             messagebox.showinfo("저장된 날씨", "아직 저장된 파일이 없어요. (exports 폴더가 없습니다)")
             return
+        store = self.export_store
+        check_legacy = not self._legacy_imported
+
+        def work(ctx):
+            # 예전 CSV는 처음 한 번만 저장소로 옮기고, 목록은 색인에서 바로 조회
+            imported = (0, 0)
+            if check_legacy:
+                ctx.progress(None, "예전 CSV 확인")
+                imported = import_legacy_exports(store)
+            return store.list(), imported
+
+        def done(res):
+            saves, (imported, skipped) = res
+            self._legacy_imported = True
+            if imported or skipped:
+                note = f" (읽을 수 없는 파일 {skipped}개는 건너뜀)" if skipped else ""
+                self.result_var.set(f"예전 CSV {imported}개를 저장소로 옮겼습니다{note}: {store.path}")
+            if saves.empty:
+                messagebox.showinfo("저장된 날씨", "저장된 검색 결과가 아직 없어요.")
+                return
+            self._open_saved_window(store, saves)
 
-        files = sorted(glob.glob(os.path.join(export_path_abs, "*.csv")), reverse=True)
-        if not files:
-            messagebox.showinfo("저장된 날씨", "exports 폴더에 CSV가 아직 없어요.")
-            return
+        self.jobs.submit("저장 목록", work, on_done=done, on_error=lambda e: messagebox.showerror("저장된 날씨", str(e)),
+                         use_guard=False)
+
+    def _open_saved_window(self, store, saves: pd.DataFrame):
+        export_path_abs = EXPORT_DIR
 
         win = tk.Toplevel(self.root)
         win.title("저장된 날씨 목록")
@@ -370,9 +859,9 @@ class WeatherApp:
         top = tk.Frame(win)
         top.pack(fill="x", padx=12, pady=(12, 6))
 
-        tk.Label(top, text="저장된 파일 선택 → 오른쪽에서 미리보기", font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        tk.Label(top, text="저장된 결과 선택 → 오른쪽에서 미리보기", font=("Segoe UI", 11, "bold")).pack(anchor="w")
 
-        selected_var = tk.StringVar(value="선택된 파일: (없음)")
+        selected_var = tk.StringVar(value="선택된 결과: (없음)")
         tk.Label(top, textvariable=selected_var, fg="gray").pack(anchor="w", pady=(4, 0))
 
         body = tk.Frame(win)
@@ -385,14 +874,21 @@ class WeatherApp:
         left = tk.Frame(body)
         left.grid(row=0, column=0, sticky="ns", padx=(0, 10))
 
-        tk.Label(left, text="저장된 CSV 파일", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+        tk.Label(left, text=f"저장된 검색 결과 ({len(saves)}건)", font=("Segoe UI", 10, "bold")).pack(anchor="w")
 
         listbox = tk.Listbox(left, width=35, height=25)
         listbox.pack(fill="y", expand=True, pady=(6, 0))
 
-        basename_list = [os.path.basename(fp) for fp in files]
-        for name in basename_list:
-            listbox.insert("end", name)
+        # 목록은 저장 정보만 (행 데이터는 선택했을 때만 읽음)
+        save_ids = saves["id"].tolist()
+        def label(d, d_end, name, n):
+            day = d or "-"
+            if pd.notna(d_end) and d_end != d:
+                day = f"{d}~{d_end}"
+            return " ".join(p for p in (day, name, f"({n}행)") if p)
+
+        labels = [label(*r) for r in zip(saves["date"], saves["date_end"], saves["station_name"], saves["n_rows"])]
+        listbox.insert("end", *labels)
 
         right = tk.Frame(body)
         right.grid(row=0, column=1, sticky="nsew")
@@ -503,17 +999,21 @@ class WeatherApp:
         def open_selected():
             sel = listbox.curselection()
             if not sel:
-                messagebox.showwarning("선택 없음", "왼쪽에서 파일을 하나 선택.")
+                messagebox.showwarning("선택 없음", "왼쪽에서 결과를 하나 선택.")
                 return
 
-            fp = files[sel[0]]
-            selected_var.set(f"선택된 파일: {fp}")
+            i = sel[0]
+            info = saves.iloc[i]
+            text = f"선택된 결과: {labels[i]}, 저장 {info['saved_at']}"
+            if pd.notna(info["csv_path"]):
+                text += f"\nCSV: {info['csv_path']}"
+            selected_var.set(text)
 
             try:
-                df = pd.read_csv(fp, encoding="utf-8-sig")
-            except UnicodeDecodeError:
-                df = pd.read_csv(fp, encoding="cp949")
-            df.columns = df.columns.astype(str).str.strip()
+                df = store.preview(save_ids[i], limit=50)
+            except Exception as e:
+                messagebox.showerror("미리보기 오류", str(e))
+                return
 
             if len(df) <= 1:
                 table_frame.pack_forget()
@@ -559,10 +1059,16 @@ class WeatherApp:
         txt = tk.Text(win, wrap="word")
         txt.pack(fill="both", expand=True, padx=10, pady=10)
 
-        txt.insert("end", f"[날짜] {target_date}\n\n")
+        # 이모지/요약은 로드할 때 만든 파생 열을 그대로 사용
+        emoji = row.get(EMOJI_COL)
+        txt.insert("end", f"[날짜] {target_date} {'' if pd.isna(emoji) else emoji}\n")
+        summary = row.get(SUMMARY_COL)
+        if not pd.isna(summary):
+            txt.insert("end", f"{summary}\n")
+        txt.insert("end", "\n")
         for col in row.index:
             val = row[col]
-            if pd.isna(val):
+            if col in DERIVED_COLUMNS or pd.isna(val):
                 continue
             txt.insert("end", f"- {col}: {val}\n")
 
@@ -570,6 +1076,8 @@ class WeatherApp:
 
     # ---- 달력 ----
     def open_calendar(self):
+        if not self._ready():
+            return
         self.cal_win = tk.Toplevel(self.root)
         self.cal_win.title("달력 (요약 보기)")
 
@@ -598,6 +1106,7 @@ class WeatherApp:
         self.cal_frame = tk.Frame(self.cal_win)
         self.cal_frame.pack(fill="both", expand=True, padx=8, pady=6)
 
+        self._build_calendar_cells()
         self.render_calendar()
 
     def cal_prev_month(self):
@@ -614,27 +1123,14 @@ class WeatherApp:
             self.cal_year += 1
         self.render_calendar()
 
-    def render_calendar(self):
-        for w in self.cal_frame.winfo_children():
-            w.destroy()
-
-        y, m = self.cal_year, self.cal_month
-        self.cal_title_var.set(f"{y}.{m:02d}")
-
-        #  계절 테마 적용
-        season = season_from_month(m)
-        theme = SEASON_THEME[season]
-
-        # 요일 헤더(계절 색)
+    def _build_calendar_cells(self):
+        """요일 헤더 7개 + 6x7 칸을 한 번만 만들고, 달이 바뀌면 내용만 바꿔 씀"""
         days = ["일", "월", "화", "수", "목", "금", "토"]
+        self.cal_headers = []
         for c, dname in enumerate(days):
-            tk.Label(
-                self.cal_frame,
-                text=dname,
-                font=("Segoe UI", 12, "bold"),
-                bg=theme["header_bg"],
-                fg=theme["accent"]
-            ).grid(row=0, column=c, sticky="nsew", pady=8)
+            lbl = tk.Label(self.cal_frame, text=dname, font=("Segoe UI", 12, "bold"))
+            lbl.grid(row=0, column=c, sticky="nsew", pady=8)
+            self.cal_headers.append(lbl)
 
         # 그리드 비율(열/행 모두 균등)
         for c in range(7):
@@ -642,23 +1138,11 @@ class WeatherApp:
         for r in range(0, 7):
             self.cal_frame.grid_rowconfigure(r, weight=1, uniform="row")
 
-        first_wday, last_day = calendar.monthrange(y, m)  # 월0..일6
-        start_col = (first_wday + 1) % 7  # 일요일=0
-
-        day_num = 1
-        row_idx = 1
-        col_idx = start_col
-
-        while day_num <= last_day:
-            target = date(y, m, day_num)
-            has_data = target in self.date_map
-
-            #  데이터 있으면 bg, 없으면 empty_bg
-            cell_bg = theme["bg"] if has_data else theme["empty_bg"]
-
+        self.cal_cells = []
+        for i in range(42):
             # 셀(칸) 테두리 + 계절 배경색
-            cell = tk.Frame(self.cal_frame, relief="ridge", bd=2, bg=cell_bg)
-            cell.grid(row=row_idx, column=col_idx, sticky="nsew", padx=4, pady=4)
+            cell = tk.Frame(self.cal_frame, relief="ridge", bd=2)
+            cell.grid(row=1 + i // 7, column=i % 7, sticky="nsew", padx=4, pady=4)
 
             # 내부 레이아웃: 날짜(고정) / 이모지(중간) / 요약(아래)
             cell.grid_rowconfigure(0, weight=0)
@@ -666,57 +1150,129 @@ class WeatherApp:
             cell.grid_rowconfigure(2, weight=1)
             cell.grid_columnconfigure(0, weight=1)
 
-            # 날짜 라벨
-            day_lbl = tk.Label(
-                cell,
-                text=str(day_num),
-                anchor="nw",
-                font=self.DAY_FONT,
-                bg=cell_bg,
-                fg=theme["accent"]
-            )
+            day_lbl = tk.Label(cell, anchor="nw", font=self.DAY_FONT)
             day_lbl.grid(row=0, column=0, sticky="nw", padx=8, pady=(8, 0))
 
-            if has_data:
-                row = self.date_map[target]
-                emoji = get_emoji_for_day(row)
-                summary = build_day_summary(row)
-
-                emoji_lbl = tk.Label(cell, text=emoji, font=self.EMOJI_FONT, bg=cell_bg)
-                emoji_lbl.grid(row=1, column=0, sticky="n", pady=(8, 2))
-
-                summary_lbl = tk.Label(
-                    cell,
-                    text=summary,
-                    font=self.SUMMARY_FONT,
-                    justify="center",
-                    anchor="n",
-                    wraplength=170,
-                    bg=cell_bg
-                )
-                summary_lbl.grid(row=2, column=0, sticky="n", padx=8, pady=(2, 8))
-
-                def make_handler(t=target, rr=row):
-                    return lambda e: self.open_detail_window(t, rr)
-
-                for widget in (cell, day_lbl, emoji_lbl, summary_lbl):
-                    widget.bind("<Button-1>", make_handler())
-            else:
-                no_lbl = tk.Label(cell, text="(데이터 없음)", font=("Segoe UI", 10), fg="gray", bg=cell_bg)
-                no_lbl.grid(row=1, column=0, sticky="n", pady=25)
+            emoji_lbl = tk.Label(cell, font=self.EMOJI_FONT)
+            emoji_lbl.grid(row=1, column=0, sticky="n", pady=(8, 2))
+
+            summary_lbl = tk.Label(cell, font=self.SUMMARY_FONT, justify="center", anchor="n", wraplength=170)
+            summary_lbl.grid(row=2, column=0, sticky="n", padx=8, pady=(2, 8))
+
+            no_lbl = tk.Label(cell, text="(데이터 없음)", font=("Segoe UI", 10), fg="gray")
+            no_lbl.grid(row=1, column=0, sticky="n", pady=25)
+
+            slot = {"cell": cell, "day": day_lbl, "emoji": emoji_lbl, "summary": summary_lbl, "none": no_lbl,
+                    "target": None, "pos": None}
+            # 클릭 처리는 한 번만 연결하고, 어떤 날짜인지는 slot에서 읽음
+            for widget in (cell, day_lbl, emoji_lbl, summary_lbl):
+                widget.bind("<Button-1>", lambda e, s=slot: self._on_calendar_click(s))
+            self.cal_cells.append(slot)
+
+    def _on_calendar_click(self, slot):
+        if slot["pos"] is not None:
+            self.open_detail_window(slot["target"], row_at(self._cal_df, slot["pos"]))
+
+    def _calendar_source(self, y: int):
+        """y년 달력에 쓸 (df, 날짜 색인) (아카이브면 그 해 조각만 읽음)"""
+        if self.archive_view is not None:
+            return self.archive_view.frame([y])
+        return self.df, self.date_index
+
+    def _calendar_month(self, y: int, m: int) -> dict:
+        """한 달 치 칸 내용 (데이터 버전별로 최근 몇 달만 보관)"""
+        df, index = self._calendar_source(y)
+        key = (id(df), y, m)
+        cells = self._cal_cache.get(key)
+        if cells is None:
+            cells = month_cells(df, index, y, m)
+            self._cal_cache[key] = cells
+            while len(self._cal_cache) > 12:
+                self._cal_cache.popitem(last=False)
+        else:
+            self._cal_cache.move_to_end(key)
+        return cells
+
+    def _prefetch_calendar(self):
+        """앞뒤 달을 미리 계산 (화면이 한가할 때)"""
+        self._cal_prefetch_id = None
+        if self.df is None and self.archive_view is None:
+            return
+        for dy, dm in ((0, 1), (0, -1)):
+            m = self.cal_month + dm
+            y = self.cal_year + (m == 13) - (m == 0)
+            m = 12 if m == 0 else (1 if m == 13 else m)
+            self._calendar_month(y, m)
+
+    def render_calendar(self):
+        y, m = self.cal_year, self.cal_month
+        self.cal_title_var.set(f"{y}.{m:02d}")
 
-            day_num += 1
-            col_idx += 1
-            if col_idx >= 7:
-                col_idx = 0
-                row_idx += 1
+        #  계절 테마 적용
+        season = season_from_month(m)
+        theme = SEASON_THEME[season]
+        for lbl in self.cal_headers:
+            lbl.configure(bg=theme["header_bg"], fg=theme["accent"])
 
+        first_wday, last_day = calendar.monthrange(y, m)  # 월0..일6
+        start_col = (first_wday + 1) % 7  # 일요일=0
 
-if __name__ == "__main__":
-    df = load_weather_df(CSV_FILE)
+        # 이번 달 이모지/요약을 한 번에 계산 (앞뒤 달은 미리 계산해 둔 것 사용)
+        cells = self._calendar_month(y, m)
+        self._cal_df = self._calendar_source(y)[0]
 
+        for i, slot in enumerate(self.cal_cells):
+            day_num = i - start_col + 1
+            if not 1 <= day_num <= last_day:
+                slot["cell"].grid_remove()
+                slot["target"] = slot["pos"] = None
+                continue
+
+            target = date(y, m, day_num)
+            info = cells.get(target)
+
+            #  데이터 있으면 bg, 없으면 empty_bg
+            cell_bg = theme["bg"] if info is not None else theme["empty_bg"]
+            slot["cell"].configure(bg=cell_bg)
+            slot["cell"].grid()
+            slot["day"].configure(text=str(day_num), bg=cell_bg, fg=theme["accent"])
+            slot["target"] = target
+
+            if info is not None:
+                emoji, summary, pos = info
+                slot["emoji"].configure(text=emoji, bg=cell_bg)
+                slot["summary"].configure(text=summary, bg=cell_bg)
+                slot["emoji"].grid()
+                slot["summary"].grid()
+                slot["none"].grid_remove()
+                slot["pos"] = pos
+            else:
+                slot["none"].configure(bg=cell_bg)
+                slot["none"].grid()
+                slot["emoji"].grid_remove()
+                slot["summary"].grid_remove()
+                slot["pos"] = None
+
+        if self._cal_prefetch_id is not None:
+            self.cal_win.after_cancel(self._cal_prefetch_id)
+        self._cal_prefetch_id = self.cal_win.after_idle(self._prefetch_calendar)
+
+if __name__ == "__main__":
+    # python WeatherApp.py --rebuild-cache : 캐시만 다시 만들고 종료
+    if "--rebuild-cache" in sys.argv:
+        print(f"캐시 재생성 완료: {rebuild_weather_cache(CSV_FILE)}")
+        sys.exit(0)
+
+    # python WeatherApp.py --archive <폴더> [--station 133] : 여러 해 아카이브에서 필요한 연도만 읽음
+    archive_dir = station = None
+    if "--archive" in sys.argv:
+        archive_dir = sys.argv[sys.argv.index("--archive") + 1]
+    if "--station" in sys.argv:
+        station = int(sys.argv[sys.argv.index("--station") + 1])
+
+    # 창을 먼저 띄우고 CSV 로드/무거운 import는 백그라운드에서
     root = tk.Tk()
-    app = WeatherApp(root, df)
+    app = WeatherApp(root, csv_path=CSV_FILE, archive_dir=archive_dir, station=station)
     root.mainloop()
 
     #완성
\ No newline at end of file
@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+
+
+SEASONS = {"봄": (3, 4, 5), "여름": (6, 7, 8), "가을": (9, 10, 11), "겨울": (12, 1, 2)}
+
+# 월(1~12) -> 계절 번호 (봄=0, 여름=1, 가을=2, 겨울=3)
+MONTH_TO_SEASON = np.array([-1, 3, 3, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3])
+
+STATS = ["mean", "sum", "count", "min", "max", "std"]
+
+# 집계 대상에서 빼는 열 (키 역할)
+KEY_COLUMNS = ["지점", "지점명", "일시", "date"]
+
+
+def numeric_columns(df: pd.DataFrame) -> list:
+    """숫자로 해석되는 열 (키 열 제외)"""
+    out = []
+    for c in df.columns:
+        if c in KEY_COLUMNS or str(c).startswith("판단("):
+            continue
+        s = df[c]
+        if pd.api.types.is_bool_dtype(s.dtype):
+            continue
+        if pd.api.types.is_numeric_dtype(s.dtype):
+            out.append(c)
+        elif s.dtype == object or pd.api.types.is_string_dtype(s.dtype):
+            if pd.to_numeric(s, errors="coerce").notna().any():
+                out.append(c)
+    return out
+
+
+def _as_float(s: pd.Series) -> np.ndarray:
+    if pd.api.types.is_float_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+        return s.to_numpy(dtype=np.float64)
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class AggCube:
+    """지점 × 연 × 월 × 변수 집계 큐브 (합계/개수/최소/최대/제곱합)
+
+    - 로드할 때 한 번 정렬 + reduceat으로 만들고, 행 추가/삭제는 해당 그룹만 갱신
+    - 월별/계절별/연도별 요약은 원본을 다시 읽지 않고 큐브 배열만 합쳐서 계산
+    - 갱신 메서드는 제자리 수정이므로, 버전별로 나눠 쓰려면 copy() 후 수정
+    """
+
+    def __init__(self, variables, stations=(), years=()):
+        self.variables = list(variables)
+        self.stations = list(stations)
+        self.years = list(years)
+        shape = (len(self.stations), len(self.years), 12, len(self.variables))
+        self.sum = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    # ---- 생성 ----
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, variables=None) -> "AggCube":
+        cube = cls(variables if variables is not None else numeric_columns(df))
+        cube.add_rows(df)
+        return cube
+
+    def copy(self) -> "AggCube":
+        out = AggCube.__new__(AggCube)
+        out.variables = list(self.variables)
+        out.stations = list(self.stations)
+        out.years = list(self.years)
+        for name in ("sum", "sumsq", "count", "min", "max"):
+            setattr(out, name, getattr(self, name).copy())
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, n).nbytes for n in ("sum", "sumsq", "count", "min", "max"))
+
+    # ---- 키 ----
+    def _keys(self, df: pd.DataFrame):
+        """행별 (지점 값, 연, 월) + 일시가 유효한 행 마스크"""
+        dt = df["일시"]
+        if not pd.api.types.is_datetime64_any_dtype(dt.dtype):
+            dt = pd.to_datetime(dt, errors="coerce")
+        ok = dt.notna().to_numpy()
+        year = dt.dt.year.to_numpy(dtype=np.float64, na_value=np.nan)
+        month = dt.dt.month.to_numpy(dtype=np.float64, na_value=np.nan)
+        station = df["지점"].to_numpy() if "지점" in df.columns else np.zeros(len(df), dtype=np.int64)
+        return station[ok], year[ok].astype(np.int64), month[ok].astype(np.int64), ok
+
+    def _ensure_keys(self, stations, years):
+        new_s = [s for s in pd.unique(stations) if s not in self.stations]
+        new_y = [y for y in np.unique(years).tolist() if y not in self.years]
+        if not new_s and not new_y:
+            return
+
+        old_s, old_y = len(self.stations), len(self.years)
+        self.stations += new_s
+        self.years = sorted(self.years + new_y)
+        y_pos = [self.years.index(y) for y in self.years if y not in new_y]
+
+        shape = (len(self.stations), len(self.years), 12, len(self.variables))
+        for name, fill in (("sum", 0.0), ("sumsq", 0.0), ("count", 0), ("min", np.inf), ("max", -np.inf)):
+            old = getattr(self, name)
+            grown = np.full(shape, fill, dtype=old.dtype)
+            if old_s and old_y:
+                grown[:old_s][:, y_pos] = old
+            setattr(self, name, grown)
+
+    def _group_ids(self, stations, years, months) -> np.ndarray:
+        s_idx = pd.Index(self.stations).get_indexer(stations)
+        y_idx = pd.Index(self.years).get_indexer(years)
+        gid = (s_idx * len(self.years) + y_idx) * 12 + (months - 1)
+        return np.where((s_idx < 0) | (y_idx < 0), -1, gid)
+
+    def _matrix(self, df: pd.DataFrame, ok: np.ndarray) -> np.ndarray:
+        X = np.full((int(ok.sum()), len(self.variables)), np.nan)
+        for j, c in enumerate(self.variables):
+            if c in df.columns:
+                X[:, j] = _as_float(df[c])[ok]
+        return X
+
+    @staticmethod
+    def _reduce(gid: np.ndarray, X: np.ndarray):
+        """그룹 번호별 통계: 정렬 한 번 + reduceat (열 전체를 한꺼번에)"""
+        order = np.argsort(gid, kind="stable")
+        g = gid[order]
+        Xs = X[order]
+        starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+
+        valid = ~np.isnan(Xs)
+        Xz = np.where(valid, Xs, 0.0)
+        return (g[starts],
+                np.add.reduceat(Xz, starts, axis=0),
+                np.add.reduceat(Xz * Xz, starts, axis=0),
+                np.add.reduceat(valid.astype(np.int64), starts, axis=0),
+                np.fmin.reduceat(Xs, starts, axis=0),
+                np.fmax.reduceat(Xs, starts, axis=0))
+
+    def _flat(self, name):
+        return getattr(self, name).reshape(-1, len(self.variables))
+
+    # ---- 증분 갱신 ----
+    def add_rows(self, df: pd.DataFrame):
+        if len(df) == 0 or not self.variables:
+            return self
+        stations, years, months, ok = self._keys(df)
+        if not ok.any():
+            return self
+        self._ensure_keys(stations, years)
+
+        gid = self._group_ids(stations, years, months)
+        g, s, sq, n, mn, mx = self._reduce(gid, self._matrix(df, ok))
+        self._flat("sum")[g] += s
+        self._flat("sumsq")[g] += sq
+        self._flat("count")[g] += n
+        self._flat("min")[g] = np.fmin(self._flat("min")[g], mn)
+        self._flat("max")[g] = np.fmax(self._flat("max")[g], mx)
+        return self
+
+    def remove_rows(self, removed: pd.DataFrame, remaining: pd.DataFrame = None):
+        """removed 행을 빼고, 최소/최대가 사라진 그룹만 remaining에서 다시 계산"""
+        if len(removed) == 0 or not self.variables:
+            return self
+        stations, years, months, ok = self._keys(removed)
+        if not ok.any():
+            return self
+
+        gid = self._group_ids(stations, years, months)
+        if (gid < 0).any():
+            raise ValueError("큐브에 없는 지점/연도의 행은 뺄 수 없습니다.")
+        g, s, sq, n, mn, mx = self._reduce(gid, self._matrix(removed, ok))
+
+        f_sum, f_sq, f_n = self._flat("sum"), self._flat("sumsq"), self._flat("count")
+        f_sum[g] -= s
+        f_sq[g] -= sq
+        f_n[g] -= n
+        empty = f_n[g] <= 0
+        f_sum[g] = np.where(empty, 0.0, f_sum[g])
+        f_sq[g] = np.where(empty, 0.0, f_sq[g])
+
+        # 뺀 값이 최소/최대였던 그룹만 다시 계산 대상
+        f_min, f_max = self._flat("min"), self._flat("max")
+        touched = ((mn <= f_min[g]) | (mx >= f_max[g])).any(axis=1)
+        g_touch = g[touched]
+        if len(g_touch) == 0:
+            return self
+
+        f_min[g_touch] = np.inf
+        f_max[g_touch] = -np.inf
+        if remaining is None or len(remaining) == 0:
+            return self
+
+        r_st, r_y, r_m, r_ok = self._keys(remaining)
+        r_gid = self._group_ids(r_st, r_y, r_m)
+        sel = np.isin(r_gid, g_touch)
+        if not sel.any():
+            return self
+        X = self._matrix(remaining, r_ok)[sel]
+        rg, _, _, _, rmn, rmx = self._reduce(r_gid[sel], X)
+        f_min[rg] = rmn
+        f_max[rg] = rmx
+        return self
+
+    def drop_variables(self, columns):
+        keep = [j for j, c in enumerate(self.variables) if c not in set(columns)]
+        for name in ("sum", "sumsq", "count", "min", "max"):
+            setattr(self, name, getattr(self, name)[..., keep])
+        self.variables = [self.variables[j] for j in keep]
+        return self
+
+    # ---- 조회 ----
+    def _select(self, station=None, year=None):
+        """지점/연도로 자른 (월, 변수) 배열 5종"""
+        s_sel = slice(None) if station is None else [self.stations.index(station)]
+        y_sel = slice(None) if year is None else [self.years.index(year)]
+
+        def cut(a):
+            return a[s_sel][:, y_sel]
+
+        return (cut(self.sum).sum(axis=(0, 1)), cut(self.sumsq).sum(axis=(0, 1)),
+                cut(self.count).sum(axis=(0, 1)),
+                cut(self.min).min(axis=(0, 1), initial=np.inf),
+                cut(self.max).max(axis=(0, 1), initial=-np.inf))
+
+    @staticmethod
+    def _finish(stat, s, sq, n, mn, mx) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if stat == "mean":
+                return np.where(n > 0, s / n, np.nan)
+            if stat == "sum":
+                return np.where(n > 0, s, np.nan)
+            if stat == "count":
+                return n.astype(np.float64)
+            if stat == "min":
+                return np.where(n > 0, mn, np.nan)
+            if stat == "max":
+                return np.where(n > 0, mx, np.nan)
+            if stat == "std":
+                var = (sq - s * s / np.where(n > 0, n, 1)) / (n - 1)
+                return np.where(n > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+        raise ValueError(f"지원하지 않는 통계: {stat}")
+
+    def _columns(self, columns):
+        columns = self.variables if columns is None else list(columns)
+        missing = [c for c in columns if c not in self.variables]
+        if missing:
+            raise KeyError(f"집계되지 않은 컬럼: {', '.join(map(str, missing))}")
+        return columns, [self.variables.index(c) for c in columns]
+
+    def summary(self, by: str = "month", columns=None, stat: str = "mean",
+                station=None, year=None) -> pd.DataFrame:
+        """by: "month" / "season" / "year" (year는 연도별, station/year로 범위 제한)"""
+        columns, idx = self._columns(columns)
+
+        if by == "year":
+            s_sel = slice(None) if station is None else [self.stations.index(station)]
+            parts = [self.sum, self.sumsq, self.count, self.min, self.max]
+            parts = [p[s_sel][..., idx] for p in parts]
+            s, sq, n = (p.sum(axis=(0, 2)) for p in parts[:3])
+            mn = parts[3].min(axis=(0, 2), initial=np.inf)
+            mx = parts[4].max(axis=(0, 2), initial=-np.inf)
+            keys = pd.Index(self.years, name="연도")
+        else:
+            s, sq, n, mn, mx = (a[:, idx] for a in self._select(station, year))
+            if by == "season":
+                seas = MONTH_TO_SEASON[1:]
+                s, sq, n = (np.stack([a[seas == k].sum(axis=0) for k in range(4)]) for a in (s, sq, n))
+                mn = np.stack([mn[seas == k].min(axis=0) for k in range(4)])
+                mx = np.stack([mx[seas == k].max(axis=0) for k in range(4)])
+                keys = pd.Index(list(SEASONS), name="계절")
+            elif by == "month":
+                keys = pd.Index(np.arange(1, 13), name="월")
+            else:
+                raise ValueError(f"지원하지 않는 묶음: {by}")
+
+        values = self._finish(stat, s, sq, n, mn, mx)
+        out = pd.DataFrame(values, index=keys, columns=columns)
+        # 데이터가 하나도 없는 묶음(월/연도)은 빼고 반환
+        out = out[n.sum(axis=1) > 0]
+        return out.reset_index()
+
+    def monthly(self, columns=None, stat: str = "mean", **kw) -> pd.DataFrame:
+        return self.summary("month", columns, stat, **kw)
+
+    def seasonal(self, columns=None, stat: str = "mean", **kw) -> pd.DataFrame:
+        return self.summary("season", columns, stat, **kw)
+
+    def annual(self, columns=None, stat: str = "mean", **kw) -> pd.DataFrame:
+        return self.summary("year", columns, stat, **kw)
@@ -0,0 +1,182 @@
+"""ASOS 일자료 열 스키마 (열 이름 -> 메모리를 적게 쓰는 dtype)
+
+- 관측값: float32 (소수 한두 자리 자료라 정밀도 충분, float64의 절반)
+- 지점: int16, 지점명: category (행마다 같은 문자열 반복 X)
+- 일시: datetime64[s] (pandas는 [D] 단위를 지원하지 않아 초 단위, 크기는 8바이트로 같음)
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+
+SCHEMA_VERSION = 1
+
+STATION_COL = "지점"
+NAME_COL = "지점명"
+DATE_COL = "일시"
+DATE_DTYPE = "datetime64[s]"
+MEASURE_DTYPE = "float32"
+# 메모리 예상치 기준: 30년 × 전국 약 100개 지점 일자료
+NATIONAL_30Y_ROWS = 30 * 366 * 100
+# progress를 주고 읽을 때 한 번에 읽는 행 수 (조각마다 취소 확인)
+READ_CHUNK_ROWS = 200_000
+
+KEY_DTYPES = {
+    STATION_COL: "int16",
+    NAME_COL: "category",
+}
+
+# 기상자료개방포털 ASOS 일자료 항목 (파일마다 일부만 들어 있음)
+MEASUREMENTS = [
+    "평균기온(°C)", "최저기온(°C)", "최저기온 시각(hhmi)", "최고기온(°C)", "최고기온 시각(hhmi)",
+    "강수 계속시간(hr)", "10분 최다 강수량(mm)", "10분 최다강수량 시각(hhmi)", "1시간 최다강수량(mm)",
+    "1시간 최다 강수량 시각(hhmi)", "일강수량(mm)",
+    "최대 순간 풍속(m/s)", "최대 순간 풍속 풍향(16방위)", "최대 순간풍속 시각(hhmi)",
+    "최대 풍속(m/s)", "최대 풍속 풍향(16방위)", "최대 풍속 시각(hhmi)", "평균 풍속(m/s)", "풍정합(100m)",
+    "최다풍향(16방위)", "평균 이슬점온도(°C)", "최소 상대습도(%)", "최소 상대습도 시각(hhmi)",
+    "평균 상대습도(%)", "평균 증기압(hPa)", "평균 현지기압(hPa)", "최고 해면기압(hPa)",
+    "최고 해면기압 시각(hhmi)", "최저 해면기압(hPa)", "최저 해면기압 시각(hhmi)", "평균 해면기압(hPa)",
+    "가조시간(hr)", "합계 일조시간(hr)", "1시간 최다일사 시각(hhmi)", "1시간 최다일사량(MJ/m2)",
+    "합계 일사량(MJ/m2)", "일 최심신적설(cm)", "일 최심신적설 시각(hhmi)", "일 최심적설(cm)",
+    "일 최심적설 시각(hhmi)", "합계 3시간 신적설(cm)", "평균 전운량(1/10)", "평균 중하층운량(1/10)",
+    "평균 지면온도(°C)", "최저 초상온도(°C)", "평균 5cm 지중온도(°C)", "평균 10cm 지중온도(°C)",
+    "평균 20cm 지중온도(°C)", "평균 30cm 지중온도(°C)", "0.5m 지중온도(°C)", "1.0m 지중온도(°C)",
+    "1.5m 지중온도(°C)", "3.0m 지중온도(°C)", "5.0m 지중온도(°C)", "합계 대형증발량(mm)",
+    "합계 소형증발량(mm)", "9-9강수(mm)", "기사", "안개 계속시간(hr)",
+]
+
+# 목록에 없는 열도 단위가 붙은 관측값이면 float32로 (예: "평균기온(°C)")
+_UNIT = re.compile(r"\((°C|mm|m/s|%|hPa|hr|cm|MJ/m2|hhmi|16방위|100m|1/10|m)\)$")
+_TEXT_COLUMNS = {"기사"}
+
+
+def dtype_for(col: str):
+    """열 이름 -> dtype (모르는 열은 None: pandas 기본 추론)"""
+    col = str(col).strip()
+    if col in KEY_DTYPES:
+        return KEY_DTYPES[col]
+    if col in _TEXT_COLUMNS:
+        return None
+    if col in MEASUREMENTS or _UNIT.search(col):
+        return MEASURE_DTYPE
+    return None
+
+
+def read_dtypes(columns) -> dict:
+    """read_csv(dtype=...)용 {원래 열 이름: dtype} (일시는 읽은 뒤 한 번에 변환)"""
+    out = {}
+    for c in columns:
+        dt = dtype_for(c)
+        if dt is not None:
+            out[c] = dt
+    return out
+
+
+def read_csv(path: str, encoding: str = "cp949", columns=None, progress=None,
+             chunk_rows: int = READ_CHUNK_ROWS, **kwargs) -> pd.DataFrame:
+    """스키마 dtype으로 바로 읽기 (float64로 읽고 나서 줄이는 단계 없음)
+
+    columns: 필요한 열만 (지점/지점명/일시는 항상 포함)
+    progress(frac, msg): 주면 chunk_rows행씩 나눠 읽으며 조각마다 호출 (작업 취소 시 예외로 중단)
+    """
+    header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+    usecols = None
+    if columns is not None:
+        wanted = {str(c).strip() for c in columns} | {STATION_COL, NAME_COL, DATE_COL}
+        usecols = [c for c in header if str(c).strip() in wanted]
+        header = usecols
+
+    read = pd.read_csv if progress is None else _chunked_reader(progress, chunk_rows)
+    try:
+        df = read(path, encoding=encoding, dtype=read_dtypes(header), usecols=usecols, **kwargs)
+    except (ValueError, OverflowError):
+        # 지점 번호가 비었거나 관측값에 문자가 섞인 파일: 기본 추론으로 읽고 변환
+        df = read(path, encoding=encoding, usecols=usecols, **kwargs)
+    return apply_schema(df)
+
+
+def _chunked_reader(progress, chunk_rows: int):
+    """pd.read_csv와 같은 인자로 조각씩 읽어 이어 붙이는 함수
+
+    조각마다 범주가 달라 합치면 object가 된 열은 apply_schema에서 다시 category로
+    """
+    def read(path, **kwargs):
+        chunks, rows = [], 0
+        with pd.read_csv(path, chunksize=max(int(chunk_rows), 1), **kwargs) as reader:
+            for chunk in reader:
+                chunks.append(chunk)
+                rows += len(chunk)
+                progress(None, f"CSV 읽는 중 {rows:,}행")
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    return read
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """이미 읽은 DataFrame을 스키마 dtype으로 (맞는 열은 그대로 두고, 다른 열만 새 버퍼)"""
+    df.columns = df.columns.astype(str).str.strip()
+    for col in df.columns:
+        s = df[col]
+        if col == DATE_COL:
+            if not (pd.api.types.is_datetime64_any_dtype(s.dtype) and s.dtype == DATE_DTYPE):
+                df[col] = pd.to_datetime(s, errors="coerce").astype(DATE_DTYPE)
+            continue
+        dt = dtype_for(col)
+        if dt is None or str(s.dtype) == dt:
+            continue
+        if dt == "category":
+            df[col] = s.astype("category")
+        elif dt == "int16":
+            n = pd.to_numeric(s, errors="coerce")
+            if n.isna().any() or n.abs().max() > np.iinfo(np.int16).max:
+                df[col] = n.astype("Int32")
+            else:
+                df[col] = n.astype(np.int16)
+        else:
+            df[col] = pd.to_numeric(s, errors="coerce").astype(dt)
+    return df
+
+
+def memory_report(df: pd.DataFrame, scale_rows: int = None) -> pd.DataFrame:
+    """열별 메모리 (deep) + 행당 바이트, scale_rows를 주면 그 행 수일 때 예상치(MB)도"""
+    usage = df.memory_usage(deep=True, index=False)
+    n = max(len(df), 1)
+    out = pd.DataFrame({
+        "column": usage.index,
+        "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.to_numpy(),
+        "bytes_per_row": usage.to_numpy() / n,
+    })
+    if scale_rows is not None:
+        out["scaled_mb"] = out["bytes_per_row"] * scale_rows / 2 ** 20
+    total = {"column": "(합계)", "dtype": "", "bytes": int(usage.sum()), "bytes_per_row": usage.sum() / n}
+    if scale_rows is not None:
+        total["scaled_mb"] = total["bytes_per_row"] * scale_rows / 2 ** 20
+    return pd.concat([out, pd.DataFrame([total])], ignore_index=True)
+
+
+def format_memory(df: pd.DataFrame, scale_rows: int = None) -> str:
+    """로그용 한 줄: 메모리 12.3MB (행당 45B, 1,000,000행이면 43MB)"""
+    total = int(df.memory_usage(deep=True, index=False).sum())
+    per_row = total / max(len(df), 1)
+    text = f"메모리 {total / 2 ** 20:.1f}MB (행당 {per_row:.0f}B"
+    if scale_rows is not None:
+        text += f", {scale_rows:,}행이면 {per_row * scale_rows / 2 ** 20:.0f}MB"
+    return text + ")"
+
+
+if __name__ == "__main__":
+    # 사용: python asos_schema.py <csv> [인코딩] : 기본 읽기 vs 스키마 읽기 메모리 비교
+    import sys
+
+    if len(sys.argv) < 2:
+        print("사용법: python asos_schema.py <csv> [인코딩]")
+        sys.exit(1)
+    path = sys.argv[1]
+    enc = sys.argv[2] if len(sys.argv) > 2 else "cp949"
+
+    plain = pd.read_csv(path, encoding=enc)
+    typed = read_csv(path, enc)
+    print("기본 읽기:", format_memory(plain, NATIONAL_30Y_ROWS))
+    print("스키마 읽기:", format_memory(typed, NATIONAL_30Y_ROWS))
+    print(memory_report(typed, NATIONAL_30Y_ROWS).to_string(index=False))
@@ -0,0 +1,325 @@
+"""데이터 크기별 성능 측정 + 기준(baseline) 대비 회귀 비교
+
+    python benchmarks/run_bench.py --sizes 1e3,1e4,1e5 -o bench.json
+    python benchmarks/run_bench.py --sizes 1e3,1e4,1e5 --save-baseline      # 기준 저장
+    python benchmarks/run_bench.py --sizes 1e3,1e4,1e5 --compare            # 기준과 비교 (느려지면 종료코드 1)
+
+1e7, 1e8행은 생성/메모리 부담이 크므로 --sizes로 직접 지정할 때만 측정합니다.
+생성한 CSV는 benchmarks/data/에 두고 다음 실행 때 재사용합니다.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import synth_asos
+from WeatherApp import load_weather_df, find_by_date, parse_date_input
+from date_index import DateIndex
+from filter_query import ColumnCache, compile_query
+from mask_store import MaskStore
+from agg_cube import AggCube
+from corr_engine import CorrEngine, season_codes
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DATA_DIR = os.path.join(HERE, "data")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+QUERY = "평균기온(°C) > 25 and 일강수량(mm) >= 10 or 지점 in 133,108"
+MONTHLY_COLUMNS = ["평균기온(°C)", "평균 상대습도(%)", "일강수량(mm)"]
+DATE_INPUTS = ["2020-03-01", "20200301", "200301", "2003031", "2020/03/01", "2020.3.1"]
+
+
+class Skip(Exception):
+    pass
+
+
+# -------------------- 측정 대상 --------------------
+# 각 함수는 (준비물 dict) -> (반복 실행할 함수, 1회 실행당 처리 건수)
+def case_load_parse(ctx):
+    return lambda: load_weather_df(ctx["path"], use_cache=False), 1
+
+
+def case_load_cached(ctx):
+    load_weather_df(ctx["path"])  # 캐시 미리 생성
+    return lambda: load_weather_df(ctx["path"]), 1
+
+
+def case_parse_date_input(ctx):
+    items = DATE_INPUTS * 50
+    return lambda: [parse_date_input(s) for s in items], len(items)
+
+
+def _lookup_dates(ctx, n=20):
+    days = ctx["df"]["date"]
+    rng = np.random.default_rng(1)
+    return days.iloc[rng.integers(0, len(days), n)].dt.strftime("%Y-%m-%d").tolist()
+
+
+def case_find_by_date_scan(ctx):
+    df, targets = ctx["df"], _lookup_dates(ctx)
+    return lambda: [find_by_date(df, t) for t in targets], len(targets)
+
+
+def case_date_index_build(ctx):
+    return lambda: DateIndex.from_df(ctx["df"]), 1
+
+
+def case_find_by_date_index(ctx):
+    df, targets = ctx["df"], _lookup_dates(ctx)
+    index = DateIndex.from_df(df)
+    return lambda: [find_by_date(df, t, index) for t in targets], len(targets)
+
+
+def case_apply_filter(ctx):
+    df = ctx["df"]
+
+    def run():
+        # 판단 버튼 1회: 식 해석(캐시) + 열 변환 + 평가 + 마스크 저장
+        query = compile_query(QUERY, df.columns)
+        mask = query.evaluate(df, ColumnCache(), 1)
+        MaskStore().add("판단(조건식)", mask, version=1)
+    return run, 1
+
+
+def case_monthly_groupby(ctx):
+    df = ctx["df"]
+    avail = [c for c in MONTHLY_COLUMNS if c in df.columns]
+    return lambda: df[avail].groupby(pd.to_datetime(df["일시"]).dt.month.rename("월")).mean(), 1
+
+
+def case_monthly_cube_build(ctx):
+    return lambda: AggCube.from_df(ctx["df"]), 1
+
+
+def case_monthly_cube_query(ctx):
+    cube = AggCube.from_df(ctx["df"])
+    return lambda: cube.monthly(MONTHLY_COLUMNS), 1
+
+
+def case_season_corr_pandas(ctx):
+    df = ctx["df"]
+
+    def run():
+        num = df.select_dtypes(include=[np.number]).drop(columns=["지점"], errors="ignore")
+        codes = season_codes(df["일시"])
+        num.corr()
+        for s in range(4):
+            num[codes == s].corr()
+    return run, 1
+
+
+def case_season_corr_engine(ctx):
+    df = ctx["df"]
+    return lambda: CorrEngine().seasonal(df, 1, 8, "pearson"), 1
+
+
+def case_treeview_virtual(ctx):
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        from virtual_table import VirtualTable
+        root = tk.Tk()
+    except Exception as e:
+        raise Skip(f"Tk 사용 불가: {e}")
+    root.withdraw()
+    tree = ttk.Treeview(root, show="headings", height=30)
+    yscroll = ttk.Scrollbar(root, orient="vertical")
+    vt = VirtualTable(tree, yscroll)
+    ctx.setdefault("cleanup", []).append(root.destroy)
+
+    def run():
+        vt.set_data(ctx["df"])
+        root.update_idletasks()
+    return run, 1
+
+
+def case_line_plot(ctx):
+    # 상세보기 선 그래프: Figure 하나에 값만 교체 + 화면 폭만큼 솎아서 그리기 (Agg)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from plot_pipeline import DecimatedLine
+    df = ctx["df"]
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    line = DecimatedLine(fig.add_subplot())
+    x = pd.to_datetime(df["일시"]).to_numpy()
+    y = pd.to_numeric(df["평균기온(°C)"], errors="coerce").to_numpy(dtype=np.float64)
+
+    def run():
+        line.set_data(x, y)
+        fig.canvas.draw()
+    return run, 1
+
+
+def case_season_heatmap(ctx):
+    # 계절 히트맵 PNG (상관행렬은 캐시, Agg 버퍼에 그리기 + 값 표시)
+    import weather_analysis as wa
+    df, engine = ctx["df"], CorrEngine()
+
+    def run():
+        res = wa.season_correlations(df, 8, "pearson", 0.7, 10, engine=engine, version=1)
+        wa.render_season_png(res, "pearson", 0.0)
+    return run, 1
+
+
+def case_rolling_window(ctx):
+    # 지점별 달력 기준 3/7/30일 합계 + 최대 (누적합 / van Herk-Gil-Werman)
+    from rolling_engine import RollingEngine, derive_rolling
+    df = ctx["df"]
+    engine = RollingEngine.from_df(df)
+    return lambda: derive_rolling(df, ["일강수량(mm)"], [3, 7, 30], ["sum", "max"], engine=engine), 1
+
+
+CASES = {
+    "load_weather_df(parse)": case_load_parse,
+    "load_weather_df(cache)": case_load_cached,
+    "parse_date_input": case_parse_date_input,
+    "find_by_date(scan)": case_find_by_date_scan,
+    "DateIndex.from_df": case_date_index_build,
+    "find_by_date(index)": case_find_by_date_index,
+    "apply_filter(query)": case_apply_filter,
+    "monthly(groupby)": case_monthly_groupby,
+    "monthly(cube build)": case_monthly_cube_build,
+    "monthly(cube query)": case_monthly_cube_query,
+    "season_corr(pandas)": case_season_corr_pandas,
+    "season_corr(engine)": case_season_corr_engine,
+    "treeview(virtual)": case_treeview_virtual,
+    "line_plot(decimated)": case_line_plot,
+    "season_heatmap(png)": case_season_heatmap,
+    "rolling(3/7/30d)": case_rolling_window,
+}
+
+
+# -------------------- 실행 --------------------
+def time_it(fn, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run(sizes, repeat: int = 3, only=None, log=print) -> dict:
+    results = {}
+    for size in sizes:
+        path = synth_asos.cached_csv(DATA_DIR, size)
+        ctx = {"path": path, "size": size}
+        ctx["df"] = load_weather_df(path, use_cache=False)
+        log(f"== {size:,}행 ({os.path.basename(path)})")
+
+        for name, make in CASES.items():
+            if only and not any(o in name for o in only):
+                continue
+            key = f"{name}@{size}"
+            try:
+                fn, ops = make(ctx)
+                times = time_it(fn, repeat)
+            except Skip as e:
+                results[key] = {"name": name, "size": size, "skipped": str(e)}
+                log(f"  {name:<24} 건너뜀 ({e})")
+                continue
+            results[key] = {
+                "name": name, "size": size, "repeat": repeat, "ops": ops,
+                "best": min(times), "median": statistics.median(times), "times": times,
+            }
+            log(f"  {name:<24} best {min(times) * 1000:10.3f} ms   per-op {min(times) / ops * 1e6:12.2f} us")
+
+        for fn in ctx.get("cleanup", []):
+            fn()
+    return results
+
+
+def meta() -> dict:
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, log=print) -> list:
+    """best 기준으로 (1 + tolerance)배보다 느려진 항목 목록"""
+    regressions = []
+    base = baseline.get("results", {})
+    log(f"\n== 기준 비교 (허용 {tolerance * 100:.0f}%)")
+    for key, cur in results.items():
+        old = base.get(key)
+        if "best" not in cur or not old or "best" not in old:
+            continue
+        ratio = cur["best"] / old["best"] if old["best"] > 0 else float("inf")
+        mark = ""
+        if ratio > 1 + tolerance:
+            mark = "  <- 느려짐"
+            regressions.append({"key": key, "ratio": ratio, "best": cur["best"], "baseline": old["best"]})
+        elif ratio < 1 / (1 + tolerance):
+            mark = "  (빨라짐)"
+        log(f"  {key:<34} {old['best'] * 1000:10.3f} -> {cur['best'] * 1000:10.3f} ms  x{ratio:5.2f}{mark}")
+    return regressions
+
+
+def parse_sizes(text: str) -> list:
+    return [int(float(s)) for s in text.split(",") if s.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="기상 데이터 처리 성능 측정")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="행 수 목록 (예: 1e3,1e4,1e5,1e6,1e7,1e8)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default="", help="이름에 이 문자열이 들어간 항목만 (콤마 구분)")
+    parser.add_argument("-o", "--out", default=None, help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준과 비교해 느려지면 종료코드 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 비율 (기본 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    only = [s.strip() for s in args.only.split(",") if s.strip()]
+    results = run(parse_sizes(args.sizes), args.repeat, only)
+    report = {"meta": meta(), "results": results}
+
+    out = args.out or os.path.join(HERE, "results", f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out}")
+
+    code = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"기준 파일이 없습니다: {args.baseline} (--save-baseline으로 먼저 저장)")
+            code = 2
+        else:
+            with open(args.baseline, encoding="utf-8") as f:
+                regressions = compare(results, json.load(f), args.tolerance)
+            report["regressions"] = regressions
+            with open(out, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            if regressions:
+                print(f"\n느려진 항목 {len(regressions)}개")
+                code = 1
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"기준 저장: {args.baseline}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
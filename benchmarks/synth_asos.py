@@ -0,0 +1,135 @@
+"""OBS_ASOS_DD_*.csv와 같은 형식의 가상 일자료 생성기
+
+    python benchmarks/synth_asos.py 1000000 -o benchmarks/data/asos_1e6.csv
+
+지점 여러 개 × 여러 해의 일자료를 만들며, 기온의 계절 변화, 강수일 비율,
+적설/안개처럼 대부분 비어 있는 열 등 실제 파일과 비슷한 분포를 따릅니다.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ["지점", "지점명", "일시", "평균기온(°C)", "최저기온(°C)", "최고기온(°C)", "일강수량(mm)",
+           "최대 풍속(m/s)", "평균 상대습도(%)", "합계 일조시간(hr)", "일 최심적설(cm)", "평균 지면온도(°C)",
+           "안개 계속시간(hr)"]
+
+# (지점 번호, 지점명, 연평균기온 보정)
+STATIONS = [
+    (90, "속초", -0.5), (95, "철원", -3.0), (98, "동두천", -1.0), (100, "대관령", -6.0), (101, "춘천", -1.5),
+    (105, "강릉", 0.5), (108, "서울", 0.0), (112, "인천", -0.5), (114, "원주", -1.2), (119, "수원", -0.3),
+    (127, "충주", -1.0), (129, "서산", -0.6), (131, "청주", 0.0), (133, "대전", 0.2), (135, "추풍령", -1.2),
+    (136, "안동", -0.5), (138, "포항", 1.8), (140, "군산", 0.0), (143, "대구", 1.8), (146, "전주", 0.8),
+    (152, "울산", 2.0), (156, "광주", 1.5), (159, "부산", 2.8), (162, "통영", 2.6), (165, "목포", 1.8),
+    (168, "여수", 2.4), (184, "제주", 3.8), (185, "고산", 3.5), (189, "서귀포", 4.6), (192, "진주", 1.2),
+]
+
+BASE_TEMP = 13.0          # 연평균기온 (보정 전)
+START_DATE = "2000-01-01"
+
+
+def plan(n_rows: int, n_stations: int = None):
+    """행 수 -> (지점 수, 지점당 일수). 지점 하나당 최대 약 25년 (넘치면 지점 수를 늘림)"""
+    if n_stations is None:
+        n_stations = max(1, int(np.ceil(n_rows / (365 * 25))))
+    days = int(np.ceil(n_rows / n_stations))
+    return n_stations, days
+
+
+def station_block(station_idx: int, days: int, rng: np.random.Generator, start=START_DATE) -> pd.DataFrame:
+    """지점 하나의 연속된 days일 자료"""
+    code, name, offset = STATIONS[station_idx % len(STATIONS)]
+    # 지점 수가 목록보다 많으면 번호만 바꿔서 반복
+    code = code + 1000 * (station_idx // len(STATIONS))
+
+    dates = pd.date_range(start, periods=days, freq="D")
+    doy = dates.dayofyear.to_numpy()
+    season = np.sin(2 * np.pi * (doy - 105) / 365.25)
+
+    # 평균기온: 계절 변화 + 자기상관 잡음 (지수이동평균으로 며칠씩 이어지게)
+    noise = rng.normal(0, 2.2, days)
+    noise = pd.Series(noise).ewm(alpha=0.4).mean().to_numpy() * 1.6
+    avg = BASE_TEMP + offset + 13.5 * season + noise
+    spread = rng.uniform(5, 12, days)
+    t_min = avg - spread * rng.uniform(0.4, 0.6, days)
+    t_max = t_min + spread
+
+    # 강수: 약 44%의 날, 여름에 더 잦고 많음
+    p_rain = 0.35 + 0.15 * np.clip(season, 0, None)
+    wet = rng.random(days) < p_rain
+    rain = np.where(wet, rng.gamma(0.6, 8 + 20 * np.clip(season, 0, None), days), np.nan)
+
+    wind = rng.gamma(6, 0.75, days) + 1.0
+    humid = np.clip(65 + 12 * season + np.where(wet, 15, 0) + rng.normal(0, 8, days), 15, 100)
+    sun = np.clip(rng.normal(7, 3, days) - np.where(wet, 4, 0), 0, 14)
+    sun[rng.random(days) < 0.01] = np.nan
+
+    snowy = (avg < 1.0) & wet
+    snow = np.where(snowy, rng.gamma(1.2, 2.0, days), np.nan)
+    ground = avg + rng.normal(1.5, 1.0, days)
+    fog = np.where(rng.random(days) < 0.02, rng.gamma(1.5, 1.2, days), np.nan)
+
+    return pd.DataFrame({
+        "지점": np.full(days, code, dtype=np.int64),
+        "지점명": name,
+        "일시": dates.strftime("%Y-%m-%d"),
+        "평균기온(°C)": avg.round(1),
+        "최저기온(°C)": t_min.round(1),
+        "최고기온(°C)": t_max.round(1),
+        "일강수량(mm)": np.round(rain, 1),
+        "최대 풍속(m/s)": wind.round(1),
+        "평균 상대습도(%)": humid.round(1),
+        "합계 일조시간(hr)": np.round(sun, 1),
+        "일 최심적설(cm)": np.round(snow, 1),
+        "평균 지면온도(°C)": ground.round(1),
+        "안개 계속시간(hr)": np.round(fog, 2),
+    }, columns=COLUMNS)
+
+
+def iter_blocks(n_rows: int, seed: int = 0, n_stations: int = None):
+    """지점 단위 DataFrame을 차례로 (합치면 정확히 n_rows행)"""
+    rng = np.random.default_rng(seed)
+    n_st, days = plan(n_rows, n_stations)
+    left = n_rows
+    for i in range(n_st):
+        if left <= 0:
+            break
+        block = station_block(i, days, rng)
+        yield block.iloc[:left] if len(block) > left else block
+        left -= len(block)
+
+
+def generate(n_rows: int, seed: int = 0, n_stations: int = None) -> pd.DataFrame:
+    return pd.concat(list(iter_blocks(n_rows, seed, n_stations)), ignore_index=True)
+
+
+def write_csv(path: str, n_rows: int, seed: int = 0, n_stations: int = None, encoding: str = "cp949") -> str:
+    """지점 단위로 나눠서 바로 파일에 씀 (1e8행도 메모리에 전체를 올리지 않음)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding=encoding, newline="") as f:
+        for i, block in enumerate(iter_blocks(n_rows, seed, n_stations)):
+            block.to_csv(f, index=False, header=(i == 0))
+    os.replace(tmp, path)
+    return path
+
+
+def cached_csv(data_dir: str, n_rows: int, seed: int = 0) -> str:
+    """같은 행 수/시드의 파일이 있으면 재사용"""
+    path = os.path.join(data_dir, f"OBS_ASOS_DD_synth_{n_rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path, n_rows, seed)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가상 ASOS 일자료 CSV 생성")
+    parser.add_argument("rows", type=float, help="행 수 (예: 1e6)")
+    parser.add_argument("-o", "--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stations", type=int, default=None, help="지점 수 (기본: 행 수에 맞춰 자동)")
+    args = parser.parse_args()
+    write_csv(args.out, int(args.rows), args.seed, args.stations)
+    print(f"생성 완료: {args.out} ({int(args.rows)}행)")
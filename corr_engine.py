@@ -0,0 +1,241 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from agg_cube import SEASONS, MONTH_TO_SEASON
+
+
+SEASON_NAMES = list(SEASONS)
+METHODS = ["pearson", "spearman"]
+
+
+def season_codes(dates) -> np.ndarray:
+    """일시 -> 계절 번호 (봄=0 ... 겨울=3, 날짜가 없으면 4)"""
+    dt = dates if pd.api.types.is_datetime64_any_dtype(getattr(dates, "dtype", None)) \
+        else pd.to_datetime(dates, errors="coerce")
+    month = pd.Series(dt).dt.month.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = np.full(len(month), len(SEASON_NAMES), dtype=np.int64)
+    ok = ~np.isnan(month)
+    codes[ok] = MONTH_TO_SEASON[month[ok].astype(np.int64)]
+    return codes
+
+
+def grouped_moments(X: np.ndarray, codes: np.ndarray, n_groups: int):
+    """그룹별 쌍(pairwise) 교차곱 누적값을 한 번에 계산
+
+    N[g,i,j]   = i, j 둘 다 값이 있는 행 수
+    Sx[g,i,j]  = 그 행들에서 x_i 합     (Sx[g,j,i]가 x_j 합)
+    Sxx[g,i,j] = 그 행들에서 x_i^2 합
+    Sxy[g,i,j] = 그 행들에서 x_i*x_j 합
+    """
+    V = X.shape[1]
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+
+    valid = ~np.isnan(X)
+    # 전체 평균을 빼 두면 큰 값끼리 곱할 때 생기는 정밀도 손실이 줄어듦
+    center = np.zeros(V)
+    has = valid.any(axis=0)
+    center[has] = np.nanmean(X[:, has], axis=0)
+    Z = np.where(valid, X - center, 0.0)[order]
+    M = valid[order].astype(np.float64)
+
+    out = np.zeros((4, n_groups, V, V))
+    for g in range(n_groups):
+        a, b = bounds[g], bounds[g + 1]
+        if a == b:
+            continue
+        z, m = Z[a:b], M[a:b]
+        out[0, g] = m.T @ m
+        out[1, g] = z.T @ m
+        out[2, g] = (z * z).T @ m
+        out[3, g] = z.T @ z
+    return out
+
+
+def _subset_ranks(sorted_vals: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """정렬해 둔 값에서 keep인 칸만 남겼을 때의 순위 (동점은 평균 순위, 정렬 순서 그대로 반환)
+
+    다시 정렬하지 않고 동점 구간마다 남은 개수만 세서 O(n)
+    """
+    new_run = np.empty(len(sorted_vals), dtype=bool)
+    new_run[:1] = True
+    new_run[1:] = sorted_vals[1:] != sorted_vals[:-1]
+    run_id = np.cumsum(new_run) - 1
+    kept = np.bincount(run_id, weights=keep, minlength=int(run_id[-1]) + 1 if len(run_id) else 0)
+    before = np.cumsum(kept) - kept
+    return (before + (kept + 1) / 2)[run_id]
+
+
+def pairwise_rank_moments(X: np.ndarray, moments: np.ndarray):
+    """spearman 누적값 (4, V, V)에서 결측 위치가 다른 열 쌍만 쌍별 순위로 다시 계산 (제자리 수정)
+
+    열별 순위는 그 열의 값이 있는 행 전체에서 매긴 것이라, 두 열의 결측 위치가 다르면
+    DataFrame.corr(method="spearman")처럼 둘 다 값이 있는 행만으로 순위를 다시 매겨야 같아짐
+    (결측 위치가 같은 쌍은 열별 순위가 곧 쌍별 순위라 그대로 둠)
+    """
+    N = moments[0]
+    own = np.diag(N)
+    fix_i, fix_j = np.nonzero(np.triu((N != own[:, None]) | (N != own[None, :]), k=1))
+    if not len(fix_i):
+        return moments
+
+    valid = ~np.isnan(X)
+    sorted_cols = {}
+
+    def sorted_col(c):
+        if c not in sorted_cols:
+            rows = np.flatnonzero(valid[:, c])
+            order = rows[np.argsort(X[rows, c], kind="stable")]
+            sorted_cols[c] = (order, X[order, c])
+        return sorted_cols[c]
+
+    for i, j in zip(fix_i, fix_j):
+        ranks = []
+        for a, b in ((i, j), (j, i)):
+            order, vals = sorted_col(a)
+            keep = valid[order, b]
+            r = np.full(len(X), np.nan)
+            r[order[keep]] = _subset_ranks(vals, keep)[keep]
+            ranks.append(r)
+        both = ~np.isnan(ranks[0]) & ~np.isnan(ranks[1])
+        n = int(both.sum())
+        # 순위 가운데((n+1)/2)를 빼서 큰 n에서도 제곱합 정밀도 유지
+        ri, rj = ranks[0][both] - (n + 1) / 2, ranks[1][both] - (n + 1) / 2
+        moments[0, i, j] = moments[0, j, i] = n
+        moments[1, i, j], moments[1, j, i] = ri.sum(), rj.sum()
+        moments[2, i, j], moments[2, j, i] = (ri * ri).sum(), (rj * rj).sum()
+        moments[3, i, j] = moments[3, j, i] = (ri * rj).sum()
+    return moments
+
+
+def corr_from_moments(moments: np.ndarray) -> np.ndarray:
+    """누적값 (4, V, V) -> 상관행렬 (pairwise 결측 처리, 값이 2개 미만/분산 0이면 NaN)"""
+    N, Sx, Sxx, Sxy = moments
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = N * Sxy - Sx * Sx.T
+        var_x = N * Sxx - Sx * Sx
+        var_y = var_x.T
+        r = cov / np.sqrt(var_x * var_y)
+    r[(N < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+
+    diag = np.diag(r).copy()
+    r[np.diag_indices_from(r)] = np.where(np.isnan(diag), np.nan, 1.0)
+    return r
+
+
+class CorrEngine:
+    """계절별 상관행렬 4개 + 전체 상관행렬을 교차곱 한 번으로 계산
+
+    - 계절별 누적값을 구하고, 전체는 계절 누적값의 합 (행을 다시 읽지 않음)
+    - spearman은 열별 순위(결측 제외)를 데이터 버전마다 한 번만 만들어 재사용,
+      결측 위치가 다른 열 쌍만 둘 다 값이 있는 행으로 다시 순위 (DataFrame.corr(method="spearman")과 같은 값)
+    - 결과는 (데이터 버전, k, method, nonnull_ratio) 단위로 캐시
+    """
+
+    def __init__(self, max_items: int = 16):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        # 작업 스레드에서 호출되므로 잠금 (make 안에서 다시 _get을 부르므로 RLock)
+        self._lock = threading.RLock()
+
+    def _get(self, key, make):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            val = make()
+            self._items[key] = val
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            return val
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    # ---- 버전별 준비물 ----
+    def _prepared(self, df: pd.DataFrame, version):
+        def make():
+            num_df = df.select_dtypes(include=[np.number]).drop(columns=["월", "지점"], errors="ignore")
+            codes = season_codes(df["일시"])
+            return num_df, codes
+        return self._get((version, "prep"), make)
+
+    def _values(self, df, version, method: str):
+        num_df, codes = self._prepared(df, version)
+        if method == "pearson":
+            return num_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        if method == "spearman":
+            def make():
+                # 계절 안에서의 순위 (전체 순위는 따로 필요: 계절 합으로 구할 수 없음)
+                grouped = num_df.groupby(codes).rank().to_numpy(dtype=np.float64, na_value=np.nan)
+                overall = num_df.rank().to_numpy(dtype=np.float64, na_value=np.nan)
+                return grouped, overall
+            return self._get((version, "rank"), make)
+        raise ValueError(f"지원하지 않는 상관방법: {method}")
+
+    def _moments(self, df, version, method: str):
+        """(계절별 누적값 (4,G,V,V), 전체 누적값 (4,V,V))"""
+        def make():
+            _, codes = self._prepared(df, version)
+            n_groups = len(SEASON_NAMES) + 1
+            vals = self._values(df, version, method)
+            if method == "spearman":
+                grouped, overall = vals
+                per = grouped_moments(grouped, codes, n_groups)
+                total = grouped_moments(overall, np.zeros(len(codes), dtype=np.int64), 1)[:, 0]
+                raw, _ = self._prepared(df, version)
+                X = raw.to_numpy(dtype=np.float64, na_value=np.nan)
+                for g in range(len(SEASON_NAMES)):
+                    pairwise_rank_moments(X[codes == g], per[:, g])
+                pairwise_rank_moments(X, total)
+            else:
+                per = grouped_moments(vals, codes, n_groups)
+                total = per.sum(axis=1)
+            return per, total
+        return self._get((version, "moments", method), make)
+
+    # ---- 계산 ----
+    def seasonal(self, df: pd.DataFrame, version, k: int, method: str = "pearson",
+                 nonnull_ratio: float = 0.7, min_rows: int = 30, progress=None) -> dict:
+        """{"selected_cols", "global", "seasons": {계절: (행 수, 상관행렬 또는 None)}}"""
+        method = (method or "pearson").lower()
+
+        def make():
+            num_df, codes = self._prepared(df, version)
+            if progress:
+                progress(0.2, "교차곱 계산")
+            per, total = self._moments(df, version, method)
+
+            need = int(len(num_df) * nonnull_ratio)
+            valid = np.flatnonzero(num_df.notna().sum().to_numpy() >= need)
+            if len(valid) < 2:
+                raise ValueError("유효한 숫자 컬럼이 너무 부족합니다. (유효비율을 낮추거나 k를 줄이기)")
+
+            # 전체 상관에서 |r| 평균이 큰 순으로 k개
+            if progress:
+                progress(0.6, "변수 선택")
+            base = corr_from_moments(total[:, valid][:, :, valid])
+            abs_base = np.abs(base)
+            np.fill_diagonal(abs_base, np.nan)
+            with np.errstate(invalid="ignore"):
+                mean_abs = pd.Series(np.nanmean(abs_base, axis=1), index=num_df.columns[valid])
+            selected_cols = mean_abs.sort_values(ascending=False).head(min(k, len(mean_abs))).index.tolist()
+            sel = [num_df.columns.get_loc(c) for c in selected_cols]
+
+            def frame(m):
+                return pd.DataFrame(corr_from_moments(m[:, sel][:, :, sel]), index=selected_cols, columns=selected_cols)
+
+            counts = np.bincount(codes, minlength=len(SEASON_NAMES) + 1)
+            seasons = {s: (int(counts[i]), frame(per[:, i])) for i, s in enumerate(SEASON_NAMES)}
+            return {"selected_cols": selected_cols, "global": frame(total), "seasons": seasons}
+
+        res = self._get((version, int(k), method, float(nonnull_ratio)), make)
+
+        # min_rows는 표시 여부만 정하므로 캐시 키에 넣지 않음
+        seasons = {s: (n, mat if n >= min_rows else None) for s, (n, mat) in res["seasons"].items()}
+        return {**res, "seasons": seasons}
@@ -0,0 +1,163 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from date_index import DateIndex
+
+
+class Change:
+    """작업 스레드에서 미리 만들어 둔 변경 결과 (적용은 commit에서 메인 스레드로)"""
+
+    def __init__(self, kind: str, base_version: int, df: pd.DataFrame, index: DateIndex, info: dict):
+        self.kind = kind
+        self.base_version = base_version
+        self.df = df
+        self.index = index
+        self.info = info
+
+
+class SharedDataset:
+    """여러 창이 같이 보는 데이터 한 벌 (DataFrame + 날짜 색인)
+
+    - 창마다 CSV를 다시 읽지 않고 같은 DataFrame 객체를 그대로 참조 (복사 없음)
+    - df는 바꾸지 않고, 행 추가/값 수정/교체는 새 DataFrame으로 만들어서 바꿔 끼움
+      (안 바뀐 열 버퍼는 공유, 이전 df를 쓰는 작업 스레드에도 영향 없음)
+    - build_*()는 작업 스레드에서, commit()은 메인 스레드에서 (구독 콜백이 Tk 위젯을 건드림)
+    """
+
+    def __init__(self, name: str, df: pd.DataFrame, index: DateIndex = None, source: str = None, prepare=None,
+                 derive=None, derived_columns=()):
+        """prepare(rows): 추가할 행 전처리, derive(rows) -> {열: 값}: 값 수정 후 다시 계산할 파생 열
+
+        derived_columns: 화면 표시용 파생 열 이름 (분석 창에서는 빼고 보여 줌)
+        """
+        self.name = name
+        self.source = source
+        self.prepare = prepare
+        self.derive = derive
+        self.derived_columns = list(derived_columns)
+        self.df = df
+        self.index = index if index is not None else DateIndex.from_df(df)
+        self.version = 1
+        self._subscribers = {}
+        self._next_token = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    # ---- 구독 ----
+    def subscribe(self, callback) -> int:
+        """callback(shared, change, origin) -> 해제용 번호"""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = callback
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    # ---- 변경 만들기 (작업 스레드 가능) ----
+    def build_append(self, rows: pd.DataFrame) -> Change:
+        version, df, index = self.version, self.df, self.index
+        if self.prepare is not None:
+            rows = self.prepare(rows)
+        out = pd.concat([df, rows], ignore_index=True)
+        # 날짜 색인은 추가분만 정렬해서 병합
+        col = "date" if "date" in out.columns else "일시"
+        new_index = index.extended(out[col].iloc[len(df):], offset=len(df))
+        return Change("append", version, out, new_index, {"start": len(df), "rows": len(rows)})
+
+    def build_correct(self, positions, values: dict) -> Change:
+        """positions 행의 열 값을 values({열: 값 또는 배열})로 수정 (바뀐 열만 새 버퍼)"""
+        version, df, index = self.version, self.df, self.index
+        positions = np.asarray(positions, dtype=np.int64)
+        out = df.copy(deep=False)
+        for col, v in values.items():
+            s = out[col].copy()
+            s.iloc[positions] = v
+            out[col] = s
+        if self.derive is not None:
+            # 이모지/요약 같은 파생 열은 고친 행만 다시 계산
+            for col, v in self.derive(out.iloc[positions]).items():
+                if col in values or col not in out.columns:
+                    continue
+                s = out[col].copy()
+                s.iloc[positions] = v
+                out[col] = s
+        if "일시" in values and "date" in out.columns:
+            out["date"] = out["일시"]
+        if "일시" in values or "date" in values:
+            index = DateIndex.from_df(out)
+        return Change("correct", version, out, index, {"positions": positions, "columns": list(values)})
+
+    def build_replace(self, df: pd.DataFrame, index: DateIndex = None, label: str = "") -> Change:
+        if index is None:
+            index = DateIndex.from_df(df)
+        return Change("replace", self.version, df, index, {"label": label})
+
+    # ---- 적용 (메인 스레드) ----
+    def commit(self, change: Change, origin=None) -> bool:
+        """만든 뒤 다른 변경이 먼저 들어왔으면 False (다시 build 해야 함)"""
+        if change.base_version != self.version:
+            return False
+        self.df = change.df
+        self.index = change.index
+        self.version += 1
+        with self._lock:
+            callbacks = list(self._subscribers.values())
+        for cb in callbacks:
+            cb(self, change, origin)
+        return True
+
+    def append(self, rows: pd.DataFrame, origin=None) -> bool:
+        return self.commit(self.build_append(rows), origin)
+
+    def correct(self, positions, values: dict, origin=None) -> bool:
+        return self.commit(self.build_correct(positions, values), origin)
+
+    def replace(self, df: pd.DataFrame, index: DateIndex = None, label: str = "", origin=None) -> bool:
+        return self.commit(self.build_replace(df, index, label), origin)
+
+
+class DatasetRegistry:
+    """이름 -> SharedDataset (메인 검색 창과 연간 분석 창이 같은 데이터를 찾는 곳)"""
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, df: pd.DataFrame, index: DateIndex = None, source: str = None,
+                 prepare=None, derive=None, derived_columns=()) -> SharedDataset:
+        """이미 있으면 구독자는 그대로 두고 내용만 교체"""
+        with self._lock:
+            shared = self._items.get(name)
+        if shared is not None:
+            shared.source = source
+            shared.prepare = prepare
+            shared.derive = derive
+            shared.derived_columns = list(derived_columns)
+            shared.replace(df, index, label="다시 로드")
+            return shared
+        shared = SharedDataset(name, df, index, source, prepare, derive, derived_columns)
+        with self._lock:
+            self._items[name] = shared
+        return shared
+
+    def get(self, name: str) -> SharedDataset:
+        with self._lock:
+            return self._items.get(name)
+
+    def names(self) -> list:
+        with self._lock:
+            return list(self._items)
+
+    def remove(self, name: str):
+        with self._lock:
+            self._items.pop(name, None)
+
+
+REGISTRY = DatasetRegistry()
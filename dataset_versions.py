@@ -0,0 +1,227 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+# ---- 변경 단계(delta) ----
+# 열 추가/삭제는 얕은 복사(df.copy(deep=False))에 열을 통째로 교체/삭제 → 나머지 열 버퍼는 공유
+# (pandas 전역 Copy-on-Write 설정은 건드리지 않음: 그래서 버전의 DataFrame은 읽기 전용으로만 씀)
+# ("assign", {열: 값})          열 추가/교체 (나머지 열 버퍼는 공유)
+# ("drop", [열, ...])           열 삭제
+# ("take", 위치배열, reset)      행 선택/재정렬 (reset=True면 인덱스 0..n-1로)
+# ("frame", df)                 통째로 교체 (로드 등)
+def _apply_step(df, step):
+    kind = step[0]
+    if kind == "frame":
+        return step[1]
+    if kind == "assign":
+        out = df.copy(deep=False)
+        for col, values in step[1].items():
+            out[col] = values
+        return out
+    if kind == "drop":
+        # df.drop은 pandas 2.x(CoW 꺼짐)에서 남은 열까지 복사하므로 얕은 복사에서 열만 뺌
+        out = df.copy(deep=False)
+        for col in step[1]:
+            if col in out.columns:
+                del out[col]
+        return out
+    if kind == "take":
+        out = df.take(step[1])
+        if step[2]:
+            out = out.reset_index(drop=True)
+        return out
+    raise ValueError(f"알 수 없는 변경 단계: {kind}")
+
+
+class DataVersion:
+    def __init__(self, vid, parent, steps, label, committed):
+        self.id = vid
+        self.parent = parent
+        self.steps = steps
+        self.label = label
+        self.committed = committed
+        # 판단 열처럼 임시 변경이면 기준(base)은 부모 쪽 확정 버전
+        self.base = self if committed else (parent.base if parent is not None else self)
+        self._frame = None
+
+    def has_frame_payload(self) -> bool:
+        return any(s[0] == "frame" for s in self.steps)
+
+
+class VersionedDataset:
+    """버전 관리되는 데이터셋 (df_raw/df_current/df_base 전체 복사 대체)
+
+    - 각 버전은 부모 + 변경 단계(delta)만 기록하고, 바뀌지 않은 열 버퍼는 부모와 공유
+    - 실제 DataFrame은 필요할 때 만들고, 최근 max_cached개만 메모리에 유지
+    - 여러 단계 실행 취소/다시 실행 지원 (최근 max_history단계까지, 더 오래된 단계는 버림)
+    - 돌려주는 DataFrame은 다른 버전과 열 버퍼를 공유하므로 값을 직접 바꾸지 않음 (바꿀 때는 apply로 새 버전)
+    """
+
+    def __init__(self, max_cached: int = 3, max_history: int = 50, on_prune=None):
+        """on_prune(남은 버전 번호 set): 버전이 버려질 때마다 호출 (버전별 캐시/마스크 정리용)"""
+        self.max_cached = max_cached
+        self.max_history = max(int(max_history), 1)
+        self.on_prune = on_prune
+        self._ids = itertools.count(1)
+        self._history = []
+        self._pos = -1
+        self._lru = []
+
+    # ---- 상태 ----
+    @property
+    def loaded(self) -> bool:
+        return self._pos >= 0
+
+    @property
+    def version(self) -> int:
+        """현재 버전 번호 (캐시 키/작업 guard 용, 변경될 때마다 증가)"""
+        return self._history[self._pos].id if self.loaded else 0
+
+    @property
+    def current_version(self) -> DataVersion:
+        return self._history[self._pos] if self.loaded else None
+
+    @property
+    def current(self) -> pd.DataFrame:
+        if not self.loaded:
+            return None
+        return self._materialize(self._history[self._pos])
+
+    @property
+    def base(self) -> pd.DataFrame:
+        if not self.loaded:
+            return None
+        return self._materialize(self._history[self._pos].base)
+
+    @property
+    def base_version(self) -> int:
+        return self._history[self._pos].base.id if self.loaded else 0
+
+    @property
+    def can_undo(self) -> bool:
+        return self._pos > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return 0 <= self._pos < len(self._history) - 1
+
+    def history(self) -> list:
+        return [(v.id, v.label, i == self._pos) for i, v in enumerate(self._history)]
+
+    def live_ids(self) -> set:
+        """아직 돌아갈 수 있는 버전 번호 (이력 + 이력이 기준으로 가리키는 버전)"""
+        return {v.id for v in self._history} | {v.base.id for v in self._history}
+
+    # ---- 변경 ----
+    def load(self, df: pd.DataFrame, label: str = "로드"):
+        self._history = []
+        self._pos = -1
+        self._lru = []
+        return self.apply(label, [("frame", df)], parent=None)
+
+    def apply(self, label: str, steps: list, committed: bool = True, from_base: bool = False,
+              parent="current", frame: pd.DataFrame = None):
+        """새 버전 추가. frame을 주면(작업 스레드에서 미리 계산한 결과) 그대로 캐시에 사용"""
+        if parent == "current":
+            cur = self.current_version
+            parent = cur.base if (from_base and cur is not None) else cur
+
+        v = DataVersion(next(self._ids), parent, steps, label, committed)
+        if frame is not None:
+            v._frame = frame
+            self._touch(v)
+
+        # 실행 취소 후 새 변경이 들어오면 redo 이력은 버림
+        dropped = len(self._history) - (self._pos + 1)
+        del self._history[self._pos + 1:]
+        self._history.append(v)
+        self._pos = len(self._history) - 1
+        dropped += self._compact()
+        # 버린 redo/오래된 버전이 캐시 목록에 남아 조상 체인을 붙잡지 않게
+        live = set(self._history) | {x.base for x in self._history}
+        self._lru = [x for x in self._lru if x in live]
+        # load는 이력을 비우고 들어오므로 parent가 없으면 항상 정리
+        if self.on_prune is not None and (dropped or parent is None):
+            self.on_prune(self.live_ids())
+        return v
+
+    def reset_to_base(self, label: str = "필터 해제/복구"):
+        """현재 버전의 기준(확정) 상태로 되돌리는 새 버전 (열 버퍼 그대로 공유)"""
+        return self.apply(label, [], parent=self.current_version.base)
+
+    def undo(self):
+        if self.can_undo:
+            self._pos -= 1
+        return self.current_version
+
+    def redo(self):
+        if self.can_redo:
+            self._pos += 1
+        return self.current_version
+
+    # ---- 내부: 실체화 + 캐시 ----
+    def _materialize(self, v: DataVersion) -> pd.DataFrame:
+        df = v._frame
+        if df is None:
+            # 프레임이 남아 있는 가장 가까운 조상까지 올라갔다가 순서대로 적용 (재귀 X: 이력이 길어도 안전)
+            chain = []
+            node = v
+            while node is not None and node._frame is None:
+                chain.append(node)
+                node = node.parent
+            df = node._frame if node is not None else None
+            for x in reversed(chain):
+                for step in x.steps:
+                    df = _apply_step(df, step)
+            v._frame = df
+        # _touch가 v 자신의 프레임을 비울 수도 있어서 (현재/기준이 아닌 버전) 지역 변수로 반환
+        self._touch(v)
+        return df
+
+    def _compact(self):
+        """이력이 max_history를 넘으면 오래된 버전을 버림 -> 버린 버전 수
+
+        남은 가장 오래된 버전과, 남은 버전이 부모/기준으로 가리키는 버린 버전은 통째 프레임으로 바꿔
+        그보다 앞의 단계(take 위치 배열 등)가 메모리에 남지 않게 함
+        """
+        extra = len(self._history) - self.max_history
+        if extra <= 0:
+            return 0
+        gone = set(self._history[:extra])
+        del self._history[:extra]
+        self._pos -= extra
+
+        first = self._history[0]
+        roots = [first]
+        for v in self._history:
+            # first는 자기 프레임으로 뿌리가 되므로 부모는 필요 없음 (기준 버전으로 쓰일 때만 남김)
+            refs = (v.base,) if v is first else (v.parent, v.base)
+            for ref in refs:
+                if ref in gone and ref not in roots:
+                    roots.append(ref)
+        # 먼저 전부 실체화한 뒤에 부모를 끊음 (끊는 순서에 따라 다른 뿌리를 못 만들 수 있음)
+        frames = [self._materialize(v) for v in roots]
+        for v, df in zip(roots, frames):
+            v.steps = [("frame", df)]
+            v.parent = None
+        return extra
+
+    def _touch(self, v: DataVersion):
+        if v in self._lru:
+            self._lru.remove(v)
+        self._lru.append(v)
+
+        # 원본("frame") 버전은 delta 자체가 프레임이라 비울 필요 없음
+        keep = {self.current_version, self.current_version.base} if self.loaded else set()
+        evictable = [x for x in self._lru if x not in keep and not x.has_frame_payload()]
+        while len(self._lru) > self.max_cached and evictable:
+            old = evictable.pop(0)
+            old._frame = None
+            self._lru.remove(old)
+
+
+def positions_of(mask) -> np.ndarray:
+    """불리언 마스크 -> take용 위치 배열"""
+    return np.flatnonzero(np.asarray(mask, dtype=bool))
@@ -0,0 +1,159 @@
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def to_day_number(d) -> int:
+    """date/Timestamp/문자열 -> 1970-01-01 기준 일수"""
+    if not isinstance(d, date):
+        d = pd.Timestamp(d).date()
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def day_number_to_date(n: int) -> date:
+    return np.datetime64(int(n), "D").astype(object)
+
+
+class DateIndex:
+    """날짜 -> 행 위치 색인 (정렬된 일수 배열 + searchsorted)
+
+    - 한 번만 벡터 연산으로 만들고, 조회는 O(log n)
+    - 같은 날짜에 여러 행(여러 지점)이 있어도 됨
+    - 결과는 행 위치(np.ndarray) 또는 df.iloc 뷰
+    """
+
+    def __init__(self, dates):
+        days = self._as_day_numbers(dates)
+
+        # 정렬 순서(안정 정렬: 같은 날짜는 원래 행 순서 유지)
+        self.order = np.argsort(days, kind="stable")
+        self.sorted_days = days[self.order]
+
+        # 고유 날짜 목록 (달력 등에서 존재 여부 확인용)
+        self.unique_days = np.unique(self.sorted_days)
+
+    @classmethod
+    def _from_sorted(cls, order, sorted_days, unique_days) -> "DateIndex":
+        index = cls.__new__(cls)
+        index.order = order
+        index.sorted_days = sorted_days
+        index.unique_days = unique_days
+        return index
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, col: str = "date") -> "DateIndex":
+        if col not in df.columns and "일시" in df.columns:
+            col = "일시"
+        return cls(df[col])
+
+    @staticmethod
+    def _as_day_numbers(dates) -> np.ndarray:
+        s = pd.Series(dates)
+        if not pd.api.types.is_datetime64_any_dtype(s.dtype):
+            s = pd.to_datetime(s, errors="coerce")
+        return s.to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    def extended(self, dates, offset: int = None) -> "DateIndex":
+        """행 추가 후의 새 색인 (기존 색인은 그대로 두고, 추가분만 정렬해서 병합)
+
+        dates: 추가된 행의 날짜, offset: 추가된 첫 행의 위치 (기본: 기존 행 수)
+        """
+        if offset is None:
+            offset = len(self)
+        days = self._as_day_numbers(dates)
+        order = np.argsort(days, kind="stable")
+        new_days = days[order]
+        # 같은 날짜는 기존 행 뒤에 (안정 정렬과 같은 순서)
+        at = np.searchsorted(self.sorted_days, new_days, side="right")
+        return DateIndex._from_sorted(
+            np.insert(self.order, at, order + offset),
+            np.insert(self.sorted_days, at, new_days),
+            np.union1d(self.unique_days, new_days),
+        )
+
+    def __len__(self):
+        return len(self.sorted_days)
+
+    @property
+    def first_day(self):
+        return day_number_to_date(self.unique_days[0]) if len(self.unique_days) else None
+
+    @property
+    def last_day(self):
+        return day_number_to_date(self.unique_days[-1]) if len(self.unique_days) else None
+
+    # ---- 존재 여부 ----
+    def has(self, d) -> bool:
+        n = to_day_number(d)
+        i = np.searchsorted(self.unique_days, n)
+        return bool(i < len(self.unique_days) and self.unique_days[i] == n)
+
+    def days_between(self, start, end) -> set:
+        """[start, end] 구간에서 데이터가 있는 날짜 set"""
+        lo = np.searchsorted(self.unique_days, to_day_number(start), side="left")
+        hi = np.searchsorted(self.unique_days, to_day_number(end), side="right")
+        return {day_number_to_date(n) for n in self.unique_days[lo:hi]}
+
+    # ---- 행 위치 조회 ----
+    def positions(self, d) -> np.ndarray:
+        n = to_day_number(d)
+        lo = np.searchsorted(self.sorted_days, n, side="left")
+        hi = np.searchsorted(self.sorted_days, n, side="right")
+        return self.order[lo:hi]
+
+    def range_positions(self, start, end) -> np.ndarray:
+        """[start, end] (양끝 포함) 구간의 행 위치 (날짜순)"""
+        lo = np.searchsorted(self.sorted_days, to_day_number(start), side="left")
+        hi = np.searchsorted(self.sorted_days, to_day_number(end), side="right")
+        return self.order[lo:hi]
+
+    def positions_many(self, days) -> np.ndarray:
+        """여러 날짜의 행 위치 (입력 날짜 순서대로 이어 붙임)"""
+        nums = np.asarray([to_day_number(d) for d in days], dtype=np.int64)
+        lo = np.searchsorted(self.sorted_days, nums, side="left")
+        hi = np.searchsorted(self.sorted_days, nums, side="right")
+        if not len(nums):
+            return np.empty(0, dtype=self.order.dtype)
+        return np.concatenate([self.order[a:b] for a, b in zip(lo, hi)])
+
+    def month_positions(self, year: int, month: int) -> np.ndarray:
+        last = calendar.monthrange(year, month)[1]
+        return self.range_positions(date(year, month, 1), date(year, month, last))
+
+    def week_positions(self, year: int, week: int) -> np.ndarray:
+        """ISO 주(월~일)"""
+        start = date.fromisocalendar(year, week, 1)
+        return self.range_positions(start, date.fromisocalendar(year, week, 7))
+
+    def same_day_positions(self, month: int, day: int) -> np.ndarray:
+        """데이터가 있는 모든 해의 month/day (2/29는 윤년만)"""
+        if not len(self.unique_days):
+            return np.empty(0, dtype=self.order.dtype)
+        days = []
+        for y in range(self.first_day.year, self.last_day.year + 1):
+            if day <= calendar.monthrange(y, month)[1]:
+                days.append(date(y, month, day))
+        return self.positions_many(days)
+
+    def first_positions_between(self, start, end):
+        """[start, end] 구간에서 날짜별 첫 행 -> (date 배열, 행 위치 배열) (달력 한 달 치를 한 번에)"""
+        lo = np.searchsorted(self.sorted_days, to_day_number(start), side="left")
+        hi = np.searchsorted(self.sorted_days, to_day_number(end), side="right")
+        days, first = np.unique(self.sorted_days[lo:hi], return_index=True)
+        return days.astype("datetime64[D]").astype(object), self.order[lo:hi][first]
+
+    def first_position(self, d):
+        pos = self.positions(d)
+        return int(pos[0]) if len(pos) else None
+
+    # ---- DataFrame 뷰 ----
+    def rows(self, df: pd.DataFrame, d) -> pd.DataFrame:
+        return df.iloc[self.positions(d)]
+
+    def range_rows(self, df: pd.DataFrame, start, end) -> pd.DataFrame:
+        return df.iloc[self.range_positions(start, end)]
+
+    def rows_many(self, df: pd.DataFrame, days) -> pd.DataFrame:
+        return df.iloc[self.positions_many(days)]
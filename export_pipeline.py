@@ -0,0 +1,243 @@
+"""표(DataFrame) 내보내기: 조각(chunk) 단위로 쓰고, 임시 파일에 다 쓴 뒤 이름만 바꿈
+
+- 형식: csv(utf-8-sig), csv.gz, csv.zst, parquet, feather, npz (경로의 확장자로 자동 선택)
+- 행을 chunk_rows개씩 잘라서 씀 → 큰 표도 전체 복사본(문자열/Arrow 표)을 한 번에 만들지 않음
+- 판단(0/1) 열처럼 저장할 때만 붙이는 열은 extra_columns로 넘기면 조각마다 붙임 (원본 복사 X)
+- 중간에 실패/취소하면 임시 파일만 지우고, 같은 이름의 기존 파일은 그대로 남음
+- parquet/feather는 pyarrow, zstd는 zstandard(또는 Python 3.14+ compression.zstd)가 있을 때만
+"""
+import gzip
+import importlib.util
+import io
+import os
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+CHUNK_ROWS = 100_000
+
+# 형식 -> (파일 대화상자 이름, 확장자)
+FORMATS = OrderedDict([
+    ("csv", ("CSV (utf-8-sig)", ".csv")),
+    ("csv.gz", ("CSV gzip 압축", ".csv.gz")),
+    ("csv.zst", ("CSV zstd 압축", ".csv.zst")),
+    ("parquet", ("Parquet", ".parquet")),
+    ("feather", ("Feather", ".feather")),
+    ("npz", ("NumPy 열 묶음", ".npz")),
+])
+
+
+class ExportError(Exception):
+    pass
+
+
+def _has_module(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _has_zstd() -> bool:
+    return _has_module("zstandard") or _has_module("compression.zstd")
+
+
+def available_formats() -> list:
+    """지금 환경에서 쓸 수 있는 형식 (선택 패키지가 없는 형식은 빠짐)"""
+    out = []
+    for fmt in FORMATS:
+        if fmt == "csv.zst" and not _has_zstd():
+            continue
+        if fmt in ("parquet", "feather") and not _has_module("pyarrow"):
+            continue
+        out.append(fmt)
+    return out
+
+
+def filetypes() -> list:
+    """filedialog.asksaveasfilename(filetypes=...)용 목록 (CSV가 처음)"""
+    return [(FORMATS[f][0], "*" + FORMATS[f][1]) for f in available_formats()]
+
+
+def format_for_path(path: str) -> str:
+    """경로 확장자 -> 형식 (모르는 확장자는 csv)"""
+    name = os.path.basename(path).lower()
+    # .csv.gz가 .gz보다 먼저 맞도록 긴 확장자부터
+    for fmt, (_, ext) in sorted(FORMATS.items(), key=lambda kv: -len(kv[1][1])):
+        if name.endswith(ext):
+            return fmt
+    if name.endswith(".gz"):
+        return "csv.gz"
+    if name.endswith(".zst"):
+        return "csv.zst"
+    return "csv"
+
+
+def export_frame(df: pd.DataFrame, path: str, fmt: str = None, extra_columns: dict = None,
+                 chunk_rows: int = CHUNK_ROWS, progress=None) -> int:
+    """df를 path에 저장 -> 쓴 행 수
+
+    fmt: None이면 확장자로 판단
+    extra_columns: {열 이름: 길이 len(df)인 배열} (조각마다 잘라서 붙임)
+    progress(frac, msg): 작업 스레드의 ctx.progress (취소되면 예외를 던져 중단)
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in FORMATS:
+        raise ExportError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+    if fmt not in available_formats():
+        need = "zstandard" if fmt == "csv.zst" else "pyarrow"
+        raise ExportError(f"{FORMATS[fmt][0]} 형식은 {need} 패키지가 필요합니다 (pip install {need})")
+
+    extra = dict(extra_columns or {})
+    for name, values in extra.items():
+        if len(values) != len(df):
+            raise ExportError(f"추가 열 길이가 다릅니다: {name} ({len(values)} != {len(df)})")
+
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    # 같은 폴더에 임시 파일 (다른 드라이브면 os.replace가 원자적이지 않음)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = _WRITERS[fmt]
+    try:
+        writer(df, tmp, extra, max(int(chunk_rows), 1), progress or _no_progress)
+        os.replace(tmp, path)
+    except BaseException:
+        # 취소(JobCancelled)도 여기로: 반쯤 쓴 파일은 남기지 않음
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return len(df)
+
+
+def _no_progress(frac=None, msg: str = ""):
+    pass
+
+
+def iter_chunks(df: pd.DataFrame, extra: dict, chunk_rows: int):
+    """(시작 행, 조각 DataFrame) 순서대로, 빈 표는 열 이름만 있는 조각 하나"""
+    n = len(df)
+    for start in range(0, max(n, 1), chunk_rows):
+        stop = min(start + chunk_rows, n)
+        chunk = df.iloc[start:stop]
+        if extra:
+            chunk = chunk.assign(**{name: np.asarray(values[start:stop]) for name, values in extra.items()})
+        yield start, chunk
+
+
+def _report(progress, done: int, total: int, what: str):
+    progress(done / total if total else 1.0, f"{what} {done:,}/{total:,}행")
+
+
+# -------------------- CSV --------------------
+def _open_zstd(path: str):
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.open(path, "wb")
+    except ImportError:
+        import zstandard
+        return zstandard.open(path, "wb")
+
+
+def _csv_writer(opener):
+    def write(df, path, extra, chunk_rows, progress):
+        n = len(df)
+        with opener(path) as raw:
+            # BOM은 파일 처음에 한 번만 (압축 파일도 풀면 엑셀에서 바로 열리게)
+            with io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as fh:
+                for start, chunk in iter_chunks(df, extra, chunk_rows):
+                    chunk.to_csv(fh, index=False, header=(start == 0))
+                    _report(progress, start + len(chunk), n, "CSV 쓰는 중")
+    return write
+
+
+# -------------------- Arrow (parquet/feather) --------------------
+def _arrow_writer(kind: str):
+    def write(df, path, extra, chunk_rows, progress):
+        import pyarrow as pa
+
+        n = len(df)
+        schema = writer = None
+        try:
+            for start, chunk in iter_chunks(df, extra, chunk_rows):
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = _open_arrow(kind, path, schema)
+                writer.write_table(table)
+                _report(progress, start + len(chunk), n, f"{kind} 쓰는 중")
+        finally:
+            if writer is not None:
+                writer.close()
+    return write
+
+
+def _open_arrow(kind: str, path: str, schema):
+    import pyarrow as pa
+
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    # feather(V2) = Arrow IPC 파일, write_feather 기본값처럼 lz4 압축
+    try:
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+    except (ValueError, pa.ArrowException):
+        options = None
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+# -------------------- NPZ --------------------
+def _npz_array(s: pd.Series) -> np.ndarray:
+    """열 -> npy로 저장할 배열 (숫자/날짜는 그대로, 글자/범주는 유니코드 배열)"""
+    if pd.api.types.is_datetime64_any_dtype(s.dtype) and getattr(s.dtype, "tz", None) is None:
+        return s.to_numpy()
+    if pd.api.types.is_bool_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+        return s.to_numpy()
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        if pd.api.types.is_extension_array_dtype(s.dtype):
+            # Int32 등 결측 가능 정수: 결측은 NaN
+            return s.to_numpy(dtype=np.float64, na_value=np.nan)
+        return s.to_numpy()
+    return s.astype("string").fillna("").to_numpy(dtype=str)
+
+
+def _write_npz(df, path, extra, chunk_rows, progress):
+    """열마다 npy 하나 (np.load(path)[열 이름]), 한 번에 한 열만 변환해서 씀"""
+    columns = [(str(c), df[c]) for c in df.columns] + [(str(k), pd.Series(v)) for k, v in extra.items()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for i, (name, s) in enumerate(columns):
+            arr = _npz_array(s)
+            with zf.open(name + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, arr, allow_pickle=False)
+            progress((i + 1) / len(columns), f"npz 쓰는 중 {i + 1}/{len(columns)}열")
+
+
+_WRITERS = {
+    "csv": _csv_writer(lambda p: open(p, "wb")),
+    "csv.gz": _csv_writer(lambda p: gzip.open(p, "wb", compresslevel=6)),
+    "csv.zst": _csv_writer(_open_zstd),
+    "parquet": _arrow_writer("parquet"),
+    "feather": _arrow_writer("feather"),
+    "npz": _write_npz,
+}
+
+
+if __name__ == "__main__":
+    # 사용: python export_pipeline.py <입력 csv> <출력 경로> [인코딩]  (확장자로 형식 선택)
+    import sys
+    import time
+
+    import asos_schema
+
+    if len(sys.argv) < 3:
+        print("사용법: python export_pipeline.py <입력 csv> <출력(.csv/.csv.gz/.csv.zst/.parquet/.feather/.npz)> [인코딩]")
+        print("사용 가능한 형식:", ", ".join(available_formats()))
+        sys.exit(1)
+    enc = sys.argv[3] if len(sys.argv) > 3 else "cp949"
+    frame = asos_schema.read_csv(sys.argv[1], enc)
+    t0 = time.perf_counter()
+    rows = export_frame(frame, sys.argv[2], progress=lambda frac, msg: print(f"\r{msg}", end="", flush=True))
+    print(f"\n{rows:,}행 -> {sys.argv[2]} ({os.path.getsize(sys.argv[2]) / 2 ** 20:.1f}MB, "
+          f"{time.perf_counter() - t0:.2f}초)")
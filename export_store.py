@@ -0,0 +1,256 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    saved_at TEXT NOT NULL,
+    date TEXT,
+    date_end TEXT,
+    station INTEGER,
+    station_name TEXT,
+    n_rows INTEGER NOT NULL,
+    columns TEXT NOT NULL,
+    csv_path TEXT
+);
+CREATE TABLE IF NOT EXISTS rows (
+    save_id INTEGER NOT NULL REFERENCES saves(id) ON DELETE CASCADE,
+    row_no INTEGER NOT NULL,
+    date TEXT,
+    station INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (save_id, row_no)
+);
+CREATE TABLE IF NOT EXISTS skipped (
+    csv_path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS saves_date ON saves(date, station);
+CREATE INDEX IF NOT EXISTS saves_csv ON saves(csv_path);
+CREATE INDEX IF NOT EXISTS rows_date ON rows(date, station);
+"""
+
+LIST_COLUMNS = ["id", "saved_at", "date", "date_end", "station", "station_name", "n_rows", "csv_path"]
+
+
+def _json_value(v):
+    """DataFrame 값 -> JSON 값 (NaN/NaT는 null)"""
+    if v is None:
+        return None
+    if isinstance(v, float) and np.isnan(v):
+        return None
+    if isinstance(v, np.generic):
+        v = v.item()
+        if isinstance(v, float) and np.isnan(v):
+            return None
+    if v is pd.NaT:
+        return None
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    if isinstance(v, pd.Timestamp):
+        return v.strftime("%Y-%m-%d") if v == v.normalize() else v.isoformat()
+    return str(v)
+
+
+def _day_text(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return None
+    return pd.Timestamp(v).strftime("%Y-%m-%d")
+
+
+class ExportStore:
+    """검색 결과 저장소 (SQLite 파일 하나, 날짜/지점 색인)
+
+    - save(): 검색 결과 1건 = saves 1행 + rows n행 (행 값은 JSON 한 줄)
+    - list(): 저장 목록만 조회 (행 데이터는 읽지 않음)
+    - preview(): 선택한 저장 건의 행만 필요할 때 읽음
+    - 예전처럼 날짜별 CSV도 남기려면 save(..., csv_path=...)로 경로만 함께 기록
+    - 연결은 하나를 열어 두고 잠금으로 공유 (닫을 때마다 WAL 체크포인트가 돌아서 느림)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._con = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            con = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA foreign_keys = ON")
+            # WAL에서는 NORMAL이어도 깨지지 않음 (저장마다 fsync 하지 않고 체크포인트 때만)
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
+            con.executescript(SCHEMA)
+            # 기간 저장(date_end)이 생기기 전에 만든 파일
+            if "date_end" not in {r[1] for r in con.execute("PRAGMA table_info(saves)")}:
+                with con:
+                    con.execute("ALTER TABLE saves ADD COLUMN date_end TEXT")
+                    con.execute("UPDATE saves SET date_end = date")
+            self._con = con
+        return self._con
+
+    def close(self):
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    # ---- 저장 ----
+    def save(self, df: pd.DataFrame, csv_path: str = None, saved_at: str = None) -> int:
+        """검색 결과 저장 -> 저장 번호"""
+        if df is None or df.empty:
+            raise ValueError("저장할 검색 결과가 없습니다(빈 결과).")
+
+        columns = [str(c) for c in df.columns]
+        # float32 관측값은 float64로 넓히면 25.3 -> 25.299999237... (짧은 표기 그대로 옮김)
+        narrow = {c: df[c].astype(str).astype(np.float64) for c in df.columns if df[c].dtype == np.float32}
+        if narrow:
+            df = df.assign(**narrow)
+        days = [_day_text(v) for v in self._day_values(df)]
+        known = [d for d in days if d is not None]
+        first_day, last_day = (min(known), max(known)) if known else (None, None)
+        stations = self._station_values(df)
+        first = df.iloc[0]
+        name = first["지점명"] if "지점명" in df.columns else None
+
+        # 행은 목록으로 모아 두지 않고 executemany에 흘려 넣음 (기간 검색 결과도 트랜잭션 한 번)
+        records = (
+            (i, days[i], stations[i], json.dumps([_json_value(v) for v in row], ensure_ascii=False))
+            for i, row in enumerate(df.itertuples(index=False, name=None))
+        )
+
+        with self._lock:
+            con = self._connect()
+            with con:
+                cur = con.execute(
+                    "INSERT INTO saves (saved_at, date, date_end, station, station_name, n_rows, columns, csv_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (saved_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), first_day, last_day, stations[0],
+                     None if pd.isna(name) else str(name), len(df), json.dumps(columns, ensure_ascii=False),
+                     csv_path),
+                )
+                save_id = cur.lastrowid
+                con.executemany("INSERT INTO rows (save_id, row_no, date, station, data) VALUES (?, ?, ?, ?, ?)",
+                                ((save_id, *r) for r in records))
+        return save_id
+
+    @staticmethod
+    def _day_values(df: pd.DataFrame):
+        for col in ("date", "일시"):
+            if col in df.columns:
+                return df[col].tolist()
+        return [None] * len(df)
+
+    @staticmethod
+    def _station_values(df: pd.DataFrame) -> list:
+        if "지점" not in df.columns:
+            return [None] * len(df)
+        s = pd.to_numeric(df["지점"], errors="coerce")
+        return [None if pd.isna(v) else int(v) for v in s]
+
+    def import_csv(self, path: str) -> int:
+        """예전 exports/*.csv 하나를 저장소로 (이미 들어온 파일이면 None)
+
+        빈 파일이나 읽지 못한 파일은 skipped에 기록해 두고 파일이 바뀌기 전까지 다시 읽지 않음 (None)
+        """
+        if self.find_csv(path) is not None:
+            return None
+        try:
+            try:
+                df = pd.read_csv(path, encoding="utf-8-sig")
+            except UnicodeDecodeError:
+                df = pd.read_csv(path, encoding="cp949")
+        except (ValueError, UnicodeDecodeError, OSError) as e:
+            # pandas 파싱 오류(ParserError, EmptyDataError)는 ValueError 하위
+            self.mark_skipped(path, f"{type(e).__name__}: {e}")
+            return None
+        df.columns = df.columns.astype(str).str.strip()
+        if df.empty:
+            self.mark_skipped(path, "빈 파일")
+            return None
+        saved_at = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
+        return self.save(df, csv_path=path, saved_at=saved_at)
+
+    def mark_skipped(self, csv_path: str, reason: str):
+        """옮기지 않은 예전 CSV 기록 (수정시각도 같이: 파일이 바뀌면 다시 시도)"""
+        try:
+            mtime = os.stat(csv_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            con = self._connect()
+            with con:
+                con.execute("INSERT OR REPLACE INTO skipped (csv_path, mtime_ns, reason) VALUES (?, ?, ?)",
+                            (csv_path, mtime, str(reason)[:500]))
+
+    def skipped(self) -> dict:
+        """{CSV 경로: 기록할 때의 수정시각(ns)}"""
+        with self._lock:
+            con = self._connect()
+            return dict(con.execute("SELECT csv_path, mtime_ns FROM skipped").fetchall())
+
+    # ---- 조회 ----
+    def find_csv(self, csv_path: str):
+        with self._lock:
+            con = self._connect()
+            row = con.execute("SELECT id FROM saves WHERE csv_path = ?", (csv_path,)).fetchone()
+        return row[0] if row else None
+
+    def list(self, start=None, end=None, station: int = None, limit: int = None) -> pd.DataFrame:
+        """저장 목록 (최근 저장 순). start/end: 이 범위(양끝 포함)와 겹치는 저장 건"""
+        where, params = [], []
+        if start is not None:
+            where.append("COALESCE(date_end, date) >= ?")
+            params.append(_day_text(start))
+        if end is not None:
+            where.append("date <= ?")
+            params.append(_day_text(end))
+        if station is not None:
+            where.append("station = ?")
+            params.append(int(station))
+        sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM saves"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            con = self._connect()
+            rows = con.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=LIST_COLUMNS)
+
+    def count(self) -> int:
+        with self._lock:
+            con = self._connect()
+            return con.execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+
+    def preview(self, save_id: int, limit: int = 50) -> pd.DataFrame:
+        """저장 건 하나의 앞쪽 limit행 (None이면 전체)"""
+        with self._lock:
+            con = self._connect()
+            meta = con.execute("SELECT columns FROM saves WHERE id = ?", (int(save_id),)).fetchone()
+            if meta is None:
+                raise KeyError(f"저장 번호 {save_id}를 찾을 수 없습니다.")
+            sql = "SELECT data FROM rows WHERE save_id = ? ORDER BY row_no"
+            params = [int(save_id)]
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+            rows = con.execute(sql, params).fetchall()
+        return pd.DataFrame([json.loads(r[0]) for r in rows], columns=json.loads(meta[0]))
+
+    def delete(self, save_id: int):
+        with self._lock:
+            con = self._connect()
+            with con:
+                con.execute("DELETE FROM saves WHERE id = ?", (int(save_id),))
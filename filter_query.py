@@ -0,0 +1,337 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# 조건식 예:
+#   평균기온(°C) > 25 and 일강수량(mm) >= 10 or 지점 in 133,108
+#   not (지점명 contains 대전) and `최대 풍속(m/s)` <= 5
+# 우선순위: not > and > or, 괄호 사용 가능
+COMPARE_OPS = [">=", "<=", "==", "!=", ">", "<", "="]
+WORD_OPS = ["contains", "in"]
+
+
+class QueryError(ValueError):
+    pass
+
+
+# -------------------- 열 값 캐시 (열 + 데이터 버전 단위) --------------------
+class ColumnCache:
+    """pd.to_numeric / astype(str) 결과를 (버전, 열) 단위로 재사용"""
+
+    def __init__(self, max_items: int = 64):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def _get(self, key, make):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+        val = make()
+        self._items[key] = val
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return val
+
+    def numeric(self, df: pd.DataFrame, col: str, version) -> np.ndarray:
+        def make():
+            s = df[col]
+            if pd.api.types.is_float_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+                return s.to_numpy()
+            return pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        return self._get((version, col, "num"), make)
+
+    def text(self, df: pd.DataFrame, col: str, version) -> pd.Series:
+        return self._get((version, col, "str"), lambda: df[col].astype(str).reset_index(drop=True))
+
+    def clear(self):
+        self._items.clear()
+
+
+def _to_number(text):
+    n = pd.to_numeric(text, errors="coerce")
+    return None if pd.isna(n) else float(n)
+
+
+# -------------------- 식 트리 --------------------
+class Condition:
+    """열 하나에 대한 비교 (기존 단일 조건 판단과 같은 의미)"""
+
+    def __init__(self, col: str, op: str, value):
+        if op == "=":
+            op = "=="
+        if op not in COMPARE_OPS + WORD_OPS:
+            raise QueryError(f"지원하지 않는 연산자: {op}")
+        self.col = col
+        self.op = op
+
+        if op == "in":
+            items = value if isinstance(value, list) else [x.strip() for x in str(value).split(",")]
+            items = [x for x in items if x != ""]
+            if not items:
+                raise QueryError("in 연산은 콤마로 구분된 값을 입력하세요. 예: 133,108")
+            self.value = items
+            nums = [_to_number(x) for x in items]
+            self.num = None if any(n is None for n in nums) else nums
+        else:
+            self.value = str(value)
+            self.num = _to_number(self.value)
+            if self.num is None and op in [">", ">=", "<", "<="]:
+                raise QueryError(">,>=,<,<= 는 숫자 값이 필요합니다.")
+
+    def columns(self) -> list:
+        return [self.col]
+
+    def evaluate(self, df, cache: ColumnCache, version) -> np.ndarray:
+        if self.col not in df.columns:
+            raise QueryError(f"컬럼이 없습니다: {self.col}")
+        op = self.op
+
+        if op == "contains":
+            return cache.text(df, self.col, version).str.contains(self.value, na=False).to_numpy()
+
+        if op == "in":
+            if self.num is not None:
+                x = cache.numeric(df, self.col, version)
+                # float32 열은 비교값도 float32로 (25.3이 float64로 올라가면 서로 달라짐)
+                return np.isin(x, np.asarray(self.num, dtype=x.dtype))
+            return cache.text(df, self.col, version).isin(self.value).to_numpy()
+
+        if self.num is None:  # ==, != 문자열 비교
+            s = cache.text(df, self.col, version).to_numpy()
+            return (s == self.value) if op == "==" else (s != self.value)
+
+        x = cache.numeric(df, self.col, version)
+        v = x.dtype.type(self.num)
+        with np.errstate(invalid="ignore"):
+            if op == ">":
+                return x > v
+            if op == ">=":
+                return x >= v
+            if op == "<":
+                return x < v
+            if op == "<=":
+                return x <= v
+            if op == "==":
+                return x == v
+            return x != v
+
+    def __repr__(self):
+        return f"({self.col} {self.op} {self.value})"
+
+
+class BoolOp:
+    def __init__(self, op: str, args: list):
+        self.op = op
+        self.args = args
+
+    def columns(self) -> list:
+        out = []
+        for a in self.args:
+            out += [c for c in a.columns() if c not in out]
+        return out
+
+    def evaluate(self, df, cache: ColumnCache, version) -> np.ndarray:
+        if self.op == "not":
+            return ~self.args[0].evaluate(df, cache, version)
+        out = self.args[0].evaluate(df, cache, version)
+        for a in self.args[1:]:
+            out = (out & a.evaluate(df, cache, version)) if self.op == "and" \
+                else (out | a.evaluate(df, cache, version))
+        return out
+
+    def __repr__(self):
+        if self.op == "not":
+            return f"not {self.args[0]!r}"
+        return "(" + f" {self.op} ".join(repr(a) for a in self.args) + ")"
+
+
+# -------------------- 파서 --------------------
+_KEYWORDS = {
+    "and": "and", "&&": "and", "&": "and", "그리고": "and",
+    "or": "or", "||": "or", "|": "or", "또는": "or",
+    "not": "not", "!": "not",
+}
+
+
+class _Parser:
+    def __init__(self, text: str, columns):
+        self.text = text
+        self.pos = 0
+        # 긴 이름부터 맞춰야 '평균기온(°C)'와 '평균기온' 같은 경우를 구분
+        self.columns = sorted((str(c) for c in columns), key=len, reverse=True)
+
+    # ---- 저수준 ----
+    def error(self, msg: str):
+        near = self.text[self.pos:self.pos + 15]
+        raise QueryError(f"{msg} (위치 {self.pos + 1}: '{near}')")
+
+    def skip_ws(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def at_end(self) -> bool:
+        self.skip_ws()
+        return self.pos >= len(self.text)
+
+    def peek_keyword(self):
+        self.skip_ws()
+        for kw in sorted(_KEYWORDS, key=len, reverse=True):
+            end = self.pos + len(kw)
+            if self.text[self.pos:end].lower() != kw:
+                continue
+            # 단어형 키워드는 뒤가 경계여야 함 (예: 'order' 안의 'or' 방지)
+            if kw[0].isalpha() and end < len(self.text) and not (self.text[end].isspace() or self.text[end] == "("):
+                continue
+            return kw
+        return None
+
+    def take_keyword(self, kind: str) -> bool:
+        kw = self.peek_keyword()
+        if kw is not None and _KEYWORDS[kw] == kind:
+            self.pos += len(kw)
+            return True
+        return False
+
+    # ---- 문법 ----
+    def parse(self):
+        node = self.parse_or()
+        if not self.at_end():
+            self.error("해석할 수 없는 내용")
+        return node
+
+    def parse_or(self):
+        args = [self.parse_and()]
+        while self.take_keyword("or"):
+            args.append(self.parse_and())
+        return args[0] if len(args) == 1 else BoolOp("or", args)
+
+    def parse_and(self):
+        args = [self.parse_not()]
+        while self.take_keyword("and"):
+            args.append(self.parse_not())
+        return args[0] if len(args) == 1 else BoolOp("and", args)
+
+    def parse_not(self):
+        if self.take_keyword("not"):
+            return BoolOp("not", [self.parse_not()])
+        return self.parse_atom()
+
+    def parse_atom(self):
+        self.skip_ws()
+        col = self.parse_column()
+        if col is None:
+            if self.text.startswith("(", self.pos):
+                self.pos += 1
+                node = self.parse_or()
+                self.skip_ws()
+                if not self.text.startswith(")", self.pos):
+                    self.error("닫는 괄호 ')'가 없습니다")
+                self.pos += 1
+                return node
+            self.error("컬럼 이름을 찾을 수 없습니다")
+
+        op = self.parse_op()
+        if op == "in":
+            return Condition(col, op, self.parse_list())
+        return Condition(col, op, self.parse_value())
+
+    def parse_column(self):
+        self.skip_ws()
+        if self.text.startswith("`", self.pos):
+            end = self.text.find("`", self.pos + 1)
+            if end < 0:
+                self.error("닫는 ` 가 없습니다")
+            name = self.text[self.pos + 1:end]
+            self.pos = end + 1
+            return name
+        for c in self.columns:
+            if self.text.startswith(c, self.pos):
+                self.pos += len(c)
+                return c
+        return None
+
+    def parse_op(self):
+        self.skip_ws()
+        for op in COMPARE_OPS:
+            if self.text.startswith(op, self.pos):
+                self.pos += len(op)
+                return op
+        m = re.match(r"(contains|in)\b", self.text[self.pos:], re.IGNORECASE)
+        if m:
+            self.pos += m.end()
+            return m.group(1).lower()
+        self.error("연산자가 필요합니다 (>, >=, <, <=, ==, !=, contains, in)")
+
+    def parse_value(self) -> str:
+        self.skip_ws()
+        if self.pos >= len(self.text):
+            self.error("값이 필요합니다")
+        q = self.text[self.pos]
+        if q in "'\"":
+            end = self.text.find(q, self.pos + 1)
+            if end < 0:
+                self.error("닫는 따옴표가 없습니다")
+            val = self.text[self.pos + 1:end]
+            self.pos = end + 1
+            return val
+        m = re.match(r"[^\s()]+", self.text[self.pos:])
+        if not m:
+            self.error("값이 필요합니다")
+        self.pos += m.end()
+        return m.group(0)
+
+    def parse_list(self) -> list:
+        self.skip_ws()
+        paren = self.text.startswith("(", self.pos)
+        if paren:
+            self.pos += 1
+
+        # 133,108 / 133, 108 / ('대전', '서울') 모두 허용
+        items = []
+        while True:
+            self.skip_ws()
+            if self.pos < len(self.text) and self.text[self.pos] in "'\"":
+                items.append(self.parse_value())
+            else:
+                m = re.match(r"[^\s(),]+", self.text[self.pos:])
+                if not m:
+                    self.error("in 연산은 콤마로 구분된 값을 입력하세요. 예: 133,108")
+                items.append(m.group(0))
+                self.pos += m.end()
+            self.skip_ws()
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+                continue
+            break
+
+        if paren:
+            self.skip_ws()
+            if not self.text.startswith(")", self.pos):
+                self.error("닫는 괄호 ')'가 없습니다")
+            self.pos += 1
+        return items
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(text: str, columns: tuple):
+    return _Parser(text, columns).parse()
+
+
+def compile_query(text: str, columns) -> "Condition | BoolOp":
+    """조건식을 한 번 해석해 식 트리로 (같은 식/컬럼 목록이면 재사용)"""
+    text = (text or "").strip()
+    if not text:
+        raise QueryError("조건식이 비었습니다.")
+    return _compile_cached(text, tuple(str(c) for c in columns))
+
+
+def evaluate_query(query, df: pd.DataFrame, cache: ColumnCache = None, version=None) -> np.ndarray:
+    if isinstance(query, str):
+        query = compile_query(query, df.columns)
+    cache = cache or ColumnCache()
+    mask = query.evaluate(df, cache, version if version is not None else id(df))
+    return np.asarray(mask, dtype=bool)
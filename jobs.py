@@ -0,0 +1,196 @@
+import queue
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """작업 함수에 첫 인자로 넘어가는 객체 (진행률 보고 + 취소 확인)
+
+    취소는 check()/progress()를 부르는 지점에서만 반영됨 (스레드를 강제로 멈추지 않음)
+    → 오래 걸리는 작업은 조각으로 나눠 조각마다 progress()를 부를 것 (CSV 읽기/저장은 조각 단위)
+    """
+
+    def __init__(self, job, runner):
+        self._job = job
+        self._runner = runner
+        self.rows = None  # 처리한 행 수 (성능 기록용, 작업 함수가 채움)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def check(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, frac=None, msg: str = ""):
+        self.check()
+        self._runner._queue.put(("progress", self._job, frac, msg))
+
+
+class Job:
+    def __init__(self, job_id, name, key, generation, token):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.generation = generation
+        self.token = token
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class JobRunner:
+    """Tk 메인 스레드를 막지 않도록 작업을 스레드 풀에서 실행
+
+    - 결과/진행률은 큐에 쌓고, 메인 스레드가 after()로 꺼내서 콜백 실행
+    - 같은 key로 새 작업이 들어오면 이전 작업은 취소되고 결과도 버림
+    - guard(): 제출 시점과 완료 시점 값이 다르면(데이터가 그 사이 바뀜) 결과를 버림
+    - perf(PerfMonitor)를 주면 작업 함수 실행 시간을 작업 스레드에서 재고, 기록은 메인 스레드로 전달
+    """
+
+    def __init__(self, widget, log=None, max_workers: int = 2, poll_ms: int = 50, guard=None, perf=None):
+        self.widget = widget
+        self.log = log or (lambda msg: None)
+        self.poll_ms = poll_ms
+        self.guard = guard
+        self.perf = perf
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-job")
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._generation = {}
+        self._running = {}
+        self._polling = False
+
+    # ---- 제출/취소 ----
+    def submit(self, name, fn, *args, key=None, on_done=None, on_error=None, use_guard=True, rows=None, **kwargs):
+        if key is not None:
+            for job in list(self._running.values()):
+                if job.key == key:
+                    job.cancel()
+            self._generation[key] = self._generation.get(key, 0) + 1
+
+        token = self.guard() if (use_guard and self.guard) else None
+        job = Job(next(self._ids), name, key, self._generation.get(key), token)
+        job.use_guard = use_guard
+        job.on_done = on_done
+        job.on_error = on_error
+        ctx = JobContext(job, self)
+        ctx.rows = rows
+
+        def call():
+            if self.perf is None:
+                return fn(ctx, *args, **kwargs)
+            m = None
+            try:
+                with self.perf.measure(f"[작업] {name}", notify=False) as m:
+                    result = fn(ctx, *args, **kwargs)
+                    m.rows = ctx.rows
+                return result
+            finally:
+                if m is not None:
+                    self._queue.put(("perf", job, m.record, None))
+
+        def run():
+            try:
+                ctx.check()
+                result = call()
+                self._queue.put(("done", job, result, None))
+            except JobCancelled:
+                self._queue.put(("cancelled", job, None, None))
+            except Exception as e:
+                self._queue.put(("error", job, None, e))
+
+        self._running[job.id] = job
+        job.future = self._pool.submit(run)
+        self.log(f"[작업 시작] {name}")
+        self._ensure_polling()
+        return job
+
+    def cancel_all(self) -> int:
+        n = 0
+        for job in self._running.values():
+            if not job.cancel_event.is_set():
+                job.cancel()
+                n += 1
+        return n
+
+    def busy(self) -> bool:
+        return bool(self._running)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---- 메인 스레드 폴링 ----
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _is_stale(self, job) -> bool:
+        if job.key is not None and self._generation.get(job.key) != job.generation:
+            return True
+        if job.use_guard and self.guard is not None and self.guard() != job.token:
+            return True
+        return False
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    kind, job, a, b = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._handle(kind, job, a, b)
+                except Exception as e:
+                    # 콜백 하나가 실패해도 다른 작업 결과는 계속 처리
+                    self.log(f"[콜백 오류] {job.name}: {type(e).__name__}: {e}")
+        finally:
+            # 예외가 나도 폴링이 멈추지 않게 (멈추면 이후 결과가 전부 사라짐)
+            if self._running or not self._queue.empty():
+                self.widget.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def _handle(self, kind, job, a, b):
+        if kind == "perf":
+            self.perf.notify(a)
+            return
+
+        if kind == "progress":
+            if job.cancel_event.is_set():
+                return
+            frac, msg = a, b
+            pct = f" {frac * 100:.0f}%" if frac is not None else ""
+            self.log(f"[작업 진행] {job.name}{pct} {msg}".rstrip())
+            return
+
+        self._running.pop(job.id, None)
+
+        if kind == "cancelled" or job.cancel_event.is_set():
+            self.log(f"[작업 취소] {job.name}")
+            return
+
+        if kind == "error":
+            self.log(f"[작업 실패] {job.name}: {b}")
+            if job.on_error is not None:
+                job.on_error(b)
+            return
+
+        if self._is_stale(job):
+            self.log(f"[작업 무시] {job.name}: 그 사이 데이터가 바뀌어 결과를 버립니다.")
+            return
+
+        self.log(f"[작업 완료] {job.name}")
+        if job.on_done is not None:
+            job.on_done(a)
@@ -0,0 +1,68 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """처음 속성을 읽을 때 import되는 모듈 대리 객체
+
+    pd = lazy_import("pandas")  # 여기서는 import 안 함
+    pd.DataFrame(...)           # 이 시점에 import
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        mod = self.__dict__["_module"]
+        if mod is None:
+            with self.__dict__["_lock"]:
+                mod = self.__dict__["_module"]
+                if mod is None:
+                    mod = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = mod
+        return mod
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def preload(*targets, on_error=None, name: str = "preload") -> threading.Thread:
+    """모듈을 백그라운드 스레드에서 미리 import (창을 띄운 뒤 남는 시간에)
+
+    targets: 모듈 이름 또는 인자 없는 함수 (파일 경로로 읽는 모듈 등)
+    on_error(target, 예외): 실패해도 다음 대상은 계속
+    """
+    def run():
+        for target in targets:
+            try:
+                if callable(target):
+                    target()
+                else:
+                    importlib.import_module(target)
+            except Exception as e:
+                if on_error is not None:
+                    on_error(target, e)
+
+    t = threading.Thread(target=run, name=name, daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+# 바이트 값(0~255) -> 켜진 비트 수
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class PackedMask:
+    """조건 판단 결과 1개 (np.packbits로 8행 = 1바이트)"""
+
+    def __init__(self, bits: np.ndarray, n: int, version=None, desc: str = ""):
+        self.bits = bits
+        self.n = n
+        self.version = version
+        self.desc = desc
+
+    @classmethod
+    def from_bool(cls, mask, version=None, desc: str = "") -> "PackedMask":
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), len(mask), version, desc)
+
+    def to_bool(self) -> np.ndarray:
+        return np.unpackbits(self.bits, count=self.n).astype(bool)
+
+    def take(self, positions) -> np.ndarray:
+        """일부 행만 꺼내기 (표에 보이는 구간 등): 전체를 풀지 않고 해당 비트만 읽음"""
+        positions = np.asarray(positions, dtype=np.int64)
+        byte = self.bits[positions >> 3]
+        return ((byte >> (7 - (positions & 7))) & 1).astype(bool)
+
+    def count(self) -> int:
+        # packbits 끝자리 패딩은 0이라 그대로 세도 됨
+        return int(_POPCOUNT[self.bits].sum(dtype=np.int64))
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class MaskStore:
+    """판단(...) 결과 저장소
+
+    - 이름 -> 비트 압축 마스크 (int64 열 대비 약 1/64 메모리)
+    - AND/OR/NOT은 압축된 바이트끼리 바로 계산
+    - 표/저장에 필요할 때만 0/1 열로 풀어서 사용 (0 = 조건 만족)
+    """
+
+    def __init__(self):
+        self._masks = OrderedDict()
+
+    # ---- 기본 ----
+    def add(self, name: str, mask, version=None, desc: str = "") -> PackedMask:
+        pm = mask if isinstance(mask, PackedMask) else PackedMask.from_bool(mask, version, desc)
+        self._masks.pop(name, None)
+        self._masks[name] = pm
+        return pm
+
+    def get(self, name: str) -> np.ndarray:
+        return self._masks[name].to_bool()
+
+    def packed(self, name: str) -> PackedMask:
+        return self._masks[name]
+
+    def remove(self, name: str):
+        self._masks.pop(name, None)
+
+    def clear(self, version=None):
+        if version is None:
+            self._masks.clear()
+            return
+        for name in self.names(version):
+            del self._masks[name]
+
+    def retain(self, versions) -> int:
+        """versions에 없는 데이터 버전의 마스크 삭제 -> 지운 개수 (버전 없는 마스크는 유지)
+
+        VersionedDataset(on_prune=...)에 연결하면 이력에서 버려진 버전의 마스크가 쌓이지 않음
+        """
+        versions = set(versions)
+        stale = [k for k, m in self._masks.items() if m.version is not None and m.version not in versions]
+        for name in stale:
+            del self._masks[name]
+        return len(stale)
+
+    def names(self, version=None) -> list:
+        if version is None:
+            return list(self._masks)
+        return [k for k, m in self._masks.items() if m.version == version]
+
+    def last(self, version=None):
+        names = self.names(version)
+        return names[-1] if names else None
+
+    def count(self, name: str) -> int:
+        return self._masks[name].count()
+
+    def unique_name(self, prefix: str = "판단") -> str:
+        i = len(self._masks) + 1
+        while f"{prefix}{i}" in self._masks:
+            i += 1
+        return f"{prefix}{i}"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(m.nbytes for m in self._masks.values())
+
+    # ---- 불리언 연산 ----
+    def _check_same(self, masks):
+        n = masks[0].n
+        if any(m.n != n for m in masks):
+            raise ValueError("행 수가 다른 판단 결과끼리는 결합할 수 없습니다.")
+        return n
+
+    def combine(self, op: str, names: list, out_name: str = None) -> PackedMask:
+        """op: "and" / "or" / "not" (not은 이름 1개)"""
+        if not names:
+            raise ValueError("결합할 판단 결과를 선택하세요.")
+        masks = [self._masks[n] for n in names]
+        n = self._check_same(masks)
+
+        if op == "not":
+            if len(masks) != 1:
+                raise ValueError("NOT은 판단 결과 1개만 선택하세요.")
+            bits = np.invert(masks[0].bits)
+            # 마지막 바이트의 패딩 비트는 0으로 유지
+            pad = len(bits) * 8 - n
+            if pad:
+                bits[-1] &= np.uint8((0xFF << pad) & 0xFF)
+            desc = f"NOT {names[0]}"
+        elif op in ("and", "or"):
+            func = np.bitwise_and if op == "and" else np.bitwise_or
+            bits = masks[0].bits.copy()
+            for m in masks[1:]:
+                func(bits, m.bits, out=bits)
+            desc = f" {op.upper()} ".join(names)
+        else:
+            raise ValueError(f"지원하지 않는 결합: {op}")
+
+        pm = PackedMask(bits, n, masks[0].version, desc)
+        if out_name:
+            self.add(out_name, pm)
+        return pm
+
+    # ---- 0/1 열로 풀기 ----
+    def materialize(self, name: str, positions=None) -> np.ndarray:
+        """판단 열 값 (0 = 조건 만족, 1 = 불만족), positions를 주면 그 행만"""
+        m = self._masks[name]
+        ok = m.to_bool() if positions is None else m.take(positions)
+        return np.where(ok, 0, 1).astype(np.int8)
+
+    def materialize_columns(self, version=None) -> dict:
+        """{판단 열 이름: 0/1 배열} (내보내기에서 조각마다 붙일 때, 원본 표는 복사하지 않음)"""
+        return {name: self.materialize(name) for name in self.names(version)}
+
+    def materialize_into(self, df, version=None):
+        cols = self.materialize_columns(version)
+        return df.assign(**cols) if cols else df
@@ -0,0 +1,191 @@
+import functools
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+
+FIELDS = ["time", "name", "wall_ms", "cpu_ms", "rows", "peak_kb", "thread", "ok"]
+
+
+class Measure:
+    """측정 1건 (with 블록 안에서 rows를 채울 수 있음)"""
+
+    def __init__(self, name: str, rows=None):
+        self.name = name
+        self.rows = rows
+        self.record = None
+
+
+class PerfMonitor:
+    """처리 시간/CPU 시간/처리 행 수/최대 메모리(tracemalloc) 기록
+
+    - measure(): with 블록 측정, timed(): WeatherGUI 메서드용 데코레이터
+    - CPU 시간은 스레드 기준(time.thread_time)이라 작업 스레드에서 재도 섞이지 않음
+    - tracemalloc 최대값은 프로세스 전체 기준: 측정이 겹치면 가장 바깥 측정 시작 시점부터의 최대값
+    - 메모리 추적은 기본 꺼짐 (켜 두면 앱 전체의 모든 할당이 느려져 다른 측정값이 왜곡됨)
+    """
+
+    def __init__(self, max_records: int = 5000, trace_memory: bool = False, sink=None):
+        self.records = deque(maxlen=max_records)
+        self.sink = sink
+        self._lock = threading.Lock()
+        self._active = 0
+        self._count = 0
+        self.trace_memory = False
+        self._started = False
+        self.set_trace_memory(trace_memory)
+
+    def set_trace_memory(self, on: bool):
+        """메모리 추적은 할당마다 비용이 들어서 켤 때만 (다른 곳에서 켠 tracemalloc은 끄지 않음)"""
+        with self._lock:
+            if on and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            elif not on and self._started:
+                if tracemalloc.is_tracing():
+                    tracemalloc.stop()
+                self._started = False
+            self.trace_memory = on
+
+    # ---- 측정 ----
+    def _begin(self):
+        with self._lock:
+            if self.trace_memory and tracemalloc.is_tracing():
+                if self._active == 0:
+                    tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            else:
+                base = None
+            self._active += 1
+        return base, time.perf_counter(), time.thread_time()
+
+    def _end(self, m: Measure, start, ok: bool) -> dict:
+        base, t0, c0 = start
+        wall = time.perf_counter() - t0
+        cpu = time.thread_time() - c0
+        with self._lock:
+            self._active -= 1
+            peak = None
+            if base is not None and tracemalloc.is_tracing():
+                peak = max(0, tracemalloc.get_traced_memory()[1] - base)
+
+        rec = {
+            "time": datetime.now().strftime("%H:%M:%S"),
+            "name": m.name,
+            "wall_ms": wall * 1000,
+            "cpu_ms": cpu * 1000,
+            "rows": m.rows,
+            "peak_kb": None if peak is None else peak / 1024,
+            "thread": threading.current_thread().name,
+            "ok": ok,
+        }
+        with self._lock:
+            self.records.append(rec)
+            self._count += 1
+        m.record = rec
+        return rec
+
+    def measure(self, name: str, rows=None, notify: bool = True):
+        """with perf.measure("이름") as m: ... m.rows = len(df)"""
+        return _MeasureContext(self, name, rows, notify)
+
+    @property
+    def count(self) -> int:
+        """지금까지 기록한 건수 (지워도 계속 증가, 화면 갱신 판단용)"""
+        return self._count
+
+    def notify(self, rec: dict):
+        if self.sink is not None and rec is not None:
+            self.sink(rec)
+
+    # ---- 통계/내보내기 ----
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            recs = list(self.records)
+        return pd.DataFrame(recs, columns=FIELDS)
+
+    def stats(self) -> pd.DataFrame:
+        """작업 이름별 횟수/평균/최대/최근값"""
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame(columns=["name", "count", "wall_mean_ms", "wall_max_ms", "cpu_mean_ms",
+                                         "rows_last", "peak_max_kb", "wall_last_ms", "errors"])
+        g = df.groupby("name", sort=False)
+        out = pd.DataFrame({
+            "count": g.size(),
+            "wall_mean_ms": g["wall_ms"].mean(),
+            "wall_max_ms": g["wall_ms"].max(),
+            "cpu_mean_ms": g["cpu_ms"].mean(),
+            "rows_last": g["rows"].last(),
+            "peak_max_kb": g["peak_kb"].max(),
+            "wall_last_ms": g["wall_ms"].last(),
+            "errors": g["ok"].apply(lambda s: int((~s.astype(bool)).sum())),
+        })
+        return out.sort_values("wall_mean_ms", ascending=False).round(2).reset_index()
+
+    def export_csv(self, path: str, stats: bool = False) -> int:
+        df = self.stats() if stats else self.frame()
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        return len(df)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+class _MeasureContext:
+    def __init__(self, monitor: PerfMonitor, name: str, rows, notify: bool):
+        self.monitor = monitor
+        self.m = Measure(name, rows)
+        self.notify = notify
+
+    def __enter__(self) -> Measure:
+        self._start = self.monitor._begin()
+        return self.m
+
+    def __exit__(self, exc_type, exc, tb):
+        rec = self.monitor._end(self.m, self._start, exc_type is None)
+        if self.notify:
+            self.monitor.notify(rec)
+        return False
+
+
+def format_record(rec: dict) -> str:
+    """로그 한 줄: [성능] 이름 12.3ms (CPU 10.1ms, 365행, 최대 1.2MB)"""
+    parts = [f"CPU {rec['cpu_ms']:.1f}ms"]
+    if rec.get("rows") is not None:
+        parts.append(f"{int(rec['rows']):,}행")
+    if rec.get("peak_kb") is not None:
+        kb = rec["peak_kb"]
+        parts.append(f"최대 {kb / 1024:.1f}MB" if kb >= 1024 else f"최대 {kb:.0f}KB")
+    fail = "" if rec.get("ok", True) else " 실패"
+    return f"[성능] {rec['name']} {rec['wall_ms']:.1f}ms ({', '.join(parts)}){fail}"
+
+
+def timed(name: str = None, rows=None):
+    """메서드 데코레이터: self.perf(PerfMonitor)가 있으면 측정
+
+    rows: f(self, *args, **kwargs) -> 처리 행 수 (실행 후 호출)
+    """
+    def deco(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            perf = getattr(self, "perf", None)
+            if perf is None:
+                return fn(self, *args, **kwargs)
+            with perf.measure(label) as m:
+                result = fn(self, *args, **kwargs)
+                if rows is not None:
+                    try:
+                        m.rows = rows(self, *args, **kwargs)
+                    except Exception:
+                        m.rows = None
+            return result
+        return wrapper
+    return deco
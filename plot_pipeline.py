@@ -0,0 +1,223 @@
+"""선 그래프용 재사용/솎아내기 파이프라인
+
+- Figure/캔버스/선(Line2D)은 처음 한 번만 만들고, 다음부터는 set_data로 값만 교체
+  (pyplot을 거치지 않으므로 plt 레지스트리에 Figure가 쌓이지 않음)
+- 보이는 x 구간만 잘라서 화면 폭(픽셀) 정도의 점으로 솎아서 그림
+  - minmax: 구간마다 최소/최대 (뾰족한 값이 사라지지 않음, 완전 벡터 연산)
+  - lttb: Largest-Triangle-Three-Buckets (모양 보존, 점 수가 더 적음)
+- 확대/이동(xlim 변경) 때마다 보이는 구간 기준으로 다시 솎아냄 → 그리는 시간은 데이터 길이와 무관
+"""
+import numpy as np
+
+
+METHODS = ["minmax", "lttb"]
+# 이보다 점이 적을 때만 점 표시(marker="o")
+MARKER_LIMIT = 200
+
+
+# -------------------- 솎아내기 --------------------
+def minmax_buckets(x: np.ndarray, y: np.ndarray, n_buckets: int):
+    """구간 n_buckets개로 나눠 구간마다 최소/최대 점만 (원래 순서 유지, 처음/끝 점 포함)"""
+    n = len(x)
+    if n_buckets < 1 or n <= 2 * n_buckets:
+        return x, y
+    size = -(-n // n_buckets)
+    rows = -(-n // size)
+    pad = rows * size - n
+    yy = np.concatenate([y, np.full(pad, np.nan)]) if pad else y
+    yy = yy.reshape(rows, size)
+    nan = np.isnan(yy)
+    lo = np.where(nan, np.inf, yy).argmin(axis=1)
+    hi = np.where(nan, -np.inf, yy).argmax(axis=1)
+    base = np.arange(rows) * size
+    idx = np.concatenate([[0], base + lo, base + hi, [n - 1]])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int):
+    """Largest-Triangle-Three-Buckets: 구간마다 앞 점/다음 구간 평균과 만드는 삼각형이 가장 큰 점"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # 다음 구간 평균은 한 번에 (마지막 구간의 다음은 끝 점)
+    counts = np.diff(np.append(edges, n))
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nx, ny = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+def decimate(x: np.ndarray, y: np.ndarray, n_points: int, method: str = "minmax"):
+    """n_points 정도의 점으로 (minmax는 구간당 2점이라 구간 수 = n_points / 2)"""
+    if method == "lttb":
+        return lttb(x, y, n_points)
+    if method == "minmax":
+        return minmax_buckets(x, y, max(n_points // 2, 1))
+    raise ValueError(f"지원하지 않는 솎아내기 방법: {method} (가능: {', '.join(METHODS)})")
+
+
+def as_plot_x(x):
+    """x 값 -> (float 배열, 날짜 여부). 날짜는 matplotlib 날짜 숫자(일 단위)로"""
+    arr = np.asarray(x)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        from matplotlib import dates as mdates
+        return mdates.date2num(arr), True
+    return arr.astype(np.float64), False
+
+
+# -------------------- 재사용 선 --------------------
+class DecimatedLine:
+    """Axes 하나에 선 하나를 두고 값만 바꿔 끼움 (Tk 없이도 사용 가능)
+
+    redraw(): 값이 바뀐 뒤 호출할 그리기 함수 (Tk면 canvas.draw_idle)
+    """
+
+    def __init__(self, ax, method: str = "minmax", marker_limit: int = MARKER_LIMIT, redraw=None):
+        self.ax = ax
+        self.method = method
+        self.marker_limit = marker_limit
+        self.redraw = redraw
+        (self.line,) = ax.plot([], [])
+        self.x = self.y = None
+        self.shown = 0
+        self._is_date = False
+        self.updating = False
+
+    def set_data(self, x, y, title: str = "", xlabel: str = "", ylabel: str = ""):
+        x, is_date = as_plot_x(x)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) > 1 and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        self.x, self.y = x, y
+
+        ax = self.ax
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        if is_date != self._is_date:
+            self._set_date_axis(is_date)
+
+        # 축 범위는 전체 데이터 기준으로 한 번만 (확대할 때 y가 흔들리지 않게)
+        self.updating = True
+        try:
+            if len(x):
+                pad = (x[-1] - x[0]) * 0.02 or 1.0
+                ax.set_xlim(x[0] - pad, x[-1] + pad)
+                finite = y[np.isfinite(y)]
+                if len(finite):
+                    lo, hi = finite.min(), finite.max()
+                    pad = (hi - lo) * 0.05 or 1.0
+                    ax.set_ylim(lo - pad, hi + pad)
+        finally:
+            self.updating = False
+        self.resolve()
+
+    def _set_date_axis(self, is_date: bool):
+        from matplotlib import dates as mdates
+        from matplotlib import ticker
+        self._is_date = is_date
+        axis = self.ax.xaxis
+        if is_date:
+            locator = mdates.AutoDateLocator()
+            axis.set_major_locator(locator)
+            axis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        else:
+            axis.set_major_locator(ticker.AutoLocator())
+            axis.set_major_formatter(ticker.ScalarFormatter())
+
+    def target_points(self) -> int:
+        """화면 폭(픽셀)만큼의 점 (그 이상은 겹쳐서 보이지 않음)"""
+        width = self.ax.bbox.width
+        return max(int(width), 100) if np.isfinite(width) else 1000
+
+    def resolve(self):
+        """현재 보이는 x 구간을 다시 솎아서 선에 넣음"""
+        if self.x is None or not len(self.x):
+            self.line.set_data([], [])
+            self.shown = 0
+        else:
+            lo, hi = self.ax.get_xlim()
+            # 양옆 한 점씩 더 넣어서 화면 끝까지 선이 이어지게
+            i0 = max(int(np.searchsorted(self.x, lo, side="left")) - 1, 0)
+            i1 = min(int(np.searchsorted(self.x, hi, side="right")) + 1, len(self.x))
+            xs, ys = decimate(self.x[i0:i1], self.y[i0:i1], self.target_points(), self.method)
+            self.line.set_data(xs, ys)
+            self.line.set_marker("o" if len(xs) <= self.marker_limit else "")
+            self.shown = len(xs)
+        if self.redraw is not None:
+            self.redraw()
+
+    def clear(self):
+        self.x = self.y = None
+        self.resolve()
+
+
+class LinePlot:
+    """Tk 프레임 안의 재사용 그래프 (Figure/캔버스/툴바는 한 번만 생성)
+
+    확대/이동은 툴바로, 그때마다 보이는 구간만 다시 솎아냄 (화면이 한가할 때 한 번)
+    """
+
+    def __init__(self, master, method: str = "minmax", figsize=(10, 6)):
+        import tkinter as tk
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        self.fig = Figure(figsize=figsize, constrained_layout=True)
+        self.ax = self.fig.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, master, pack_toolbar=False)
+        self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.widget = self.canvas.get_tk_widget()
+        self.widget.pack(fill=tk.BOTH, expand=True)
+
+        self.series = DecimatedLine(self.ax, method, redraw=self.canvas.draw_idle)
+        self._pending = None
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim)
+        # 창 크기가 바뀌면 화면 폭이 달라지므로 다시 솎아냄
+        self.canvas.mpl_connect("resize_event", self._on_xlim)
+
+    def show(self, x, y, title: str = "", xlabel: str = "", ylabel: str = ""):
+        self._cancel_pending()
+        self.series.set_data(x, y, title, xlabel, ylabel)
+        # 툴바 '처음 화면'을 새 데이터 기준으로
+        self.toolbar.update()
+        self.toolbar.push_current()
+
+    def _on_xlim(self, *args):
+        if self.series.x is None or self.series.updating:
+            return
+        # 드래그 중에는 xlim 이벤트가 연달아 오므로 한 번으로 모음
+        if self._pending is None:
+            self._pending = self.widget.after_idle(self._resolve_pending)
+
+    def _resolve_pending(self):
+        self._pending = None
+        self.series.resolve()
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+
+    @property
+    def shown(self) -> int:
+        return self.series.shown
+
+    def clear(self):
+        self._cancel_pending()
+        self.series.clear()
@@ -0,0 +1,242 @@
+"""이동 통계(이동평균/합계/최소/최대) + 일별 평년값 편차
+
+- 지점마다 날짜를 빈 날 없이 이어 붙인 일 단위 배열 위에서 계산 (빠진 날은 NaN)
+  → "7일"은 행 7개가 아니라 달력 7일, 지점 사이에는 NaN 칸을 끼워 창이 다른 지점으로 넘어가지 않음
+- 합계/평균: 누적합 차이 (창 길이와 무관하게 O(n))
+- 최소/최대: van Herk/Gil-Werman (창 크기 블록의 앞/뒤 누적 최대를 한 번씩 → O(n), 전부 벡터 연산)
+- 평년값: 지점 × 연중 날짜(2/29는 2/28과 같은 날)별 평균을 앞뒤 smooth일 이동평균으로 다듬은 값
+- 결과는 행 순서의 float32 배열 → 파생 열로 붙이면 판단(apply_filter)/조건식에서 바로 사용
+"""
+import numpy as np
+import pandas as pd
+
+
+STATS = ["mean", "sum", "min", "max"]
+STAT_LABELS = {"mean": "평균", "sum": "합", "min": "최소", "max": "최대"}
+DEFAULT_WINDOWS = [3, 7, 30]
+# 평년값 다듬기 (앞뒤 포함 일수)
+DEFAULT_SMOOTH = 15
+DAYS_IN_YEAR = 365
+OUT_DTYPE = np.float32
+
+
+def rolling_name(col: str, window: int, stat: str) -> str:
+    """파생 열 이름: "7일합 일강수량(mm)" (단위로 끝나서 다시 읽어도 관측값 dtype)"""
+    return f"{window}일{STAT_LABELS[stat]} {col}"
+
+
+def anomaly_name(col: str) -> str:
+    return f"평년편차 {col}"
+
+
+def normal_name(col: str) -> str:
+    return f"평년값 {col}"
+
+
+# -------------------- 1차원 이동 통계 (끝나는 칸 기준 창) --------------------
+def _valid_counts(x: np.ndarray, window: int) -> np.ndarray:
+    c = np.concatenate([[0], np.cumsum(~np.isnan(x), dtype=np.int64)])
+    lo = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    return c[1:] - c[lo]
+
+
+def _min_periods(window: int, min_periods) -> int:
+    return window if min_periods is None else min(max(int(min_periods), 1), window)
+
+
+def rolling_sum(x: np.ndarray, window: int, min_periods: int = None) -> np.ndarray:
+    """칸 i = x[i - window + 1 .. i]의 합 (NaN 제외, 값이 min_periods개 미만이면 NaN)"""
+    x = np.asarray(x, dtype=np.float64)
+    c = np.concatenate([[0.0], np.cumsum(np.nan_to_num(x, nan=0.0))])
+    lo = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    out = c[1:] - c[lo]
+    out[_valid_counts(x, window) < _min_periods(window, min_periods)] = np.nan
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int, min_periods: int = None) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    n = _valid_counts(x, window)
+    c = np.concatenate([[0.0], np.cumsum(np.nan_to_num(x, nan=0.0))])
+    lo = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (c[1:] - c[lo]) / n
+    out[n < _min_periods(window, min_periods)] = np.nan
+    return out
+
+
+def rolling_extreme(x: np.ndarray, window: int, stat: str = "max", min_periods: int = None) -> np.ndarray:
+    """이동 최소/최대 (van Herk/Gil-Werman)
+
+    창 크기 블록으로 나눠 블록 안 앞쪽 누적(g)/뒤쪽 누적(h)을 구하면
+    창 [i, i + w - 1]의 값 = op(h[i], g[i + w - 1]) (창은 항상 블록 두 개에 걸침)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0 or window <= 1:
+        out = x.copy()
+    else:
+        op = np.maximum if stat == "max" else np.minimum
+        fill = -np.inf if stat == "max" else np.inf
+        m = n + window - 1
+        blocks = -(-m // window)
+        padded = np.full(blocks * window, fill)
+        padded[window - 1:m] = np.where(np.isnan(x), fill, x)
+        padded = padded.reshape(blocks, window)
+        g = op.accumulate(padded, axis=1).ravel()
+        h = op.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+        out = op(h[:n], g[window - 1:window - 1 + n])
+    out[_valid_counts(x, window) < _min_periods(window, min_periods)] = np.nan
+    return out
+
+
+def rolling(x: np.ndarray, window: int, stat: str = "mean", min_periods: int = None) -> np.ndarray:
+    if stat == "sum":
+        return rolling_sum(x, window, min_periods)
+    if stat == "mean":
+        return rolling_mean(x, window, min_periods)
+    if stat in ("min", "max"):
+        return rolling_extreme(x, window, stat, min_periods)
+    raise ValueError(f"지원하지 않는 통계: {stat} (가능: {', '.join(STATS)})")
+
+
+# -------------------- 지점 × 일 배열 --------------------
+def day_of_year(days: np.ndarray) -> np.ndarray:
+    """datetime64[D] -> 0..364 (윤년 2/29는 2/28과 같은 칸, 3/1부터는 평년과 같은 번호)"""
+    idx = pd.DatetimeIndex(days)
+    doy = idx.dayofyear.to_numpy() - 1
+    return np.where(idx.is_leap_year & (doy >= 59), doy - 1, doy).astype(np.int64)
+
+
+class RollingEngine:
+    """한 DataFrame의 행 -> (지점, 날짜) 위치를 한 번 계산해 두고 열마다 재사용
+
+    일시가 비어 있는 행은 결과가 NaN, 지점 열이 없으면 전체를 지점 하나로
+    """
+
+    def __init__(self, days: np.ndarray, stations: np.ndarray):
+        self.n = len(days)
+        valid = ~np.isnat(days)
+        self.rows = np.flatnonzero(valid)
+        d = days[valid].astype(np.int64)
+        self.station_ids, st = np.unique(stations[valid], return_inverse=True)
+        self.st = st.astype(np.int64)
+        self.days = days[valid]
+
+        k = len(self.station_ids)
+        self.first = np.full(k, np.iinfo(np.int64).max)
+        self.last = np.full(k, np.iinfo(np.int64).min)
+        np.minimum.at(self.first, self.st, d)
+        np.maximum.at(self.last, self.st, d)
+        self.offset_in_station = d - self.first[self.st]
+        self._layout = {}
+        self._doy = None
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, date_col: str = "일시", station_col: str = "지점"):
+        if date_col not in df.columns:
+            raise ValueError(f"'{date_col}' 컬럼이 필요합니다.")
+        days = pd.to_datetime(df[date_col], errors="coerce").to_numpy().astype("datetime64[D]")
+        if station_col in df.columns:
+            stations = pd.to_numeric(df[station_col], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        else:
+            stations = np.zeros(len(df), dtype=np.int64)
+        return cls(days, stations)
+
+    def _cells(self, pad: int):
+        """지점마다 [NaN pad칸][첫날..마지막날] 순서로 이어 붙인 배열에서 각 행의 칸 위치"""
+        cells = self._layout.get(pad)
+        if cells is None:
+            span = self.last - self.first + 1 + pad
+            start = np.cumsum(span) - span + pad
+            cells = (start[self.st] + self.offset_in_station, int(span.sum()))
+            # 창 크기마다 다른 배치라 마지막 것 하나만 보관
+            self._layout = {pad: cells}
+        return cells
+
+    def _values(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)[self.rows]
+
+    def _to_rows(self, values: np.ndarray) -> np.ndarray:
+        out = np.full(self.n, np.nan, dtype=OUT_DTYPE)
+        out[self.rows] = values
+        return out
+
+    def rolling(self, df: pd.DataFrame, col: str, window: int, stat: str = "mean",
+                min_periods: int = None) -> np.ndarray:
+        """행마다 그 날까지(그 날 포함) window일 통계 (같은 지점 안에서만)"""
+        window = int(window)
+        if window < 1:
+            raise ValueError("창 크기는 1일 이상이어야 합니다.")
+        cells, size = self._cells(window - 1)
+        grid = np.full(size, np.nan)
+        grid[cells] = self._values(df, col)
+        return self._to_rows(rolling(grid, window, stat, min_periods)[cells])
+
+    def doy(self) -> np.ndarray:
+        if self._doy is None:
+            self._doy = day_of_year(self.days)
+        return self._doy
+
+    def normals(self, df: pd.DataFrame, col: str, smooth: int = DEFAULT_SMOOTH, years=None) -> np.ndarray:
+        """지점 × 365일 평년값 (years: 기준 연도 목록, None이면 전체)"""
+        x = self._values(df, col)
+        use = ~np.isnan(x)
+        if years is not None:
+            use &= np.isin(self.days.astype("datetime64[Y]").astype(np.int64) + 1970, list(years))
+        k = len(self.station_ids)
+        key = self.st[use] * DAYS_IN_YEAR + self.doy()[use]
+        sums = np.bincount(key, weights=x[use], minlength=k * DAYS_IN_YEAR).reshape(k, DAYS_IN_YEAR)
+        counts = np.bincount(key, minlength=k * DAYS_IN_YEAR).reshape(k, DAYS_IN_YEAR).astype(np.float64)
+
+        smooth = min(max(int(smooth), 1), DAYS_IN_YEAR)
+        if smooth > 1:
+            # 연말/연초가 이어지도록 앞뒤를 감아서 가운데 기준 이동 합 (합/개수 따로 → 가중 평균)
+            half = smooth // 2
+            sums, counts = (_circular_window_sum(a, half, smooth) for a in (sums, counts))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def anomaly(self, df: pd.DataFrame, col: str, smooth: int = DEFAULT_SMOOTH, years=None):
+        """(편차, 평년값) 행 순서 배열. 편차 = 값 - 그 지점 그 날짜의 평년값"""
+        normal = self.normals(df, col, smooth, years)[self.st, self.doy()]
+        return self._to_rows(self._values(df, col) - normal), self._to_rows(normal)
+
+
+def _circular_window_sum(a: np.ndarray, half: int, width: int) -> np.ndarray:
+    """행마다 칸 j = a[j - half .. j - half + width - 1] (양 끝은 감아서) 합"""
+    ext = np.concatenate([a[:, -half:] if half else a[:, :0], a, a[:, :width - half - 1]], axis=1)
+    c = np.concatenate([np.zeros((a.shape[0], 1)), np.cumsum(ext, axis=1)], axis=1)
+    return c[:, width:width + a.shape[1]] - c[:, :a.shape[1]]
+
+
+def derive_rolling(df: pd.DataFrame, columns, windows=DEFAULT_WINDOWS, stats=("mean",),
+                   min_periods=None, min_ratio: float = None, engine: RollingEngine = None, progress=None) -> dict:
+    """{파생 열 이름: 배열} (열 × 창 × 통계 조합마다 하나)
+
+    min_ratio: 창 안에 값이 이 비율 이상 있어야 계산 (창마다 min_periods = ceil(창 × 비율))
+    """
+    engine = engine or RollingEngine.from_df(df)
+    jobs = [(c, w, s) for w in windows for c in columns for s in stats]
+    out = {}
+    for i, (col, window, stat) in enumerate(jobs):
+        if progress:
+            progress(i / len(jobs), rolling_name(col, window, stat))
+        need = min_periods if min_ratio is None else max(int(np.ceil(window * min_ratio)), 1)
+        out[rolling_name(col, window, stat)] = engine.rolling(df, col, window, stat, need)
+    return out
+
+
+def derive_anomaly(df: pd.DataFrame, columns, smooth: int = DEFAULT_SMOOTH, years=None, with_normal: bool = False,
+                   engine: RollingEngine = None, progress=None) -> dict:
+    """{"평년편차 열": 배열[, "평년값 열": 배열]}"""
+    engine = engine or RollingEngine.from_df(df)
+    out = {}
+    for i, col in enumerate(columns):
+        if progress:
+            progress(i / len(columns), anomaly_name(col))
+        anomaly, normal = engine.anomaly(df, col, smooth, years)
+        out[anomaly_name(col)] = anomaly
+        if with_normal:
+            out[normal_name(col)] = normal
+    return out
@@ -0,0 +1,344 @@
+"""지점별 병렬 분석 (프로세스 풀 + 공유 메모리)
+
+- 열 버퍼를 지점 순서로 정렬해 공유 메모리(SharedMemory) 한 덩어리에 한 번만 복사
+  → 작업 프로세스는 이름으로 붙어서 자기 지점 구간만 잘라 씀 (DataFrame을 pickle로 보내지 않음)
+- 지점 하나 = 작업 하나, 끝난 순서대로 진행률 표시, 결과는 지점 순서로 합쳐서 표 하나로
+- 분석 함수는 weather_analysis의 함수를 그대로 씀 (단독 실행과 결과가 같음)
+
+    python station_parallel.py <csv> monthly -o monthly_by_station.csv
+    python station_parallel.py <csv> wind_outliers --workers 8 [인코딩]
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import weather_analysis as wa
+
+
+STATION_COL = "지점"
+NAME_COL = "지점명"
+# 공유 메모리 안 열 시작 위치 정렬 (바이트)
+ALIGN = 64
+
+
+# -------------------- 공유 메모리 표 --------------------
+def _column_parts(s: pd.Series):
+    """열 -> (저장할 배열, 글자 정보 또는 None). 범주/글자는 코드 + (종류, 값 목록)으로"""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), ("category", list(s.cat.categories))
+    if pd.api.types.is_datetime64_any_dtype(s.dtype) and getattr(s.dtype, "tz", None) is None:
+        return s.to_numpy(), None
+    if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        if pd.api.types.is_extension_array_dtype(s.dtype):
+            # Int32 등 결측 가능 정수: 결측은 NaN
+            return s.to_numpy(dtype=np.float64, na_value=np.nan), None
+        return s.to_numpy(), None
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    return codes.astype(np.int32), ("object", list(uniques))
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # 3.12 이하: 풀 프로세스는 부모와 같은 resource tracker를 쓰므로 등록돼도 해제는 부모 unlink 한 번
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrame:
+    """지점 순서로 정렬한 열 버퍼를 공유 메모리에 둔 표 (with 문으로 쓰고 끝나면 해제)
+
+    stations: 지점 번호 배열, bounds: 지점 i의 행 = [bounds[i], bounds[i + 1])
+    order: 정렬된 행 -> 원래 행 위치 (결과 위치를 원래 표 기준으로 되돌릴 때)
+    지점이 비어 있는 행은 빠짐
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = STATION_COL):
+        if key not in df.columns:
+            raise ValueError(f"'{key}' 컬럼이 없어 지점별로 나눌 수 없습니다.")
+        st = df[key]
+        valid = np.flatnonzero(st.notna().to_numpy())
+        st_values = st.to_numpy()[valid].astype(np.int64)
+        sort = np.argsort(st_values, kind="stable")
+        self.order = valid[sort]
+        self.stations, starts = np.unique(st_values[sort], return_index=True)
+        self.bounds = np.append(starts, len(self.order))
+        self.n_rows = len(self.order)
+        self.n_dropped = len(df) - self.n_rows
+
+        parts, size = [], 0
+        for col in df.columns:
+            arr, labels = _column_parts(df[col])
+            size = -(-size // ALIGN) * ALIGN
+            parts.append((col, arr, labels, size))
+            size += arr.dtype.itemsize * self.n_rows
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.layout = []
+        try:
+            for col, arr, labels, offset in parts:
+                view = np.ndarray(self.n_rows, dtype=arr.dtype, buffer=self.shm.buf, offset=offset)
+                np.take(arr, self.order, out=view)
+                del view
+                self.layout.append((col, arr.dtype.str, offset, labels))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def nbytes(self) -> int:
+        return self.shm.size
+
+    def task(self, i: int):
+        """작업 프로세스에 넘길 지점 i의 정보 (공유 메모리 이름 + 열 배치 + 구간)"""
+        return self.shm.name, self.n_rows, self.layout, int(self.bounds[i]), int(self.bounds[i + 1])
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def frame_slice(shm_name: str, n_rows: int, layout, lo: int, hi: int) -> pd.DataFrame:
+    """(작업 프로세스) 공유 메모리의 [lo, hi) 행 -> DataFrame (그 지점 구간만 복사)"""
+    shm = _attach(shm_name)
+    try:
+        cols = {}
+        for col, dtype, offset, labels in layout:
+            view = np.ndarray(n_rows, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            part = view[lo:hi].copy()
+            del view
+            if labels is not None:
+                kind, values = labels
+                cat = pd.Categorical.from_codes(part, categories=values)
+                cols[col] = cat if kind == "category" else np.asarray(cat, dtype=object)
+            else:
+                cols[col] = part
+        return pd.DataFrame(cols)
+    finally:
+        shm.close()
+
+
+# -------------------- 지점 하나 분석 (작업 프로세스) --------------------
+def _monthly(df: pd.DataFrame, params: dict):
+    return wa.monthly_summary(df, params.get("columns"))
+
+
+def _avg_temp(df: pd.DataFrame, params: dict):
+    return wa.classify_avg_temp(df)
+
+
+def _wind_outliers(df: pd.DataFrame, params: dict):
+    out = wa.wind_speed_outliers(df, params.get("col", wa.WIND_COL))
+    if out is None:
+        return None
+    return {"lower": float(out["lower"]), "upper": float(out["upper"]), "keep": out["keep"], "removed": out["removed"]}
+
+
+def _season_corr(df: pd.DataFrame, params: dict):
+    res = wa.season_correlations(df, params.get("k", 8), params.get("method", "pearson"),
+                                 params.get("nonnull_ratio", 0.7), params.get("min_rows", 30))
+    rows = []
+    for season, (n, mat) in res["seasons"].items():
+        if mat is None:
+            # 행이 min_rows보다 적은 계절: 행 수만 남기고 r은 NaN
+            rows.append(pd.DataFrame({"계절": [season], "행 수": [n], "변수1": [None], "변수2": [None],
+                                      "r": [np.nan]}))
+            continue
+        cols = list(mat.columns)
+        values = mat.to_numpy()
+        # 위 삼각형만 (대각선/대칭 제외)
+        i, j = np.triu_indices(len(cols), k=1)
+        rows.append(pd.DataFrame({"계절": season, "행 수": n, "변수1": np.asarray(cols, dtype=object)[i],
+                                  "변수2": np.asarray(cols, dtype=object)[j], "r": values[i, j]}))
+    if not rows:
+        return pd.DataFrame(columns=["계절", "행 수", "변수1", "변수2", "r"])
+    return pd.concat(rows, ignore_index=True)
+
+
+ANALYSES = {
+    "monthly": _monthly,
+    "avg_temp": _avg_temp,
+    "wind_outliers": _wind_outliers,
+    "season_corr": _season_corr,
+}
+
+
+def _run_station(analysis: str, params: dict, task):
+    """(작업 프로세스) 지점 하나: 공유 메모리에서 구간을 잘라 분석 -> (결과, 오류 문자열)"""
+    df = frame_slice(*task)
+    try:
+        return ANALYSES[analysis](df, params), None
+    except ValueError as e:
+        # 그 지점에 열/데이터가 없는 경우: 다른 지점은 계속
+        return None, str(e)
+    except Exception as e:
+        # 예상 못 한 오류도 그 지점의 오류로만 기록 (한 지점 때문에 전체가 멈추지 않게)
+        return None, f"{type(e).__name__}: {e}"
+
+
+# -------------------- 합치기 --------------------
+def _merge_tables(results: list) -> pd.DataFrame:
+    """[(지점, 지점명, 결과 표)] -> 지점/지점명 열을 앞에 붙여 하나로"""
+    frames = [r.assign(**{STATION_COL: st, NAME_COL: name})[[STATION_COL, NAME_COL, *r.columns]]
+              for st, name, r in results if r is not None and len(r)]
+    if not frames:
+        return pd.DataFrame(columns=[STATION_COL, NAME_COL])
+    out = pd.concat(frames, ignore_index=True)
+    if NAME_COL in out.columns:
+        out[NAME_COL] = out[NAME_COL].astype("category")
+    return out
+
+
+def _merge_wind(results: list, frame: SharedFrame) -> dict:
+    """지점별 IQR 기준 -> 지점별 범위 표 + 원래 표 기준으로 남길 행 위치"""
+    keep, rows = [], []
+    for i, (st, name, r) in enumerate(results):
+        lo, hi = int(frame.bounds[i]), int(frame.bounds[i + 1])
+        if r is None:
+            # 판단할 값이 없는 지점은 그대로 둠
+            keep.append(frame.order[lo:hi])
+            rows.append({STATION_COL: st, NAME_COL: name, "행 수": hi - lo, "하한": np.nan, "상한": np.nan, "제거": 0})
+            continue
+        keep.append(frame.order[lo:hi][r["keep"]])
+        rows.append({STATION_COL: st, NAME_COL: name, "행 수": hi - lo,
+                     "하한": r["lower"], "상한": r["upper"], "제거": r["removed"]})
+    all_rows = np.arange(frame.n_rows + frame.n_dropped)
+    # 지점이 비어 있는 행도 판단 대상이 아니므로 남김
+    dropped = np.setdiff1d(all_rows, frame.order, assume_unique=True)
+    keep = np.sort(np.concatenate(keep + [dropped])) if keep else dropped
+    summary = pd.DataFrame(rows)
+    return {"summary": summary, "keep": keep, "removed": int(summary["제거"].sum()) if len(summary) else 0}
+
+
+# -------------------- 실행 --------------------
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return max(os.cpu_count() or 1, 1)
+
+
+def get_pool(workers: int = None) -> ProcessPoolExecutor:
+    """프로세스 풀은 한 번 만들어 재사용 (작업 프로세스 시작/모듈 import 비용은 처음 한 번)"""
+    global _pool, _pool_workers
+    workers = workers or default_workers()
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def run_by_station(df: pd.DataFrame, analysis: str, params: dict = None, workers: int = None,
+                   progress=None) -> dict:
+    """지점별로 나눠 analysis 실행 -> {"result": 합친 결과, "stations": 지점 수, "errors": {지점: 오류}}
+
+    analysis: monthly / avg_temp / season_corr (지점/지점명 열이 붙은 표 하나)
+              wind_outliers (result = {"summary": 지점별 범위, "keep": 남길 행 위치, "removed": 제거 수})
+    workers: 프로세스 수 (기본: CPU 코어 수, 1이면 현재 프로세스에서 차례로)
+    progress(frac, msg): 작업 스레드의 ctx.progress (취소되면 남은 지점은 실행하지 않음)
+    """
+    if analysis not in ANALYSES:
+        raise ValueError(f"지원하지 않는 분석: {analysis} (가능: {', '.join(ANALYSES)})")
+    params = dict(params or {})
+    workers = workers or default_workers()
+    progress = progress or (lambda frac=None, msg="": None)
+
+    progress(None, "지점별로 나눠 공유 메모리에 복사")
+    with SharedFrame(df) as frame:
+        n = len(frame.stations)
+        if n == 0:
+            raise ValueError("지점 번호가 있는 행이 없습니다.")
+        first_rows = frame.order[frame.bounds[:-1]]
+        names = df[NAME_COL].iloc[first_rows].tolist() if NAME_COL in df.columns else [""] * n
+        out = [None] * n
+        errors = {}
+
+        def finish(i, res):
+            value, err = res
+            out[i] = value
+            if err:
+                errors[int(frame.stations[i])] = err
+
+        if workers == 1 or n == 1:
+            for i in range(n):
+                finish(i, _run_station(analysis, params, frame.task(i)))
+                progress((i + 1) / n, f"지점 {i + 1}/{n}")
+        else:
+            pool = get_pool(workers)
+            futures = {pool.submit(_run_station, analysis, params, frame.task(i)): i for i in range(n)}
+            try:
+                for done, fut in enumerate(as_completed(futures), 1):
+                    finish(futures[fut], fut.result())
+                    progress(done / n, f"지점 {done}/{n} ({workers}개 프로세스)")
+            except BaseException:
+                # 취소/오류: 아직 시작하지 않은 지점은 버림 (공유 메모리는 with가 끝나면 해제)
+                for fut in futures:
+                    fut.cancel()
+                raise
+
+        results = [(int(st), name, r) for st, name, r in zip(frame.stations, names, out)]
+        if analysis == "wind_outliers":
+            merged = _merge_wind(results, frame)
+        else:
+            merged = _merge_tables(results)
+        return {"result": merged, "stations": n, "errors": errors, "shared_bytes": frame.nbytes}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import asos_schema
+    import export_pipeline
+
+    parser = argparse.ArgumentParser(description="지점별 병렬 분석")
+    parser.add_argument("csv")
+    parser.add_argument("analysis", choices=list(ANALYSES))
+    parser.add_argument("encoding", nargs="?", default="cp949")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("-o", "--out", default=None, help="합친 결과 저장 경로 (확장자로 형식 선택)")
+    args = parser.parse_args()
+
+    frame_df = asos_schema.read_csv(args.csv, args.encoding)
+    t0 = time.perf_counter()
+    res = run_by_station(frame_df, args.analysis, workers=args.workers)
+    took = time.perf_counter() - t0
+    table = res["result"]["summary"] if args.analysis == "wind_outliers" else res["result"]
+    print(f"지점 {res['stations']}개, {len(frame_df):,}행, {took:.2f}초 (공유 메모리 {res['shared_bytes'] / 2 ** 20:.1f}MB)")
+    for st, err in res["errors"].items():
+        print(f"  지점 {st}: {err}")
+    if args.out:
+        export_pipeline.export_frame(table, args.out)
+        print(f"저장: {args.out}")
+    else:
+        print(table.head(20).to_string(index=False))
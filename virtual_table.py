@@ -0,0 +1,258 @@
+import tkinter as tk
+
+import numpy as np
+import pandas as pd
+
+
+class VirtualTable:
+    """ttk.Treeview 가상 표시 모드
+
+    - Treeview에는 화면에 보이는 행 수만큼만 item을 만들고, 스크롤할 때 값만 바꿔 끼움
+    - 값은 DataFrame 열을 NumPy 배열로 들고 있다가 보이는 구간만 꺼내 씀
+    - 정렬은 순서 배열(argsort)만 바꾸고, 행 이동(goto)은 offset만 옮김
+    - 선택은 item이 아니라 원본 행 위치로 기억 (item은 스크롤하면 다른 행을 보여 주므로),
+      다시 그릴 때 그 행을 보여 주는 item에만 선택을 다시 걺
+    """
+
+    DEFAULT_ROW_HEIGHT = 20
+    HEADER_HEIGHT = 25
+
+    def __init__(self, tree, yscroll, header_fn=None, width_fn=None):
+        self.tree = tree
+        self.yscroll = yscroll
+        self.header_fn = header_fn or (lambda c: str(c))
+        self.width_fn = width_fn or (lambda c: 120)
+
+        self.columns = []
+        self.arrays = []
+        self.n_rows = 0
+        self.order = None        # 표시 순서 -> 원본 행 위치 (None이면 원래 순서)
+        self.offset = 0          # 화면 맨 위 행의 표시 순서 번호
+        self.sort_state = None   # (열 이름, 오름차순 여부)
+        self.selected = set()    # 선택된 원본 행 위치 (화면 밖으로 스크롤돼도 유지)
+
+        self._items = []         # 재사용하는 Treeview item id
+        self._shown = []         # item 순서대로 지금 보여 주는 원본 행 위치
+        self._row_height = None
+        self._header_height = None
+
+        self.yscroll.configure(command=self._on_scrollbar)
+        self.tree.configure(yscrollcommand=lambda *a: None)
+
+        self.tree.bind("<Configure>", lambda e: self.refresh())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<Button-1>", self._on_click, add="+")
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self.visible_rows()))
+        self.tree.bind("<Home>", lambda e: self.goto(0))
+        self.tree.bind("<End>", lambda e: self.goto(self.n_rows - 1))
+
+    # ---- 데이터 설정 ----
+    def set_data(self, df: pd.DataFrame, extra_columns: dict = None):
+        """extra_columns: {열 이름: f(행 위치 배열) -> 값 배열} (보이는 행만 그때그때 계산)"""
+        extra_columns = extra_columns or {}
+        self.columns = list(df.columns) + list(extra_columns)
+        self.arrays = [df[c].to_numpy() for c in df.columns] + list(extra_columns.values())
+        self.n_rows = len(df)
+        self.order = None
+        self.offset = 0
+        self.sort_state = None
+        self.selected = set()
+
+        self.tree.delete(*self.tree.get_children())
+        self._items = []
+        self._shown = []
+
+        self.tree["columns"] = self.columns
+        for c in self.columns:
+            self.tree.heading(c, text=self.header_fn(c), command=lambda col=c: self.toggle_sort(col))
+            # stretch=False를 추가해야 창보다 열이 많을 때 가로 스크롤이 생깁니다.
+            self.tree.column(c, width=self.width_fn(c), anchor="center", stretch=False)
+
+        self.refresh()
+
+    def row_position(self, display_row: int) -> int:
+        """표시 순서 번호 -> 원본 DataFrame 행 위치"""
+        if self.order is None:
+            return display_row
+        return int(self.order[display_row])
+
+    def selected_positions(self) -> list:
+        """선택된 원본 행 위치 (화면에 보이지 않는 행 포함, 위치 순)"""
+        return sorted(self.selected)
+
+    # ---- 선택 ----
+    def _on_click(self, event):
+        # Ctrl/Shift 없이 누르면 새로 고르는 것: 화면 밖에 남은 선택은 버림 (Treeview 기본 동작보다 먼저 실행)
+        if not event.state & 0x0005:
+            self.selected = set()
+
+    def _on_select(self, event=None):
+        """Treeview 선택 -> 원본 행 위치 (보이는 구간만 갱신, 화면 밖 선택은 유지)
+
+        refresh가 선택을 다시 걸 때도 불리지만 결과가 같아서 그대로
+        """
+        shown = set(self._shown)
+        picked = set()
+        for iid in self.tree.selection():
+            if iid in self._items:
+                i = self._items.index(iid)
+                if i < len(self._shown):
+                    picked.add(self._shown[i])
+        self.selected = {p for p in self.selected if p not in shown} | picked
+
+    def _sync_selection(self):
+        want = tuple(iid for iid, p in zip(self._items, self._shown) if p in self.selected)
+        if tuple(self.tree.selection()) != want:
+            self.tree.selection_set(want)
+
+    # ---- 화면 크기 ----
+    def visible_rows(self) -> int:
+        h = self.tree.winfo_height()
+        if h <= 1:
+            return max(1, int(self.tree.cget("height") or 10))
+
+        if self._row_height is None and self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                self._header_height = bbox[1]
+                self._row_height = max(1, bbox[3])
+
+        rh = self._row_height or self.DEFAULT_ROW_HEIGHT
+        hh = self._header_height if self._header_height is not None else self.HEADER_HEIGHT
+        return max(1, (h - hh) // rh)
+
+    # ---- 그리기 ----
+    def _window_positions(self, start: int, stop: int) -> np.ndarray:
+        if self.order is None:
+            return np.arange(start, stop)
+        return self.order[start:stop]
+
+    def _window_values(self, start: int, stop: int) -> list:
+        pos = self._window_positions(start, stop)
+
+        cols = []
+        for arr in self.arrays:
+            vals = arr(pos) if callable(arr) else arr[pos]
+            na = pd.isna(vals)
+            if vals.dtype == np.float32:
+                vals = vals.astype(str)  # object로 바로 바꾸면 float로 넓혀져 6.300000190734863
+            vals = vals.astype(object)
+            vals[na] = ""  # NaN 값은 빈 문자열로 처리하여 가독성 향상
+            cols.append(vals)
+        return [list(r) for r in zip(*cols)] if cols else [[] for _ in range(stop - start)]
+
+    def refresh(self):
+        k = self.visible_rows()
+        self.offset = max(0, min(self.offset, max(0, self.n_rows - k)))
+        stop = min(self.n_rows, self.offset + k)
+        rows = self._window_values(self.offset, stop)
+
+        # item 개수를 보이는 행 수에 맞춤 (생성/삭제는 창 크기가 바뀔 때만)
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+
+        for iid, values in zip(self._items, rows):
+            self.tree.item(iid, values=values)
+        self._shown = [int(p) for p in self._window_positions(self.offset, stop)]
+        self._sync_selection()
+
+        if self.n_rows:
+            self.yscroll.set(self.offset / self.n_rows, stop / self.n_rows)
+        else:
+            self.yscroll.set(0.0, 1.0)
+
+    # ---- 스크롤 ----
+    def _scroll_by(self, delta: int):
+        self.offset += delta
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.offset = int(float(value) * self.n_rows)
+            self.refresh()
+        elif action == "scroll":
+            step = int(value)
+            if unit == "pages":
+                step *= self.visible_rows()
+            self._scroll_by(step)
+
+    def _on_wheel(self, event):
+        # Windows: delta=±120, macOS: ±1
+        d = event.delta
+        step = -(d // 120) * 3 if abs(d) >= 120 else -d
+        return self._scroll_by(step)
+
+    def _on_key(self, step: int):
+        sel = self.tree.selection()
+        if not sel or sel[0] not in self._items:
+            return None
+        i = self._items.index(sel[0])
+        if (step < 0 and i == 0) or (step > 0 and i == len(self._items) - 1):
+            # 가장자리에서는 한 칸 스크롤하고 선택도 다음 행으로 (선택은 행을 따라가므로 직접 옮김)
+            r = self.offset + i + step
+            if 0 <= r < self.n_rows:
+                self.selected = {self.row_position(r)}
+            self._scroll_by(step)
+            i = r - self.offset
+            if 0 <= i < len(self._items):
+                self.tree.focus(self._items[i])
+            return "break"
+        return None
+
+    def goto(self, display_row: int):
+        """표시 순서 기준 행 번호(0부터)로 이동하고 선택"""
+        if self.n_rows == 0:
+            return "break"
+        display_row = max(0, min(int(display_row), self.n_rows - 1))
+        k = self.visible_rows()
+        if not (self.offset <= display_row < self.offset + k):
+            self.offset = display_row - k // 2
+        self.refresh()
+
+        self.selected = {self.row_position(display_row)}
+        self._sync_selection()
+        i = display_row - self.offset
+        if 0 <= i < len(self._items):
+            self.tree.focus(self._items[i])
+        return "break"
+
+    # ---- 정렬 ----
+    def sort_by(self, col, ascending: bool = True):
+        arr = self.arrays[self.columns.index(col)]
+        if callable(arr):
+            arr = arr(np.arange(self.n_rows))
+        try:
+            codes, _ = pd.factorize(arr, sort=True)
+        except TypeError:
+            codes, _ = pd.factorize(pd.Series(arr).astype(str), sort=True)
+
+        key = codes.astype(np.float64)
+        if not ascending:
+            key = -key
+        key[codes < 0] = np.inf  # 결측은 항상 맨 뒤
+        self.order = np.argsort(key, kind="stable")
+        self.sort_state = (col, ascending)
+
+        for c in self.columns:
+            mark = ""
+            if c == col:
+                mark = " ▲" if ascending else " ▼"
+            self.tree.heading(c, text=self.header_fn(c) + mark)
+
+        self.offset = 0
+        self.refresh()
+
+    def toggle_sort(self, col):
+        asc = True
+        if self.sort_state and self.sort_state[0] == col:
+            asc = not self.sort_state[1]
+        self.sort_by(col, asc)
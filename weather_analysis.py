@@ -0,0 +1,389 @@
+"""Tk 없이 쓰는 분석 API + 배치 리포트
+
+GUI(1year weather.py)의 분석 기능을 그대로 함수로 제공합니다.
+화면(X display)이 없는 서버에서도 실행할 수 있도록 pyplot/Tk를 import하지 않습니다.
+
+    python weather_analysis.py report data/*.csv -o report
+    python weather_analysis.py report data/ -o report --method spearman --k 10
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PathCollection
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+
+from weather_cache import read_csv_cached
+import asos_schema
+import weather_archive
+import export_pipeline
+from agg_cube import AggCube
+from corr_engine import CorrEngine
+
+
+MONTHLY_COLUMNS = ["평균기온(°C)", "평균 상대습도(%)", "일강수량(mm)"]
+RAIN_COL = "일강수량(mm)"
+TEMP_COL = "평균기온(°C)"
+WIND_COL = "최대 풍속(m/s)"
+
+# 평균기온 구간 (이하 기준) -> 상태
+TEMP_BINS = [(0, "매우 추움"), (10, "추움"), (20, "보통"), (30, "더움")]
+TEMP_HOT = "매우 더움"
+
+FONT_FAMILY = ["Malgun Gothic", "NanumGothic", "AppleGothic", "DejaVu Sans"]
+
+
+def strip_unit(name: str) -> str:
+    s = str(name)
+    if "(" in s and ")" in s:
+        s = s.split("(")[0].strip()
+    return s
+
+
+def _require(df: pd.DataFrame, *cols):
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"{' / '.join(missing)} 컬럼이 필요합니다.")
+
+
+# -------------------- 로드 --------------------
+def load_csv(path: str, encoding: str = "cp949", use_cache: bool = True) -> pd.DataFrame:
+    """ASOS 스키마 dtype으로 읽기 (관측값 float32, 지점 int16, 지점명 category)"""
+    if not use_cache:
+        return asos_schema.read_csv(path, encoding=encoding)
+    df, _ = read_csv_cached(path, encoding=encoding, reader=asos_schema.read_csv,
+                            version=asos_schema.SCHEMA_VERSION)
+    return df
+
+
+def load_archive(root: str, stations=None, years=None, columns=None) -> pd.DataFrame:
+    """아카이브(weather_archive)에서 지점/연도 조각만 읽기"""
+    return weather_archive.open_archive(root).read(stations, years, columns=columns)
+
+
+# -------------------- 분석 --------------------
+def monthly_summary(df: pd.DataFrame, columns=None, cube: AggCube = None) -> pd.DataFrame:
+    """1~12월 평균 (큐브가 있으면 큐브에서 바로)"""
+    _require(df, "일시")
+    columns = [c for c in (columns or MONTHLY_COLUMNS) if c in df.columns]
+    if not columns:
+        raise ValueError("요약할 대상 컬럼이 없습니다.")
+    cube = cube if cube is not None else AggCube.from_df(df)
+    return cube.monthly(columns).round(2)
+
+
+def period_summary(df: pd.DataFrame, by: str = "season", columns=None, stat: str = "mean",
+                   cube: AggCube = None) -> pd.DataFrame:
+    _require(df, "일시")
+    cube = cube if cube is not None else AggCube.from_df(df)
+    columns = [c for c in (columns or MONTHLY_COLUMNS) if c in cube.variables]
+    return cube.summary(by, columns, stat).round(2)
+
+
+def rainfall_days(df: pd.DataFrame) -> pd.DataFrame:
+    """강수 발생일 기록 (일강수량 > 0)"""
+    _require(df, RAIN_COL)
+    rain = pd.to_numeric(df[RAIN_COL], errors="coerce")
+    res = df[rain > 0].assign(**{RAIN_COL: rain[rain > 0]})
+    if "일시" in res.columns:
+        res = res.assign(일시=pd.to_datetime(res["일시"], errors="coerce").dt.date)
+    return res[["일시", RAIN_COL]].dropna()
+
+
+def classify_avg_temp(df: pd.DataFrame) -> pd.DataFrame:
+    """평균기온 상태 분류 (날짜, 평균기온(°C), 상태)"""
+    _require(df, "일시", TEMP_COL)
+    dt = pd.to_datetime(df["일시"], errors="coerce")
+    t = pd.to_numeric(df[TEMP_COL], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    ok = dt.notna().to_numpy() & ~np.isnan(t)
+    t = t[ok]
+    labels = np.select([t <= limit for limit, _ in TEMP_BINS], [name for _, name in TEMP_BINS], TEMP_HOT)
+    return pd.DataFrame({"날짜": dt[ok].dt.date.to_numpy(), TEMP_COL: t, "상태": labels})
+
+
+def wind_speed_outliers(df: pd.DataFrame, col: str = WIND_COL, progress=None) -> dict:
+    """IQR(1.5배) 기준 이상치. 유효한 값이 없으면 None
+
+    반환: lower, upper, keep(남길 행 위치), removed(제거 행 수), values(숫자로 바꾼 열)
+    """
+    _require(df, col)
+    values = pd.to_numeric(df[col], errors="coerce")
+    valid = values.dropna()
+    if valid.empty:
+        return None
+
+    if progress:
+        progress(0.3, "IQR 계산")
+    q1, q3 = valid.quantile(0.25), valid.quantile(0.75)
+    iqr = q3 - q1
+    # 물리적 한계 보정 (풍속은 0 미만일 수 없음)
+    lower = max(q1 - 1.5 * iqr, 0)
+    upper = q3 + 1.5 * iqr
+
+    if progress:
+        progress(0.7, "필터링")
+    keep = np.flatnonzero(((values >= lower) & (values <= upper)).to_numpy())
+    return {"lower": lower, "upper": upper, "keep": keep, "removed": len(df) - len(keep), "values": values}
+
+
+def season_correlations(df: pd.DataFrame, k: int = 8, method: str = "pearson", nonnull_ratio: float = 0.7,
+                        min_rows: int = 30, engine: CorrEngine = None, version=None, progress=None) -> dict:
+    _require(df, "일시")
+    engine = engine or CorrEngine()
+    return engine.seasonal(df, version if version is not None else id(df), k, method,
+                           nonnull_ratio=nonnull_ratio, min_rows=min_rows, progress=progress)
+
+
+def render_season_heatmaps(res: dict, method: str = "pearson", annot_thr: float = 0.5,
+                           fig: Figure = None) -> Figure:
+    """계절 2x2 히트맵 Figure (pyplot 없이 생성, GUI에서는 Tk 캔버스에 붙이고 배치에서는 파일로 저장)"""
+    selected_cols = res["selected_cols"]
+    pretty_labels = [strip_unit(c) for c in selected_cols]
+
+    fig = fig or Figure(figsize=(12, 10))
+    axes = fig.subplots(2, 2)
+    fig.suptitle(
+        f"계절별 상관 히트맵 (method={method}, k={len(selected_cols)})",
+        fontsize=16,
+        fontweight="bold"
+    )
+    fig.subplots_adjust(left=0.08, right=0.90, top=0.92, bottom=0.10, wspace=0.35, hspace=0.25)
+
+    seasons_pos = {(0, 0): "봄", (0, 1): "여름", (1, 0): "가을", (1, 1): "겨울"}
+    last_im = None
+
+    for (r, c), s_name in seasons_pos.items():
+        ax = axes[r][c]
+        n_rows, corr_mat = res["seasons"][s_name]
+
+        if corr_mat is None:
+            ax.text(0.5, 0.5, f"{s_name}\n(데이터 부족: n={n_rows})", ha="center", va="center", fontsize=12)
+            ax.set_axis_off()
+            continue
+
+        last_im = ax.imshow(corr_mat.values, vmin=-1, vmax=1, cmap="coolwarm")
+
+        ax.set_title(f"{s_name} (데이터 수: {n_rows})", fontsize=12, fontweight="bold")
+        ax.set_aspect("auto")
+        ax.set_anchor("C")
+        ax.margins(0)
+
+        ax.set_xticks(range(len(selected_cols)))
+        ax.set_yticks(range(len(selected_cols)))
+        ax.set_xticklabels(pretty_labels, rotation=35, ha="right", fontsize=9)
+        ax.set_yticklabels(pretty_labels, fontsize=9)
+
+        annotate_cells(ax, corr_mat.to_numpy(dtype=np.float64), annot_thr)
+
+    if last_im is not None:
+        fig.colorbar(last_im, ax=axes, shrink=0.75)
+    return fig
+
+
+def annotate_cells(ax, mat: np.ndarray, annot_thr: float, fontsize: float = 8):
+    """히트맵 칸 값 표시 (대각선 + |r| >= annot_thr)
+
+    칸마다 ax.text를 만들지 않고, 표시할 칸은 NumPy로 한 번에 고른 뒤
+    같은 글자는 글자 모양(TextPath)을 공유하는 컬렉션 하나로 그림
+    """
+    k = mat.shape[0]
+    with np.errstate(invalid="ignore"):
+        show = ~np.isnan(mat) & ((np.abs(mat) >= annot_thr) | np.eye(k, dtype=bool))
+    rows, cols = np.nonzero(show)
+    if not len(rows):
+        return None
+    labels = [f"{v:.2f}" for v in np.round(mat[rows, cols], 2).tolist()]
+
+    fig = ax.figure
+    coll = PathCollection(
+        [_label_path(t, fontsize) for t in labels],
+        offsets=np.column_stack([cols, rows]),
+        offset_transform=ax.transData,
+        # 글자 크기는 pt 단위 -> 저장할 때 dpi가 바뀌어도 같은 크기
+        transform=Affine2D().scale(1 / 72) + fig.dpi_scale_trans,
+        facecolors="black",
+        edgecolors="none",
+    )
+    ax.add_collection(coll, autolim=False)
+    return coll
+
+
+# "-1.00" ~ "1.00" 글자 모양 (최대 401개라 계속 재사용)
+_LABEL_PATHS = {}
+
+
+def _label_path(text: str, fontsize: float):
+    key = (text, fontsize)
+    path = _LABEL_PATHS.get(key)
+    if path is None:
+        path = TextPath((0, 0), text, size=fontsize)
+        # 가운데 정렬 (ha/va="center"), get_extents()는 곡선을 풀어서 느리므로 꼭짓점 기준
+        lo, hi = path.vertices.min(axis=0), path.vertices.max(axis=0)
+        cx, cy = (lo + hi) / 2
+        path = _LABEL_PATHS[key] = path.transformed(Affine2D().translate(-cx, -cy))
+    return path
+
+
+def render_season_png(res: dict, method: str = "pearson", annot_thr: float = 0.5,
+                      size=(1100, 880), dpi: int = 100) -> bytes:
+    """계절 히트맵을 Agg 버퍼에 그려서 PNG 바이트로 (작업 스레드에서 호출 가능: pyplot/Tk 사용 안 함)"""
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    render_season_heatmaps(res, method, annot_thr, fig=fig)
+    buf = io.BytesIO()
+    FigureCanvasAgg(fig).print_png(buf)
+    return buf.getvalue()
+
+
+def save_figure(fig: Figure, path: str, dpi: int = 100):
+    FigureCanvasAgg(fig)
+    fig.savefig(path, dpi=dpi)
+
+
+# -------------------- 배치 리포트 --------------------
+def expand_paths(items) -> list:
+    """파일/폴더/글롭 패턴 -> CSV 경로 목록 (중복 제거, 정렬)"""
+    out = []
+    for item in items:
+        if os.path.isdir(item):
+            out += glob.glob(os.path.join(item, "*.csv"))
+        elif any(ch in item for ch in "*?["):
+            out += glob.glob(item)
+        else:
+            out.append(item)
+    return sorted(set(out))
+
+
+def _write_csv(df: pd.DataFrame, path: str):
+    export_pipeline.export_frame(df, path, "csv")
+
+
+def report_one(df: pd.DataFrame, out_dir: str, opts: dict) -> dict:
+    """한 데이터(지점 1개 또는 파일 전체)의 리포트 파일 작성 -> 요약 1행"""
+    os.makedirs(out_dir, exist_ok=True)
+    row = {"rows": len(df)}
+    errors = []
+
+    if opts.get("remove_outliers") and WIND_COL in df.columns:
+        try:
+            out = wind_speed_outliers(df)
+            if out is not None and out["removed"]:
+                drop = np.setdiff1d(np.arange(len(df)), out["keep"], assume_unique=True)
+                _write_csv(df.take(drop), os.path.join(out_dir, "wind_outliers.csv"))
+                df = df.take(out["keep"]).reset_index(drop=True)
+            row["outliers_removed"] = 0 if out is None else out["removed"]
+        except Exception as e:
+            errors.append(_error_text("wind_outliers.csv", e))
+
+    cube = AggCube.from_df(df) if "일시" in df.columns else None
+    steps = [
+        ("monthly_summary.csv", lambda: monthly_summary(df, cube=cube)),
+        ("seasonal_summary.csv", lambda: period_summary(df, "season", cube=cube)),
+        ("annual_summary.csv", lambda: period_summary(df, "year", cube=cube)),
+        ("rainfall_days.csv", lambda: rainfall_days(df)),
+        ("avg_temp_class.csv", lambda: classify_avg_temp(df)),
+    ]
+    # 단계 하나가 실패해도(열 없음, 예상 못 한 타입 등) 나머지 단계/지점은 계속, 실패는 errors에 기록
+    for name, make in steps:
+        try:
+            res = make()
+            _write_csv(res, os.path.join(out_dir, name))
+            row[name.replace(".csv", "")] = len(res)
+        except Exception as e:
+            errors.append(_error_text(name, e))
+
+    if opts.get("heatmap", True):
+        try:
+            res = season_correlations(df, opts.get("k", 8), opts.get("method", "pearson"),
+                                      opts.get("nonnull_ratio", 0.7), opts.get("min_rows", 30))
+            fig = render_season_heatmaps(res, opts.get("method", "pearson"), opts.get("annot_thr", 0.5))
+            save_figure(fig, os.path.join(out_dir, "season_heatmap.png"))
+            row["heatmap_cols"] = len(res["selected_cols"])
+        except Exception as e:
+            errors.append(_error_text("season_heatmap.png", e))
+
+    row["errors"] = " | ".join(errors)
+    return row
+
+
+def _error_text(name: str, e: Exception) -> str:
+    # ValueError는 사용자용 메시지, 그 밖의 예외는 종류도 같이 (KeyError 메시지는 열 이름뿐이라)
+    return f"{name}: {e}" if isinstance(e, ValueError) else f"{name}: {type(e).__name__}: {e}"
+
+
+def run_batch(paths, out_dir: str = "report", encoding: str = "cp949", by_station: bool = True,
+              use_cache: bool = True, log=print, **opts) -> pd.DataFrame:
+    """여러 CSV를 한 번에 처리. 파일별(지점이 여러 개면 지점별) 하위 폴더에 결과 저장"""
+    import matplotlib
+    matplotlib.rcParams["font.family"] = FONT_FAMILY
+    matplotlib.rcParams["axes.unicode_minus"] = False
+
+    index = []
+    for path in expand_paths(paths):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            df = load_csv(path, encoding, use_cache)
+        except Exception as e:
+            log(f"[실패] {path}: {e}")
+            index.append({"file": path, "station": "", "errors": str(e)})
+            continue
+
+        if by_station and "지점" in df.columns and df["지점"].nunique() > 1:
+            groups = [(str(st), g.reset_index(drop=True)) for st, g in df.groupby("지점", sort=True)]
+        else:
+            groups = [("", df)]
+
+        for station, part in groups:
+            target = os.path.join(out_dir, stem, station) if station else os.path.join(out_dir, stem)
+            row = report_one(part, target, opts)
+            index.append({"file": path, "station": station, **row})
+            log(f"[완료] {path}{' 지점 ' + station if station else ''}: {len(part)}행 -> {target}"
+                + (f" (일부 실패: {row['errors']})" if row["errors"] else ""))
+
+    summary = pd.DataFrame(index)
+    os.makedirs(out_dir, exist_ok=True)
+    _write_csv(summary, os.path.join(out_dir, "report_index.csv"))
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="기상 데이터 배치 리포트 (화면 없이 실행)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rep = sub.add_parser("report", help="CSV 여러 개를 분석해 CSV/PNG로 저장")
+    rep.add_argument("paths", nargs="+", help="CSV 파일, 폴더 또는 글롭 패턴")
+    rep.add_argument("-o", "--out", default="report", help="결과 폴더 (기본: report)")
+    rep.add_argument("--encoding", default="cp949")
+    rep.add_argument("--k", type=int, default=8, help="히트맵 변수 개수")
+    rep.add_argument("--method", default="pearson", choices=["pearson", "spearman"])
+    rep.add_argument("--nonnull-ratio", type=float, default=0.7)
+    rep.add_argument("--min-rows", type=int, default=30)
+    rep.add_argument("--annot-thr", type=float, default=0.5)
+    rep.add_argument("--remove-outliers", action="store_true", help="최대 풍속 이상치를 먼저 제거")
+    rep.add_argument("--no-heatmap", action="store_true")
+    rep.add_argument("--no-cache", action="store_true", help=".cache.npz를 쓰지 않고 CSV를 직접 읽음")
+    rep.add_argument("--no-station-split", action="store_true", help="지점별로 나누지 않음")
+
+    args = parser.parse_args(argv)
+    summary = run_batch(
+        args.paths, args.out, args.encoding,
+        by_station=not args.no_station_split, use_cache=not args.no_cache,
+        k=args.k, method=args.method, nonnull_ratio=args.nonnull_ratio, min_rows=args.min_rows,
+        annot_thr=args.annot_thr, remove_outliers=args.remove_outliers, heatmap=not args.no_heatmap,
+    )
+    if summary.empty:
+        print("처리할 CSV가 없습니다.")
+        return 1
+    print(f"리포트 저장: {os.path.abspath(args.out)} ({len(summary)}건)")
+    return 2 if summary["errors"].fillna("").astype(bool).any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""여러 해 ASOS 일자료 아카이브 (열별 .npy + meta.json, 메모리 매핑으로 필요한 구간만 읽음)
+
+    archive/
+      meta.json            열 목록/dtype, 지점별 행 수/폴더, 연도별 행 구간 [시작, 끝)
+      133.g2/c0.npy ...    지점 하나의 열 하나 (일시순 정렬, 폴더 이름 끝은 빌드 세대)
+
+- 열기는 meta.json만 읽음 (50년 × 100개 지점도 바로 열림)
+- 읽기는 np.load(mmap_mode="r")로 열어 둔 배열에서 (지점, 연도) 구간만 잘라 복사 (RSS = 실제로 본 구간)
+- 연도 파티션은 파일을 나누지 않고 지점 파일 안의 행 구간으로 (파일 수 = 지점 수 × 열 수)
+- 다시 빌드하면 바뀐 지점은 새 세대 폴더에 쓰고 meta.json 교체 한 번으로 전환
+  (기존 파일은 덮어쓰지 않음 → 중간에 죽어도 예전 meta.json과 파일이 그대로 맞음, 매핑 중인 파일도 안전)
+
+    python weather_archive.py build archive data/*.csv
+    python weather_archive.py info archive
+"""
+import copy
+import json
+import os
+import re
+import shutil
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import asos_schema
+from date_index import DateIndex
+
+
+ARCHIVE_FORMAT = 1
+META_FILE = "meta.json"
+# 동시에 열어 두는 메모리 매핑 수 (지점 × 열)
+MAX_OPEN_MAPS = 256
+# 아카이브가 만드는 지점 폴더 이름 (정리할 때 이 모양만 지움)
+_STATION_DIR = re.compile(r"^\d+(\.g\d+)?(\.tmp)?$")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _column_kind(s: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_extension_array_dtype(s.dtype):
+        return "numeric"
+    return "text"
+
+
+def _write_npy(path: str, arr: np.ndarray):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr, allow_pickle=False)
+    os.replace(tmp, path)
+
+
+class WeatherArchive:
+    """열려 있는 아카이브 (메타데이터만 메모리에, 값은 읽을 때 필요한 구간만)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        path = os.path.join(root, META_FILE)
+        if not os.path.exists(path):
+            raise ArchiveError(f"아카이브가 아닙니다 ({META_FILE} 없음): {root}")
+        with open(path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != ARCHIVE_FORMAT:
+            raise ArchiveError(f"지원하지 않는 아카이브 형식: {self.meta.get('format')}")
+        self._maps = OrderedDict()
+
+    # ---- 메타데이터 ----
+    @property
+    def columns(self) -> list:
+        return [c["name"] for c in self.meta["columns"]]
+
+    @property
+    def stations(self) -> list:
+        return sorted(int(s) for s in self.meta["stations"])
+
+    @property
+    def n_rows(self) -> int:
+        return sum(s["rows"] for s in self.meta["stations"].values())
+
+    def station_name(self, station: int) -> str:
+        return self._station(station)["name"]
+
+    def years(self, station: int = None) -> list:
+        if station is not None:
+            return sorted(int(y) for y in self._station(station)["years"])
+        return sorted({int(y) for s in self.meta["stations"].values() for y in s["years"]})
+
+    def info(self) -> pd.DataFrame:
+        """지점별 이름/행 수/기간"""
+        rows = []
+        for st in self.stations:
+            s = self._station(st)
+            years = self.years(st)
+            rows.append({"지점": st, "지점명": s["name"], "행 수": s["rows"],
+                         "시작": s["first"], "끝": s["last"], "연도 수": len(years)})
+        return pd.DataFrame(rows)
+
+    def _station(self, station: int) -> dict:
+        s = self.meta["stations"].get(str(int(station)))
+        if s is None:
+            raise ArchiveError(f"아카이브에 없는 지점입니다: {station}")
+        return s
+
+    def _folder(self, station: int) -> str:
+        # 세대 폴더 이전에 만든 아카이브는 지점 번호 폴더
+        return os.path.join(self.root, self._station(station).get("dir", str(int(station))))
+
+    # ---- 메모리 매핑 ----
+    def _map(self, station: int, key: str) -> np.ndarray:
+        k = (int(station), key)
+        arr = self._maps.get(k)
+        if arr is None:
+            arr = np.load(os.path.join(self._folder(station), f"{key}.npy"), mmap_mode="r", allow_pickle=False)
+            self._maps[k] = arr
+            while len(self._maps) > MAX_OPEN_MAPS:
+                self._maps.popitem(last=False)
+        else:
+            self._maps.move_to_end(k)
+        return arr
+
+    def close(self):
+        """열어 둔 매핑 해제 (Windows에서는 매핑 중인 파일을 지울 수 없음)"""
+        self._maps.clear()
+
+    # ---- 읽기 ----
+    def _ranges(self, station: int, years=None, start=None, end=None) -> list:
+        """읽을 행 구간 [(시작, 끝)] (이어진 연도는 한 구간으로)"""
+        s = self._station(station)
+        spans = sorted(tuple(v) for y, v in s["years"].items() if years is None or int(y) in years)
+        merged = []
+        for lo, hi in spans:
+            if merged and merged[-1][1] == lo:
+                merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        if start is None and end is None:
+            return merged
+
+        # 날짜 범위는 일시 배열(정렬됨)에서 이진 탐색으로 잘라냄
+        dates = self._map(station, s["date_key"])
+        lo_t = np.datetime64(pd.Timestamp(start), "s") if start is not None else None
+        hi_t = np.datetime64(pd.Timestamp(end), "s") if end is not None else None
+        out = []
+        for lo, hi in merged:
+            part = dates[lo:hi]
+            a = lo + (int(np.searchsorted(part, lo_t, side="left")) if lo_t is not None else 0)
+            b = lo + (int(np.searchsorted(part, hi_t, side="right")) if hi_t is not None else hi - lo)
+            if a < b:
+                out.append((a, b))
+        return out
+
+    def read(self, stations=None, years=None, start=None, end=None, columns=None) -> pd.DataFrame:
+        """지점/연도/날짜 범위에 해당하는 행만 DataFrame으로 (지점, 일시순)
+
+        stations/years: 목록 (None이면 전체), start/end: 날짜 (양끝 포함), columns: 관측 열 이름 목록
+        """
+        stations = self.stations if stations is None else [int(s) for s in stations]
+        years = None if years is None else {int(y) for y in years}
+        specs = [c for c in self.meta["columns"] if columns is None or c["name"] in columns
+                 or c["name"] == asos_schema.DATE_COL]
+        names = [self.station_name(st) for st in self.stations]
+
+        parts = []
+        for st in stations:
+            s = self._station(st)
+            ranges = self._ranges(st, years, start, end)
+            n = sum(b - a for a, b in ranges)
+            if n == 0:
+                continue
+            data = {
+                asos_schema.STATION_COL: np.full(n, st, dtype=np.int16),
+                asos_schema.NAME_COL: pd.Categorical.from_codes(
+                    np.full(n, names.index(s["name"]), dtype=np.int16), categories=names),
+            }
+            for spec in specs:
+                data[spec["name"]] = self._read_column(st, s, spec, ranges, n)
+            parts.append(pd.DataFrame(data))
+
+        if not parts:
+            return self._empty(specs, names)
+        if len(parts) == 1:
+            return parts[0]
+        df = pd.concat(parts, ignore_index=True)
+        df[asos_schema.NAME_COL] = pd.Categorical(df[asos_schema.NAME_COL], categories=names)
+        return df
+
+    def _read_column(self, station: int, s: dict, spec: dict, ranges: list, n: int):
+        key = s["keys"].get(spec["name"])
+        if key is None:
+            # 이 지점에는 없는 관측 항목
+            if spec["kind"] == "text":
+                return np.full(n, None, dtype=object)
+            return np.full(n, np.nan, dtype=spec["dtype"])
+
+        if spec["kind"] == "text":
+            codes = self._map(station, f"{key}.codes")
+            cats = np.load(os.path.join(self._folder(station), f"{key}.cats.npy"), allow_pickle=False)
+            c = np.concatenate([codes[a:b] for a, b in ranges])
+            values = np.empty(n, dtype=object)
+            ok = c >= 0
+            values[ok] = cats.astype(object)[c[ok]]
+            values[~ok] = None
+            return values
+
+        arr = self._map(station, key)
+        # 매핑에서 잘라낸 구간만 복사 (이 구간의 페이지만 읽힘)
+        return np.concatenate([arr[a:b] for a, b in ranges]) if len(ranges) > 1 else np.array(arr[slice(*ranges[0])])
+
+    @staticmethod
+    def _empty(specs, names) -> pd.DataFrame:
+        data = {
+            asos_schema.STATION_COL: np.empty(0, dtype=np.int16),
+            asos_schema.NAME_COL: pd.Categorical([], categories=names),
+        }
+        for spec in specs:
+            data[spec["name"]] = np.empty(0, dtype=object if spec["kind"] == "text" else spec["dtype"])
+        return pd.DataFrame(data)
+
+
+class StationView:
+    """지점 하나를 연도 단위로 필요할 때만 읽어 두는 창 (최근 연도 몇 개만 보관)
+
+    prepare(df) -> df: 읽은 연도 조각에 파생 열 등을 붙이는 함수 (WeatherApp._prepare_weather_df 등)
+    """
+
+    def __init__(self, archive: WeatherArchive, station: int, prepare=None, max_years: int = 64):
+        self.archive = archive
+        self.station = int(station)
+        self.prepare = prepare
+        self.max_years = max_years
+        self._years = OrderedDict()
+
+    @property
+    def years(self) -> list:
+        return self.archive.years(self.station)
+
+    def year(self, year: int):
+        """(df, DateIndex) 한 해 치"""
+        item = self._years.get(year)
+        if item is None:
+            df = self.archive.read([self.station], years=[year])
+            if self.prepare is not None and len(df):
+                df = self.prepare(df)
+            item = (df, DateIndex.from_df(df))
+            self._years[year] = item
+            while len(self._years) > self.max_years:
+                self._years.popitem(last=False)
+        else:
+            self._years.move_to_end(year)
+        return item
+
+    def frame(self, years):
+        """(df, DateIndex) 여러 해를 이어 붙여서 (아카이브에 없는 연도는 건너뜀)"""
+        known = set(self.years)
+        years = sorted({int(y) for y in years} & known)
+        if not years:
+            df = self.archive.read([self.station], years=[])
+            if self.prepare is not None:
+                df = self.prepare(df)
+            return df, DateIndex.from_df(df)
+        if len(years) == 1:
+            return self.year(years[0])
+        df = pd.concat([self.year(y)[0] for y in years], ignore_index=True)
+        return df, DateIndex.from_df(df)
+
+    def clear(self):
+        self._years.clear()
+
+
+def open_archive(root: str) -> WeatherArchive:
+    return WeatherArchive(root)
+
+
+def parse_numbers(text: str):
+    """'2000-2005, 2010' -> [2000, ..., 2005, 2010] (빈칸이면 None = 전체)"""
+    text = str(text or "").strip()
+    if not text:
+        return None
+    out = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        try:
+            lo = int(lo)
+            hi = int(hi) if sep else lo
+        except ValueError:
+            raise ValueError(f"숫자 목록을 인식할 수 없습니다: '{part}' (예: 2000-2005, 2010)") from None
+        out.extend(range(min(lo, hi), max(lo, hi) + 1))
+    return out
+
+
+def is_archive(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def build_archive(root: str, sources, encoding: str = "cp949", progress=None) -> WeatherArchive:
+    """CSV들을 아카이브로 (이미 있으면 같은 지점의 기존 행과 합침, 같은 날짜는 새 값 우선)
+
+    progress(비율, 메시지): 진행률 콜백
+    """
+    frames = []
+    for i, src in enumerate(sources):
+        if progress:
+            progress(i / max(len(sources), 1) * 0.5, f"읽는 중: {os.path.basename(src)}")
+        frames.append(asos_schema.read_csv(src, encoding=encoding))
+    if not frames:
+        raise ArchiveError("아카이브에 넣을 CSV가 없습니다.")
+    new = pd.concat(frames, ignore_index=True)
+    for col in (asos_schema.STATION_COL, asos_schema.DATE_COL):
+        if col not in new.columns:
+            raise ArchiveError(f"'{col}' 컬럼이 없습니다.")
+    new = new[new[asos_schema.DATE_COL].notna() & new[asos_schema.STATION_COL].notna()]
+
+    os.makedirs(root, exist_ok=True)
+    old = WeatherArchive(root) if is_archive(root) else None
+    # old.meta는 쓰는 동안 기존 행을 읽는 데 계속 쓰므로 복사본을 고침
+    meta = copy.deepcopy(old.meta) if old is not None else {"format": ARCHIVE_FORMAT, "columns": [], "stations": {}}
+    generation = meta.get("generation", 0) + 1
+    meta["generation"] = generation
+
+    # 열 목록은 합집합 (지점마다 없는 열은 meta의 keys에 없음)
+    specs = {c["name"]: c for c in meta["columns"]}
+    skip = {asos_schema.STATION_COL, asos_schema.NAME_COL}
+    for col in new.columns:
+        if col in skip or col in specs:
+            continue
+        kind = _column_kind(new[col])
+        dtype = str(new[col].dtype) if kind != "text" else "object"
+        specs[col] = {"name": col, "kind": kind, "dtype": dtype}
+    meta["columns"] = list(specs.values())
+    keys = {c["name"]: f"c{i}" for i, c in enumerate(meta["columns"])}
+
+    groups = list(new.groupby(asos_schema.STATION_COL, sort=True))
+    for i, (st, rows) in enumerate(groups):
+        st = int(st)
+        if progress:
+            progress(0.5 + i / len(groups) * 0.5, f"지점 {st} 쓰는 중")
+        if old is not None and str(st) in old.meta["stations"]:
+            # 기존 행과 합치기: 같은 일시는 새 CSV 값 사용 (read는 복사본, 매핑은 바로 닫음)
+            prev = old.read([st])
+            old.close()
+            rows = pd.concat([prev, rows], ignore_index=True)
+            rows = rows.drop_duplicates(asos_schema.DATE_COL, keep="last")
+        rows = rows.sort_values(asos_schema.DATE_COL, kind="stable").reset_index(drop=True)
+        meta["stations"][str(st)] = _write_station(root, st, rows, specs, keys, generation)
+
+    if old is not None:
+        old.close()
+    # meta.json 교체 = 새 세대 폴더로 전환 (그 전까지는 예전 meta가 예전 폴더를 가리킴)
+    tmp = os.path.join(root, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(root, META_FILE))
+    _remove_stale_folders(root, meta)
+    return WeatherArchive(root)
+
+
+def _remove_stale_folders(root: str, meta: dict):
+    """meta가 가리키지 않는 지점 폴더 정리 (다른 곳에서 아직 매핑 중이면 남겨 두고 다음 빌드 때 다시 시도)"""
+    used = {s.get("dir", name) for name, s in meta["stations"].items()}
+    for name in os.listdir(root):
+        if name in used or not _STATION_DIR.match(name) or not os.path.isdir(os.path.join(root, name)):
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _write_station(root: str, station: int, rows: pd.DataFrame, specs: dict, keys: dict, generation: int) -> dict:
+    """지점 하나의 열 파일들을 새 세대 폴더에 쓰고 meta 항목 반환 (기존 폴더는 건드리지 않음)"""
+    dir_name = f"{station}.g{generation}"
+    folder = os.path.join(root, dir_name)
+    tmp_folder = folder + ".tmp"
+    # 같은 세대 번호로 쓰다 죽은 흔적 (meta가 가리키지 않으므로 지워도 됨)
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+
+    present = {}
+    for name, spec in specs.items():
+        if name not in rows.columns or rows[name].isna().all():
+            continue
+        key = keys[name]
+        s = rows[name]
+        if spec["kind"] == "text":
+            codes, uniques = pd.factorize(s.astype(object))
+            _write_npy(os.path.join(tmp_folder, f"{key}.codes.npy"), codes.astype(np.int32))
+            _write_npy(os.path.join(tmp_folder, f"{key}.cats.npy"), np.asarray([str(u) for u in uniques], dtype=str))
+        elif spec["kind"] == "datetime":
+            _write_npy(os.path.join(tmp_folder, f"{key}.npy"), s.to_numpy(dtype=asos_schema.DATE_DTYPE))
+        else:
+            _write_npy(os.path.join(tmp_folder, f"{key}.npy"), pd.to_numeric(s, errors="coerce")
+                       .to_numpy(dtype=spec["dtype"], na_value=np.nan))
+        present[name] = key
+
+    # 다 쓴 폴더만 세대 이름으로 (meta.json이 바뀌기 전까지는 읽히지 않음)
+    os.replace(tmp_folder, folder)
+
+    dates = rows[asos_schema.DATE_COL]
+    year_of = dates.dt.year.to_numpy()
+    bounds = np.flatnonzero(np.diff(year_of)) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(rows)]])
+    names = rows[asos_schema.NAME_COL].dropna() if asos_schema.NAME_COL in rows.columns else pd.Series(dtype=object)
+    return {
+        "name": str(names.iloc[-1]) if len(names) else str(station),
+        "dir": dir_name,
+        "rows": len(rows),
+        "first": dates.iloc[0].strftime("%Y-%m-%d"),
+        "last": dates.iloc[-1].strftime("%Y-%m-%d"),
+        "years": {str(int(year_of[a])): [int(a), int(b)] for a, b in zip(starts, stops)},
+        "keys": present,
+        "date_key": present[asos_schema.DATE_COL],
+    }
+
+
+if __name__ == "__main__":
+    # 사용: python weather_archive.py build <폴더> <csv...> [--encoding cp949] | info <폴더>
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "info"):
+        print("사용법: python weather_archive.py build <폴더> <csv...> [--encoding cp949] | info <폴더>")
+        sys.exit(1)
+
+    cmd, folder, rest = sys.argv[1], sys.argv[2], sys.argv[3:]
+    if cmd == "build":
+        enc = "cp949"
+        if "--encoding" in rest:
+            i = rest.index("--encoding")
+            enc = rest[i + 1]
+            del rest[i:i + 2]
+        archive = build_archive(folder, rest, encoding=enc,
+                                progress=lambda p, msg: print(f"[{p * 100:5.1f}%] {msg}"))
+        print(f"{folder}: 지점 {len(archive.stations)}개, {archive.n_rows:,}행")
+    else:
+        archive = open_archive(folder)
+        print(archive.info().to_string(index=False))
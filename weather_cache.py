@@ -0,0 +1,309 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+# CSV 옆에 두는 바이너리 캐시(.npz)
+# - 열 하나당 배열 하나(타입 유지) → 다음 실행 때 CSV 파싱/날짜 변환 생략
+# - 키: 경로, 크기, 수정시각, 내용 해시
+CACHE_FORMAT = 1
+CACHE_SUFFIX = ".cache.npz"
+
+CACHE_STATS = {"hit": 0, "miss": 0, "rebuild": 0}
+
+# 글자/숫자가 섞인 object 열: 고유값마다 원래 타입 번호를 같이 저장 (캐시에서 읽어도 값이 같게)
+_SCALAR_KINDS = [str, bool, int, float]
+
+
+class CacheUnsupported(ValueError):
+    """캐시로 똑같이 되살릴 수 없는 열 (이 경우 캐시를 만들지 않고 CSV에서 읽음)"""
+
+
+def cache_path_for(csv_path: str, tag: str = "raw") -> str:
+    return f"{csv_path}.{tag}{CACHE_SUFFIX}"
+
+
+def file_content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str, with_hash: bool = True) -> dict:
+    st = os.stat(path)
+    fp = {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+    if with_hash:
+        fp["hash"] = file_content_hash(path)
+    return fp
+
+
+# ---- 열 인코딩 (pickle 없이 저장 가능한 배열로) ----
+def _encode_column(key: str, s: pd.Series, arrays: dict) -> dict:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        arrays[f"{key}.codes"] = s.cat.codes.to_numpy()
+        cats = pd.Series(s.cat.categories)
+        info = _encode_column(f"{key}.cats", cats, arrays)
+        return {"kind": "category", "ordered": bool(s.cat.ordered), "cats": info}
+
+    if pd.api.types.is_datetime64_any_dtype(s.dtype) and getattr(s.dtype, "tz", None) is None:
+        arrays[key] = s.to_numpy()
+        return {"kind": "datetime"}
+
+    if pd.api.types.is_extension_array_dtype(s.dtype) and pd.api.types.is_numeric_dtype(s.dtype):
+        # Int64 등 nullable 정수: 값 + 결측 마스크
+        mask = s.isna().to_numpy()
+        np_dtype = s.dtype.numpy_dtype
+        arrays[key] = s.to_numpy(dtype=np_dtype, na_value=0)
+        arrays[f"{key}.na"] = mask
+        return {"kind": "masked", "dtype": str(s.dtype)}
+
+    if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        arrays[key] = s.to_numpy()
+        return {"kind": "numeric"}
+
+    # 문자열/object: 고유값 + 코드 (-1 = 결측)
+    codes, uniques = pd.factorize(s.astype(object))
+    arrays[f"{key}.codes"] = codes.astype(np.int32)
+    values = [u.item() if isinstance(u, np.generic) else u for u in uniques]
+    kinds = [_scalar_kind(key, v) for v in values]
+    arrays[f"{key}.uniques"] = np.asarray([repr(v) if isinstance(v, float) else str(v) for v in values], dtype=str)
+    info = {"kind": "text", "dtype": str(s.dtype), "na": _na_marker(key, s, codes)}
+    if any(kinds):
+        # 숫자 등이 섞인 열: str()로 바꾸면 1 -> '1'이 되므로 타입 번호도 저장
+        # factorize는 True/1/1.0을 같은 값으로 묶으므로 그런 열은 되살릴 수 없음
+        seen = {type(v.item() if isinstance(v, np.generic) else v) for v in s.to_numpy()[codes >= 0]}
+        if seen != {_SCALAR_KINDS[k] for k in kinds}:
+            raise CacheUnsupported(f"캐시에 저장할 수 없는 열 ({key}: 같은 값으로 묶이는 서로 다른 타입)")
+        arrays[f"{key}.kinds"] = np.asarray(kinds, dtype=np.int8)
+        info["kind"] = "mixed"
+    return info
+
+
+def _na_marker(key: str, s: pd.Series, codes: np.ndarray) -> str:
+    """결측 표시: object 열에서 결측이 모두 None이면 "none", 아니면 "nan" (섞여 있으면 저장 불가)"""
+    if s.dtype != object:
+        return "nan"
+    missing = s.to_numpy()[codes < 0]
+    if not len(missing):
+        return "nan"
+    n_none = sum(v is None for v in missing)
+    if n_none == len(missing):
+        return "none"
+    if n_none:
+        raise CacheUnsupported(f"캐시에 저장할 수 없는 열 ({key}: None/NaN 결측이 섞임)")
+    return "nan"
+
+
+def _scalar_kind(key: str, v) -> int:
+    for i, t in enumerate(_SCALAR_KINDS):
+        # bool은 int의 하위 타입이라 type()으로 정확히 비교
+        if type(v) is t:
+            return i
+    raise CacheUnsupported(f"캐시에 저장할 수 없는 값 ({key}: {type(v).__name__})")
+
+
+def _from_text(text: str, kind: int):
+    t = _SCALAR_KINDS[kind]
+    if t is bool:
+        return text == "True"
+    return t(text)
+
+
+def _decode_column(key: str, info: dict, npz) -> pd.Series:
+    kind = info["kind"]
+    if kind == "category":
+        cats = _decode_column(f"{key}.cats", info["cats"], npz)
+        return pd.Series(pd.Categorical.from_codes(npz[f"{key}.codes"], categories=cats,
+                                                   ordered=info["ordered"]))
+    if kind in ("datetime", "numeric"):
+        return pd.Series(npz[key])
+    if kind == "masked":
+        s = pd.Series(npz[key]).astype(info["dtype"])
+        s[npz[f"{key}.na"]] = pd.NA
+        return s
+
+    codes = npz[f"{key}.codes"]
+    uniques = npz[f"{key}.uniques"].astype(object)
+    if kind == "mixed":
+        uniques = np.asarray([_from_text(u, k) for u, k in zip(uniques, npz[f"{key}.kinds"])] + [None],
+                             dtype=object)[:-1]
+    values = np.empty(len(codes), dtype=object)
+    ok = codes >= 0
+    values[ok] = uniques[codes[ok]]
+    values[~ok] = None if info.get("na") == "none" else np.nan
+    s = pd.Series(values, dtype=object)
+    if info.get("dtype", "object") != "object":
+        s = s.astype(info["dtype"])  # pandas 문자열 dtype(str/string) 복원
+    return s
+
+
+def save_df_cache(df: pd.DataFrame, cache_path: str, meta: dict):
+    arrays = {}
+    columns = []
+    for i, col in enumerate(df.columns):
+        key = f"c{i}"
+        columns.append({"name": str(col), "key": key, **_encode_column(key, df[col], arrays)})
+
+    meta = dict(meta, format=CACHE_FORMAT, rows=len(df), columns=columns)
+    arrays["__meta__"] = np.asarray(json.dumps(meta, ensure_ascii=False))
+
+    # 임시 파일에 쓰고 교체 (중간에 죽어도 깨진 캐시가 남지 않게)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, cache_path)
+
+
+def update_cache_meta(cache_path: str, meta: dict):
+    """__meta__만 바꿔서 다시 씀 (열 배열은 풀지 않고 zip 항목 그대로 복사)"""
+    tmp = cache_path + ".tmp"
+    with zipfile.ZipFile(cache_path) as src, zipfile.ZipFile(tmp, "w", allowZip64=True) as dst:
+        for item in src.infolist():
+            if item.filename == "__meta__.npy":
+                continue
+            with src.open(item) as fin, dst.open(item, "w", force_zip64=True) as fout:
+                shutil.copyfileobj(fin, fout, 1 << 20)
+        with dst.open("__meta__.npy", "w") as fout:
+            np.lib.format.write_array(fout, np.asarray(json.dumps(meta, ensure_ascii=False)), allow_pickle=False)
+    os.replace(tmp, cache_path)
+
+
+def read_cache_meta(cache_path: str):
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as npz:
+            return json.loads(str(npz["__meta__"]))
+    except Exception:
+        return None
+
+
+def load_df_cache(cache_path: str) -> pd.DataFrame:
+    with np.load(cache_path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["__meta__"]))
+        data = {}
+        for c in meta["columns"]:
+            data[c["name"]] = _decode_column(c["key"], c, npz)
+    return pd.DataFrame(data)
+
+
+def is_cache_valid(meta, csv_path: str, tag: str, encoding: str, version: int = 0) -> bool:
+    if not meta or meta.get("format") != CACHE_FORMAT:
+        return False
+    if meta.get("tag") != tag or meta.get("encoding") != encoding:
+        return False
+    # prepare 결과(파생 열 등)가 바뀌면 version을 올려서 다시 만들게 함
+    if meta.get("version", 0) != version:
+        return False
+
+    fp = meta.get("source", {})
+    quick = file_fingerprint(csv_path, with_hash=False)
+    if fp.get("path") != quick["path"] or fp.get("size") != quick["size"]:
+        return False
+    if fp.get("mtime_ns") == quick["mtime_ns"]:
+        return True
+
+    # 수정시각만 바뀐 경우(복사/touch) 내용 해시로 최종 판단
+    return fp.get("hash") == file_content_hash(csv_path)
+
+
+def read_csv_cached(csv_path: str, encoding: str = "cp949", tag: str = "raw",
+                    prepare=None, rebuild: bool = False, version: int = 0, reader=None, progress=None):
+    """CSV를 캐시 우선으로 읽습니다. (df, "hit"/"miss"/"rebuild") 반환
+
+    version: prepare 결과 형식 번호 (캐시에 기록, 다르면 다시 만듦)
+    reader(path, encoding): 캐시가 없을 때 CSV 읽기 (기본 pd.read_csv, 예: asos_schema.read_csv)
+    progress: 주면 reader에 progress=로 넘김 (reader가 받아야 함, 조각 단위로 읽으며 취소 확인)
+    """
+    cache_path = cache_path_for(csv_path, tag)
+
+    meta = read_cache_meta(cache_path)
+    if not rebuild and is_cache_valid(meta, csv_path, tag, encoding, version):
+        try:
+            df = load_df_cache(cache_path)
+        except Exception:
+            df = None  # 캐시가 깨졌으면 다시 만든다
+        if df is not None:
+            CACHE_STATS["hit"] += 1
+            _refresh_fingerprint(cache_path, meta, csv_path)
+            return df, "hit"
+
+    kwargs = {} if progress is None else {"progress": progress}
+    df = (reader or pd.read_csv)(csv_path, encoding=encoding, **kwargs)
+    if prepare is not None:
+        df = prepare(df)
+
+    status = "rebuild" if rebuild else "miss"
+    CACHE_STATS[status] += 1
+
+    meta = {"tag": tag, "encoding": encoding, "version": version, "source": file_fingerprint(csv_path)}
+    try:
+        save_df_cache(df, cache_path, meta)
+    except (OSError, CacheUnsupported):
+        pass  # 쓰기 권한이 없거나 똑같이 저장할 수 없는 열이 있으면 캐시 없이 진행
+
+    return df, status
+
+
+def _refresh_fingerprint(cache_path: str, meta: dict, csv_path: str):
+    """수정시각만 바뀌어 해시로 맞춘 캐시: 새 수정시각을 기록 (다음 실행부터는 해시 계산 없이 통과)"""
+    quick = file_fingerprint(csv_path, with_hash=False)
+    source = meta.get("source", {})
+    if source.get("mtime_ns") == quick["mtime_ns"]:
+        return
+    try:
+        update_cache_meta(cache_path, dict(meta, source=dict(source, mtime_ns=quick["mtime_ns"])))
+    except OSError:
+        pass
+
+
+def clear_cache(csv_path: str, tag: str = None) -> list:
+    base = os.path.basename(csv_path) + "."
+    folder = os.path.dirname(os.path.abspath(csv_path))
+    removed = []
+    for name in os.listdir(folder):
+        if not (name.startswith(base) and name.endswith(CACHE_SUFFIX)):
+            continue
+        if tag is not None and name != os.path.basename(cache_path_for(csv_path, tag)):
+            continue
+        os.remove(os.path.join(folder, name))
+        removed.append(name)
+    return removed
+
+
+def cache_report() -> str:
+    return "캐시 hit={hit} / miss={miss} / rebuild={rebuild}".format(**CACHE_STATS)
+
+
+if __name__ == "__main__":
+    # 사용: python weather_cache.py rebuild|clear|info <csv> [인코딩]
+    if len(sys.argv) < 3 or sys.argv[1] not in ("rebuild", "clear", "info"):
+        print("사용법: python weather_cache.py rebuild|clear|info <csv> [인코딩]")
+        sys.exit(1)
+
+    cmd, path = sys.argv[1], sys.argv[2]
+    enc = sys.argv[3] if len(sys.argv) > 3 else "cp949"
+
+    if cmd == "rebuild":
+        _, status = read_csv_cached(path, encoding=enc, rebuild=True)
+        print(f"{path}: {status}")
+    elif cmd == "clear":
+        print("삭제:", clear_cache(path) or "(없음)")
+    else:
+        meta = read_cache_meta(cache_path_for(path))
+        print(json.dumps(meta, ensure_ascii=False, indent=2) if meta else "캐시 없음")